@@ -3,14 +3,16 @@
 
 from flask import Flask
 from flask_restx import Api
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 import os
 
-bcrypt = Bcrypt()
-jwt = JWTManager()
-db = SQLAlchemy()
+from app.hashing import PasswordHasher
+from app.persistence.replicas import RoutingSession
+from app.tokens import CachingJWTManager
+
+hasher = PasswordHasher()
+jwt = CachingJWTManager()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 def create_app(config_class=None):
@@ -25,10 +27,18 @@ def create_app(config_class=None):
 
     app.config.from_object(config_class)
 
-    bcrypt.init_app(app)
+    from app.models.ids import configure_ids
+    configure_ids(app)
+
+    hasher.init_app(app)
     jwt.init_app(app)
+    from app.persistence.replicas import init_replicas
+    init_replicas(app)
     db.init_app(app)
 
+    from app.persistence.sqlite import init_sqlite
+    init_sqlite(app, db)
+
     api = Api(
         app,
         version='1.0',
@@ -46,12 +56,41 @@ def create_app(config_class=None):
         security='Bearer'
     )
 
+    from app.api.serialization import ApiRequest, binary_representations, output_json
+    app.request_class = ApiRequest
+    api.representations['application/json'] = output_json
+    api.representations.update(binary_representations())
+
+    from app.hashing import PasswordHashingTimeout
+
+    @api.errorhandler(PasswordHashingTimeout)
+    def password_hashing_busy(error):
+        """Answer 503 when a password could not be hashed or checked in time."""
+        return {'error': 'Password hashing is busy, retry later'}, 503, {
+            'Retry-After': str(app.config['ADMISSION_RETRY_AFTER'])}
+
+    from app.persistence.write_queue import WriteOutcomeUnknown, WriteQueueTimeout
+
+    @api.errorhandler(WriteQueueTimeout)
+    def write_queue_busy(error):
+        """Answer 503 when a queued write was cancelled before it ran."""
+        return {'error': 'The database is busy, retry later'}, 503, {
+            'Retry-After': str(app.config['ADMISSION_RETRY_AFTER'])}
+
+    @api.errorhandler(WriteOutcomeUnknown)
+    def write_outcome_unknown(error):
+        """Answer 500, without Retry-After, when a running write did not finish in time."""
+        return {'error': 'The write may or may not have been saved; check before retrying'}, 500
+
     # Import namespaces here to avoid circular imports
     from app.api.v1.users import api as users_ns
     from app.api.v1.amenities import api as amenities_ns
     from app.api.v1.places import api as places_ns
     from app.api.v1.reviews import api as reviews_ns
     from app.api.v1.auth import api as auth_ns
+    from app.api.v1.export import api as export_ns
+    from app.api.v1.metrics import api as metrics_ns
+    from app.api.v1.health import api as health_ns
 
     # Register namespaces
     api.add_namespace(users_ns, path='/api/v1/users')
@@ -59,5 +98,25 @@ def create_app(config_class=None):
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(auth_ns, path='/api/v1/auth')
+    api.add_namespace(export_ns, path='/api/v1/export')
+    api.add_namespace(metrics_ns, path='/api/v1/metrics')
+    api.add_namespace(health_ns, path='/api/v1/health')
+    app.extensions['api'] = api
+
+    from app.commands import register_commands
+    register_commands(app)
+
+    from app.persistence.write_queue import init_write_queue
+    init_write_queue(app)
+
+    from app.admission import init_admission
+    init_admission(app)
+
+    from app.compression import init_compression
+    init_compression(app)
+
+    from app.services import facade
+    from app.services.cache import make_cache
+    facade.configure_cache(make_cache(app.config))
 
     return app
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Adaptive admission control (load shedding).
+
+API requests are split into classes (``read``, ``write``, ``login`` and
+``bulk``), each with its own concurrency limit, so slow bcrypt logins
+cannot take the slots of cheap GETs. A request over the limit waits in a short queue for at
+most ``ADMISSION_QUEUE_TIMEOUT_MS`` and is otherwise answered at once with
+``503 Service Unavailable`` and ``Retry-After``.
+
+Limits adapt with AIMD: a request slower than the class's target latency
+cuts the limit by ``ADMISSION_BACKOFF`` (at most once per target-latency
+window), while fast requests completing at full concurrency raise it by
+one slot per window, up to the configured maximum. Bulk imports and
+streaming exports (``bulk``) are slow by design and hold their slot until
+the last byte is sent, so that class has a fixed limit and its latency
+never moves the other limits.
+"""
+
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+# Paths never shed: the API docs, the health probes and the metrics needed to diagnose overload
+EXEMPT_PATHS = ('/api/v1/', '/swagger.json', '/api/v1/metrics/',
+                '/api/v1/health/live', '/api/v1/health/ready')
+
+
+class AdaptiveLimiter:
+    """Concurrency limit with a bounded wait queue, adjusted by AIMD."""
+
+    def __init__(self, max_limit, target_latency, queue_size=16, queue_timeout=0.1,
+                 backoff=0.9, min_limit=1):
+        """Initialize with a maximum limit and a target latency in seconds (None keeps the limit fixed)."""
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.target_latency = target_latency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.in_flight = 0
+        self.waiting = 0
+        self.accepted = 0
+        self.queued = 0
+        self.rejected = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Take a slot, waiting in the queue if needed; False when shed."""
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                if self.waiting >= self.queue_size:
+                    self.rejected += 1
+                    return False
+                self.waiting += 1
+                self.queued += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.in_flight >= int(self.limit):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            return False
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            self.accepted += 1
+            return True
+
+    def release(self, latency):
+        """Free a slot and adapt the limit to the request's latency in seconds."""
+        with self._cond:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            self._cond.notify()
+            if self.target_latency is None:
+                return
+            now = time.monotonic()
+            if latency > self.target_latency:
+                if now - self._last_decrease >= self.target_latency:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            elif saturated:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def as_dict(self):
+        """Return the current limit and the admission counters."""
+        return {
+            'limit': int(self.limit),
+            'max_limit': self.max_limit,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'accepted': self.accepted,
+            'queued': self.queued,
+            'rejected': self.rejected
+        }
+
+
+def request_class():
+    """Admission class of the current request, None when it is never shed."""
+    path = request.path
+    if not path.startswith('/api/v1/') or path in EXEMPT_PATHS:
+        return None
+    if path.rstrip('/') == '/api/v1/auth/login':
+        return 'login'
+    if path.startswith('/api/v1/export/') or path.rstrip('/').endswith('/bulk'):
+        return 'bulk'
+    if request.method in ('GET', 'HEAD', 'OPTIONS'):
+        return 'read'
+    return 'write'
+
+
+def admit():
+    """before_request hook: take a slot of the request's class or shed it."""
+    kind = request_class()
+    if kind is None:
+        return None
+    limiter = current_app.extensions['admission'][kind]
+    if not limiter.acquire():
+        response = jsonify({'error': 'Server overloaded, retry later'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(current_app.config['ADMISSION_RETRY_AFTER'])
+        return response
+    g.admission = (limiter, time.perf_counter())
+    return None
+
+
+def release(exc=None):
+    """teardown_request hook: free the slot taken by admit()."""
+    admission = g.pop('admission', None)
+    if admission is not None:
+        limiter, start = admission
+        limiter.release(time.perf_counter() - start)
+
+
+def init_admission(app):
+    """Register admission control on the application (ADMISSION_ENABLED)."""
+    config = app.config
+    limiters = {}
+    for kind in ('read', 'write', 'login'):
+        prefix = f'ADMISSION_{kind.upper()}'
+        limiters[kind] = AdaptiveLimiter(
+            config[f'{prefix}_LIMIT'],
+            config[f'{prefix}_TARGET_MS'] / 1000,
+            queue_size=config['ADMISSION_QUEUE_SIZE'],
+            queue_timeout=config['ADMISSION_QUEUE_TIMEOUT_MS'] / 1000,
+            backoff=config['ADMISSION_BACKOFF']
+        )
+    limiters['bulk'] = AdaptiveLimiter(
+        config['ADMISSION_BULK_LIMIT'], None,
+        queue_size=config['ADMISSION_QUEUE_SIZE'],
+        queue_timeout=config['ADMISSION_QUEUE_TIMEOUT_MS'] / 1000
+    )
+    app.extensions['admission'] = limiters
+    if config['ADMISSION_ENABLED']:
+        app.before_request(admit)
+        app.teardown_request(release)
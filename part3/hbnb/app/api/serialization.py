@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Compiled model serializers and the representations of the API.
+
+Responses are JSON by default; ``application/msgpack`` and
+``application/cbor`` are served to clients that ask for them in ``Accept``
+(and accepted as request bodies) when ``msgpack`` / ``cbor2`` are installed.
+Once a binary format is offered, every response varies on ``Accept``.
+"""
+
+import json
+
+from flask import Request, current_app, make_response, request
+from flask_restx import fields
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, the stdlib encoder is used instead
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency, application/msgpack is not offered without it
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # Optional dependency, application/cbor is not offered without it
+    cbor2 = None
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+def _to_int(value):
+    return None if value is None else int(value)
+
+
+def _to_bool(value):
+    return None if value is None else bool(value)
+
+
+def _to_str(value):
+    return value if value is None or type(value) is str else str(value)
+
+
+def _to_iso(value):
+    return None if value is None else value.isoformat()
+
+
+_CONVERTERS = [
+    (fields.Boolean, _to_bool),
+    (fields.Float, _to_float),
+    (fields.Integer, _to_int),
+    (fields.DateTime, _to_iso),
+    (fields.String, _to_str),
+]
+
+
+def _converter(field, namespace):
+    """Return a callable name in namespace that converts one field value."""
+    if isinstance(field, fields.Nested):
+        name = f'_nested_{len(namespace)}'
+        namespace[name] = compile_model(field.nested)
+        return name
+    if isinstance(field, fields.List):
+        item = _converter(field.container, namespace)
+        name = f'_list_{len(namespace)}'
+        namespace[name] = (lambda convert: lambda values: None if values is None
+                           else [convert(value) for value in values])(namespace[item])
+        return name
+    for field_type, convert in _CONVERTERS:
+        if isinstance(field, field_type):
+            namespace[convert.__name__] = convert
+            return convert.__name__
+    namespace['_raw'] = lambda value: value
+    return '_raw'
+
+
+def compile_model(model, only=None):
+    """Compile an api.model into one function mapping an object to a dict.
+
+    The generated function reads each field straight from the object's
+    attributes (``field.attribute`` or the field name) and applies the
+    field's type conversion, so the response is built in a single pass
+    instead of a hand-written dict followed by ``marshal``. With ``only``,
+    the other fields are left out and their attributes are never read.
+    """
+    namespace = {}
+    entries = []
+    for key, field in model.resolved.items():
+        if only is not None and key not in only:
+            continue
+        attribute = getattr(field, 'attribute', None) or key
+        convert = _converter(field, namespace)
+        if attribute.isidentifier():
+            getter = f'obj.{attribute}'
+        else:
+            getter = f'getattr(obj, {attribute!r}, None)'
+        entries.append(f'        {key!r}: {convert}({getter}),')
+    source = '\n'.join([
+        'def serialize(obj):',
+        '    if obj is None:',
+        '        return None',
+        '    return {',
+        *entries,
+        '    }',
+    ])
+    exec(compile(source, f'<serializer {model.name}>', 'exec'), namespace)
+    serialize = namespace['serialize']
+    serialize.__doc__ = f"Serialize an object with the {model.name} model."
+    return serialize
+
+
+def dumps(data):
+    """Encode data as compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def output_json(data, code, headers=None):
+    """Api representation for application/json using the fast encoder."""
+    if current_app.debug:
+        body = json.dumps(data, indent=4) + '\n'
+    else:
+        body = dumps(data)
+    response = make_response(body, code)
+    response.headers.extend(headers or {})
+    if BINARY_FORMATS:
+        response.vary.add('Accept')
+    return response
+
+
+def _msgpack_dumps(data):
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def _msgpack_loads(body):
+    return msgpack.unpackb(body, raw=False)
+
+
+# Media type -> (encoder, decoder, decode errors) of the installed binary formats
+BINARY_FORMATS = {}
+if msgpack is not None:
+    BINARY_FORMATS['application/msgpack'] = (_msgpack_dumps, _msgpack_loads, (ValueError,))
+if cbor2 is not None:
+    BINARY_FORMATS['application/cbor'] = (cbor2.dumps, cbor2.loads, (ValueError, cbor2.CBORError))
+
+
+def _binary_output(encode):
+    """Build an Api representation function for a binary encoder."""
+    def output(data, code, headers=None):
+        response = make_response(encode(data), code)
+        response.headers.extend(headers or {})
+        response.vary.add('Accept')
+        return response
+    return output
+
+
+def binary_representations():
+    """Api representations of the installed binary formats, by media type."""
+    return {mediatype: _binary_output(encode)
+            for mediatype, (encode, _, _) in BINARY_FORMATS.items()}
+
+
+def negotiated_format():
+    """Binary media type the current request is answered in, None for JSON.
+
+    Mirrors the Api's negotiation over its representations (JSON first).
+    """
+    if not BINARY_FORMATS:
+        return None
+    mediatype = request.accept_mimetypes.best_match(
+        ['application/json', *BINARY_FORMATS], default='application/json')
+    return mediatype if mediatype in BINARY_FORMATS else None
+
+
+def format_etag(etag):
+    """Quoted ETag for the negotiated format: ``"abc"`` -> ``"abc-msgpack"``.
+
+    JSON keeps the plain tag, so each format revalidates only its own copy.
+    """
+    mediatype = negotiated_format()
+    if mediatype is None:
+        return etag
+    return '"' + etag.strip('"') + '-' + mediatype.split('/')[1] + '"'
+
+
+class ApiRequest(Request):
+    """Request whose payload may also be sent as MessagePack or CBOR.
+
+    ``get_json`` (and so ``api.payload`` and ``request.json``) decodes a
+    body in one of the binary formats, so resources read every format the
+    same way.
+    """
+
+    def get_json(self, force=False, silent=False, cache=True):
+        binary = BINARY_FORMATS.get(self.mimetype)
+        if binary is None:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        if cache and '_binary_payload' in self.__dict__:
+            return self.__dict__['_binary_payload']
+        _, decode, errors = binary
+        try:
+            data = decode(self.get_data(cache=cache))
+        except errors as e:
+            if silent:
+                return None
+            return self.on_json_loading_failed(e)
+        if cache:
+            self.__dict__['_binary_payload'] = data
+        return data
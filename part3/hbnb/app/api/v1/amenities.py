@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """Amenities API endpoints."""
 
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from app.services import facade
+from app.api.serialization import compile_model
+from app.api.v1.bulk import bulk_result_model, run_bulk
+from app.api.v1.etags import conditional, entity_etag, latest
+from app.api.v1.multiget import multi_get
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -19,16 +24,22 @@ amenity_response_model = api.model('AmenityResponse', {
     'description': fields.String(description='Description of the amenity')
 })
 
+list_parser = api.parser()
+list_parser.add_argument('ids', type=str, location='args',
+                         help='Comma-separated amenity IDs to fetch in one request')
+
+# Compiled once: reads the Amenity attributes straight into the response dict
+amenity_to_dict = compile_model(amenity_response_model)
+
 
 @api.route('/')
 class AmenityList(Resource):
     """Amenity collection resource."""
 
     @api.expect(amenity_model)
-    @api.response(201, 'Amenity successfully created')
+    @api.response(201, 'Amenity successfully created', amenity_response_model)
     @api.response(400, 'Invalid input data')
     @api.response(403, 'Admin privileges required')
-    @api.marshal_with(amenity_response_model, code=201)
     @jwt_required()
     def post(self):
         """Register a new amenity (Admin only)."""
@@ -48,51 +59,59 @@ class AmenityList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
-        return {
-            'id': new_amenity.id,
-            'name': new_amenity.name,
-            'description': new_amenity.description
-        }, 201
+        return amenity_to_dict(new_amenity), 201
 
-    @api.response(200, 'List of amenities retrieved successfully')
-    @api.marshal_list_with(amenity_response_model)
+    @api.expect(list_parser)
+    @api.response(200, 'List of amenities retrieved successfully', [amenity_response_model])
+    @api.response(304, 'Amenities not modified')
+    @api.response(400, 'Invalid ids parameter')
     def get(self):
-        """Retrieve a list of all amenities."""
+        """Retrieve a list of all amenities, or the amenities listed in ids."""
+        if 'ids' in request.args:
+            return multi_get('amenities', amenity_to_dict)
         amenities = facade.get_all_amenities()
-        return [
-            {
-                'id': amenity.id,
-                'name': amenity.name,
-                'description': amenity.description
-            }
-            for amenity in amenities
-        ], 200
+        return conditional(entity_etag(*amenities), latest(*(amenity.updated_at for amenity in amenities)),
+                           lambda: ([amenity_to_dict(amenity) for amenity in amenities], 200))
+
+
+bulk_model = bulk_result_model(api)
+
+
+@api.route('/bulk')
+class AmenityBulk(Resource):
+    """Bulk amenity creation."""
+
+    @api.expect([amenity_model])
+    @api.response(201, 'All amenities created', bulk_model)
+    @api.response(207, 'Some amenities created, see errors', bulk_model)
+    @api.response(400, 'No amenity created')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Create many amenities in chunked transactions (Admin only)."""
+        return run_bulk(api.payload, facade.create_amenities_bulk)
 
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     """Single amenity resource."""
 
-    @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(200, 'Amenity details retrieved successfully', amenity_response_model)
+    @api.response(304, 'Amenity not modified')
     @api.response(404, 'Amenity not found')
-    @api.marshal_with(amenity_response_model)
     def get(self, amenity_id):
         """Get amenity details by ID."""
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return {
-            'id': amenity.id,
-            'name': amenity.name,
-            'description': amenity.description
-        }, 200
+        return conditional(entity_etag(amenity), amenity.updated_at,
+                           lambda: (amenity_to_dict(amenity), 200))
 
     @api.expect(amenity_model)
-    @api.response(200, 'Amenity successfully updated')
+    @api.response(200, 'Amenity successfully updated', amenity_response_model)
     @api.response(404, 'Amenity not found')
     @api.response(400, 'Invalid input data')
     @api.response(403, 'Admin privileges required')
-    @api.marshal_with(amenity_response_model)
     @jwt_required()
     def put(self, amenity_id):
         """Update amenity information (Admin only)."""
@@ -113,8 +132,4 @@ class AmenityResource(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
-        return {
-            'id': updated_amenity.id,
-            'name': updated_amenity.name,
-            'description': updated_amenity.description
-        }, 200
\ No newline at end of file
+        return amenity_to_dict(updated_amenity), 200
\ No newline at end of file
@@ -2,7 +2,8 @@
 """Authentication API endpoints."""
 
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
+from app import jwt
 from app.services import facade
 
 api = Namespace('auth', description='Authentication operations')
@@ -28,11 +29,9 @@ class Login(Resource):
         if 'email' not in credentials or 'password' not in credentials:
             return {'error': 'email and password are required'}, 400
 
-        # Step 1: Retrieve the user based on the provided email
-        user = facade.get_user_by_email(credentials['email'])
-
-        # Step 2: Check if the user exists and the password is correct
-        if not user or not user.verify_password(credentials['password']):
+        # Step 1-2: Retrieve the user and check the password (rehashed if its cost is outdated)
+        user = facade.authenticate(credentials['email'], credentials['password'])
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
         # Step 3: Create a JWT token with the user's id and is_admin flag
@@ -45,6 +44,19 @@ class Login(Resource):
         return {'access_token': access_token}, 200
 
 
+@api.route('/logout')
+class Logout(Resource):
+    """Revocation of the caller's access token."""
+
+    @jwt_required()
+    @api.response(200, 'Token revoked')
+    @api.response(401, 'Missing or invalid token')
+    def post(self):
+        """Revoke the JWT token used for this request"""
+        jwt.revoke(get_jwt())
+        return {'message': 'Token revoked'}, 200
+
+
 @api.route('/protected')
 class ProtectedResource(Resource):
     """Protected resource for testing JWT authentication."""
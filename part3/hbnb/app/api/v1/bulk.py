@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Shared handling of bulk create endpoints."""
+
+import time
+
+from flask import current_app
+from flask_restx import fields
+from flask_jwt_extended import get_jwt
+
+
+def bulk_result_model(api):
+    """Register the bulk result model on a namespace."""
+    error_model = api.model('BulkItemError', {
+        'index': fields.Integer(description='Position of the item in the request array'),
+        'error': fields.String(description='Why the item was rejected')
+    })
+    return api.model('BulkResult', {
+        'created': fields.List(fields.String, description='IDs of the created objects, in request order'),
+        'errors': fields.List(fields.Nested(error_model), description='Rejected items'),
+        'elapsed_ms': fields.Float(description='Time spent validating and inserting'),
+        'items_per_second': fields.Float(description='Insert throughput achieved')
+    })
+
+
+def run_bulk(payload, create_many):
+    """Validate a bulk payload, run create_many and build the response.
+
+    Returns 201 when every item was created, 207 when only some were and
+    400 when none were.
+    """
+    if not get_jwt().get('is_admin', False):
+        return {'error': 'Admin privileges required'}, 403
+    if not isinstance(payload, list):
+        return {'error': 'Request body must be a JSON array'}, 400
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(payload) > max_items:
+        return {'error': f'At most {max_items} items per request'}, 400
+
+    start = time.perf_counter()
+    created, errors = create_many(payload, current_app.config['BULK_CHUNK_SIZE'])
+    elapsed = time.perf_counter() - start
+
+    if not errors:
+        code = 201
+    elif created:
+        code = 207
+    else:
+        code = 400
+    return {
+        'created': created,
+        'errors': errors,
+        'elapsed_ms': round(elapsed * 1000, 3),
+        'items_per_second': round(len(created) / elapsed, 1) if elapsed > 0 else None
+    }, code
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Streaming export API endpoints."""
+
+from flask import Response, current_app, stream_with_context
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services import facade
+from app.api.serialization import dumps
+from app.api.v1.places import place_to_dict
+from app.api.v1.reviews import review_to_dict
+from app.api.v1.users import user_to_dict
+
+api = Namespace('export', description='Bulk export operations')
+
+# Entity name -> (facade streaming method, serializer)
+EXPORTERS = {
+    'places': (facade.iter_all_places, place_to_dict),
+    'reviews': (facade.iter_all_reviews, review_to_dict),
+    'users': (facade.iter_all_users, user_to_dict),
+}
+
+
+@api.route('/<entity>')
+@api.param('entity', 'Entity to export: places, reviews or users')
+class Export(Resource):
+    """Newline-delimited JSON export of a whole entity table."""
+
+    @api.response(200, 'NDJSON stream, one object per line')
+    @api.response(403, 'Admin privileges required')
+    @api.response(404, 'Unknown entity')
+    @jwt_required()
+    def get(self, entity):
+        """Stream every object of an entity as NDJSON (Admin only)."""
+        claims = get_jwt()
+        if not claims.get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+
+        if entity not in EXPORTERS:
+            return {'error': 'Unknown entity'}, 404
+
+        iter_all, to_dict = EXPORTERS[entity]
+        batch_size = current_app.config['EXPORT_BATCH_SIZE']
+
+        def generate():
+            for obj in iter_all(batch_size):
+                yield dumps(to_dict(obj)) + b'\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Sparse fieldsets (``?fields=``) and relation expansion (``?include=``)."""
+
+from flask import request
+from flask_restx import fields as restx_fields
+
+from app.api.serialization import compile_model
+
+_serializers = {}
+
+
+def _is_relation(field):
+    return isinstance(field, (restx_fields.Nested, restx_fields.List))
+
+
+def comma_list(param):
+    """Comma-separated names of a query parameter, in order and deduplicated."""
+    names = []
+    for name in request.args.get(param, '').split(','):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def parse_shape(model):
+    """Read ``?fields=`` and ``?include=`` for a response model.
+
+    ``fields`` selects scalar fields of the model (``id`` is always kept) and
+    ``include`` selects its nested relations. Returns None when neither
+    parameter is given, so the caller keeps its default response; otherwise
+    ``(fields, include)`` where ``fields`` is None when every scalar is wanted.
+    Raises ValueError on a name the model does not define.
+    """
+    if 'fields' not in request.args and 'include' not in request.args:
+        return None
+    resolved = model.resolved
+    fields = None
+    if 'fields' in request.args:
+        fields = ['id'] + [name for name in comma_list('fields') if name != 'id']
+        unknown = [name for name in fields
+                   if name not in resolved or _is_relation(resolved[name])]
+        if unknown:
+            raise ValueError(f"Unknown field: {', '.join(unknown)}")
+    include = comma_list('include')
+    unknown = [name for name in include
+               if name not in resolved or not _is_relation(resolved[name])]
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}")
+    return fields, include
+
+
+def shaped_serializer(model, shape):
+    """Compiled serializer emitting only the fields and relations of a shape.
+
+    Only the requested attributes are read from the object, so columns left
+    out of the query are never lazy-loaded. Serializers are compiled once per
+    distinct shape.
+    """
+    fields, include = shape
+    if fields is None:
+        fields = [name for name, field in model.resolved.items() if not _is_relation(field)]
+    key = (model.name, tuple(fields), tuple(include))
+    serialize = _serializers.get(key)
+    if serialize is None:
+        serialize = _serializers[key] = compile_model(model, only=set(fields) | set(include))
+    return serialize
+
+
+def included_objects(obj, include):
+    """Related entities of obj expanded by include (they version the response too)."""
+    related = []
+    for name in include:
+        value = getattr(obj, name)
+        if isinstance(value, list):
+            related.extend(value)
+        elif value is not None:
+            related.append(value)
+    return related
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Liveness and readiness probes of a worker process."""
+
+from flask import current_app
+from flask_restx import Namespace, Resource
+from app.warmup import readiness
+
+api = Namespace('health', description='Worker health probes')
+
+
+@api.route('/live')
+class Liveness(Resource):
+    """Liveness probe."""
+
+    @api.response(200, 'The worker is running')
+    def get(self):
+        """Report that this worker process is up."""
+        return {'status': 'alive'}, 200
+
+
+@api.route('/ready')
+class Readiness(Resource):
+    """Readiness probe."""
+
+    @api.response(200, 'The worker is warmed up and accepts traffic')
+    @api.response(503, 'The worker is still warming up')
+    def get(self):
+        """Report whether this worker finished its warmup."""
+        state = readiness(current_app)
+        if not state['ready']:
+            return dict(state, status='warming up'), 503
+        return dict(state, status='ready'), 200
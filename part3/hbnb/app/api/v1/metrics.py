@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Runtime metrics API endpoints."""
+
+from flask import current_app
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app import jwt
+from app.services import facade
+
+api = Namespace('metrics', description='Runtime metrics')
+
+
+@api.route('/')
+class Metrics(Resource):
+    """Counters of the current worker process."""
+
+    @api.response(200, 'Metrics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Get cache and performance counters (Admin only)."""
+        claims = get_jwt()
+        if not claims.get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        writes = current_app.extensions['write_queue']
+        replicas = current_app.extensions['replicas']
+        return {
+            'cache': facade.cache.stats.as_dict(),
+            'compression_cache': current_app.extensions['compression_cache'].stats.as_dict(),
+            'single_flight': facade.flights.stats.as_dict(),
+            'jwt_cache': jwt.token_cache.stats.as_dict(),
+            'admission': {kind: limiter.as_dict()
+                          for kind, limiter in current_app.extensions['admission'].items()},
+            'write_queue': writes.stats.as_dict() if writes is not None else None,
+            'replicas': replicas.as_dict() if replicas is not None else None
+        }, 200
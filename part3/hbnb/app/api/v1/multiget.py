@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Shared handling of multi-get list requests (``?ids=a,b,c``)."""
+
+from flask import current_app
+
+from app.services import facade
+from app.api.v1.etags import conditional, entity_etag, latest, with_related
+from app.api.v1.fieldsets import comma_list, included_objects
+
+
+def multi_get(entity, serialize, shape=None, related=None):
+    """Answer ``GET /<entity>/?ids=a,b,c`` with a single IN query.
+
+    The body is ``{entity: [...], 'missing': [...]}``: the objects in the
+    requested order and the IDs that were not found. ``related(obj)``
+    lists the embedded entities that version the response besides the
+    objects themselves; with a shape, the included relations are used.
+    """
+    ids = comma_list('ids')
+    if not ids:
+        return {'error': 'ids must list at least one ID'}, 400
+    max_ids = current_app.config['MULTI_GET_MAX_IDS']
+    if len(ids) > max_ids:
+        return {'error': f'At most {max_ids} ids per request'}, 400
+
+    fields, include = shape or (None, None)
+    if shape:
+        def related(obj):
+            return included_objects(obj, include)
+    objs, missing = facade.get_many(entity, ids, fields, include)
+    versioned = with_related(objs, related)
+    return conditional(
+        entity_etag(*versioned),
+        latest(*(obj.updated_at for obj in versioned)),
+        lambda: ({entity: [serialize(obj) for obj in objs], 'missing': missing}, 200)
+    )
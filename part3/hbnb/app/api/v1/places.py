@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 """Places API endpoints."""
 
+from flask import current_app, request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.models.ids import canonical_id
 from app.services import facade
+from app.api.serialization import compile_model
+from app.api.v1.bulk import bulk_result_model, run_bulk
+from app.api.v1.etags import conditional, entity_etag, latest, with_related
+from app.api.v1.fieldsets import included_objects, parse_shape, shaped_serializer
+from app.api.v1.multiget import multi_get
+from app.api.v1.reviews import review_to_dict
 
 api = Namespace('places', description='Place operations')
 
@@ -48,31 +56,50 @@ place_response_model = api.model('PlaceResponse', {
     'price': fields.Float(description='Price per night'),
     'latitude': fields.Float(description='Latitude of the place'),
     'longitude': fields.Float(description='Longitude of the place'),
+    'review_count': fields.Integer(description='Number of reviews'),
+    'average_rating': fields.Float(description='Average review rating, null without reviews'),
     'owner': fields.Nested(user_model, description='Owner of the place'),
     'amenities': fields.List(fields.Nested(amenity_model), description='List of amenities')
 })
 
+review_model = api.model('PlaceReview', {
+    'id': fields.String(description='Review ID'),
+    'text': fields.String(description='Text of the review'),
+    'rating': fields.Integer(description='Rating of the place'),
+    'user_id': fields.String(description='ID of the user')
+})
+
+# Everything ?fields= and ?include= can select on a place
+place_expanded_model = api.inherit('PlaceExpanded', place_response_model, {
+    'reviews': fields.List(fields.Nested(review_model), description='Reviews (with ?include=reviews)')
+})
+
+# Paginated place list returned when ?limit= or ?cursor= is used
+place_page_model = api.model('PlacePage', {
+    'places': fields.List(fields.Nested(place_response_model), description='Places of this page'),
+    'next_cursor': fields.String(description='Cursor of the next page, null on the last page')
+})
+
+# Search result: a place plus its distance from the search center
+place_search_model = api.inherit('PlaceSearchResult', place_response_model, {
+    'distance_km': fields.Float(description='Distance from the search center (radius search only)')
+})
+
+shape_parser = api.parser()
+shape_parser.add_argument('fields', type=str, location='args',
+                          help='Comma-separated place fields to return, e.g. "id,title,price"')
+shape_parser.add_argument('include', type=str, location='args',
+                          help='Comma-separated relations to embed: owner, amenities, reviews')
+
+pagination_parser = shape_parser.copy()
+pagination_parser.add_argument('ids', type=str, location='args',
+                               help='Comma-separated place IDs to fetch in one request')
+pagination_parser.add_argument('limit', type=int, location='args', help='Maximum number of places to return')
+pagination_parser.add_argument('cursor', type=str, location='args', help='Opaque cursor from a previous page')
+
 
-def place_to_dict(place):
-    """Convert a Place object to a dictionary."""
-    return {
-        'id': place.id,
-        'title': place.title,
-        'description': place.description,
-        'price': place.price,
-        'latitude': place.latitude,
-        'longitude': place.longitude,
-        'owner': {
-            'id': place.owner.id,
-            'first_name': place.owner.first_name,
-            'last_name': place.owner.last_name,
-            'email': place.owner.email
-        },
-        'amenities': [
-            {'id': amenity.id, 'name': amenity.name}
-            for amenity in place.amenities
-        ]
-    }
+# Compiled once: reads the Place attributes straight into the response dict
+place_to_dict = compile_model(place_response_model)
 
 
 @api.route('/')
@@ -80,10 +107,9 @@ class PlaceList(Resource):
     """Place collection resource."""
 
     @api.expect(place_model)
-    @api.response(201, 'Place successfully created')
+    @api.response(201, 'Place successfully created', place_response_model)
     @api.response(400, 'Invalid input data')
     @api.response(401, 'Missing or invalid token')
-    @api.marshal_with(place_response_model, code=201)
     @jwt_required()
     def post(self):
         """Create a new place."""
@@ -109,34 +135,181 @@ class PlaceList(Resource):
 
         return place_to_dict(new_place), 201
 
-    @api.response(200, 'List of places retrieved successfully')
-    @api.marshal_list_with(place_response_model)
+    @api.expect(pagination_parser)
+    @api.response(200, 'List of places retrieved successfully', [place_response_model])
+    @api.response(400, 'Invalid pagination, fields or include parameters')
     def get(self):
-        """Retrieve a list of all places."""
-        places = facade.get_all_places()
-        return [place_to_dict(place) for place in places], 200
+        """Retrieve a list of places.
+
+        Without ``limit``/``cursor`` the full list is returned. With either
+        parameter the response is a page with a ``next_cursor``. With ``ids``
+        only those places are returned, in order, with the IDs not found.
+        ``fields`` and ``include`` restrict each place to the given fields
+        and relations.
+        """
+        try:
+            shape = parse_shape(place_expanded_model)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        fields_, include = shape or (None, None)
+        serialize = shaped_serializer(place_expanded_model, shape) if shape else place_to_dict
+        if 'ids' in request.args:
+            return multi_get('places', serialize, shape,
+                             lambda place: [place.owner] + list(place.amenities))
+
+        # Place bodies embed their owner and amenities (or the included relations)
+        if shape:
+            def related(place):
+                return included_objects(place, include)
+        else:
+            def related(place):
+                return [place.owner] + list(place.amenities)
+
+        if 'limit' not in request.args and 'cursor' not in request.args:
+            places = facade.get_all_places(fields_, include)
+            versioned = with_related(places, related)
+            return conditional(entity_etag(*versioned), latest(*(obj.updated_at for obj in versioned)),
+                               lambda: ([serialize(place) for place in places], 200))
+
+        try:
+            limit = int(request.args.get('limit', current_app.config['PAGE_SIZE_DEFAULT']))
+        except ValueError:
+            return {'error': 'limit must be an integer'}, 400
+        if limit < 1:
+            return {'error': 'limit must be a positive integer'}, 400
+        limit = min(limit, current_app.config['PAGE_SIZE_MAX'])
+
+        try:
+            places, next_cursor = facade.get_places_page(
+                limit, request.args.get('cursor'), fields_, include)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        versioned = with_related(places, related)
+        return conditional(
+            entity_etag(*versioned, extra=[next_cursor]),
+            latest(*(obj.updated_at for obj in versioned)),
+            lambda: ({
+                'places': [serialize(place) for place in places],
+                'next_cursor': next_cursor
+            }, 200)
+        )
+
+
+search_parser = api.parser()
+search_parser.add_argument('lat', type=float, location='args', help='Latitude of the search center')
+search_parser.add_argument('lng', type=float, location='args', help='Longitude of the search center')
+search_parser.add_argument('radius_km', type=float, location='args', help='Search radius in kilometers')
+search_parser.add_argument('bbox', type=str, location='args',
+                           help='Bounding box "min_lng,min_lat,max_lng,max_lat"')
+
+
+def parse_bbox(value):
+    """Parse a "min_lng,min_lat,max_lng,max_lat" bounding box."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not -90.0 <= min_lat <= max_lat <= 90.0:
+        raise ValueError("bbox latitudes must be ordered and between -90.0 and 90.0")
+    if not (-180.0 <= min_lng <= 180.0 and -180.0 <= max_lng <= 180.0):
+        raise ValueError("bbox longitudes must be between -180.0 and 180.0")
+    return min_lat, min_lng, max_lat, max_lng
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    """Geospatial place search."""
+
+    @api.expect(search_parser)
+    @api.response(200, 'Matching places retrieved successfully', [place_search_model])
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Find places within a radius (lat, lng, radius_km) or a bounding box (bbox)."""
+        args = request.args
+        try:
+            if 'bbox' in args:
+                places = facade.search_places_by_bbox(*parse_bbox(args['bbox']))
+                results = [place_to_dict(place) for place in places]
+            else:
+                try:
+                    lat = float(args['lat'])
+                    lng = float(args['lng'])
+                    radius_km = float(args['radius_km'])
+                except (KeyError, ValueError):
+                    return {'error': 'lat, lng and radius_km are required numbers, or use bbox'}, 400
+                if not -90.0 <= lat <= 90.0 or not -180.0 <= lng <= 180.0:
+                    return {'error': 'lat/lng out of range'}, 400
+                max_radius = current_app.config['GEO_SEARCH_MAX_RADIUS_KM']
+                if not 0 < radius_km <= max_radius:
+                    return {'error': f'radius_km must be between 0 and {max_radius:g}'}, 400
+                results = []
+                for place, distance in facade.search_places_by_radius(lat, lng, radius_km):
+                    result = place_to_dict(place)
+                    result['distance_km'] = round(distance, 3)
+                    results.append(result)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return results, 200
+
+
+place_bulk_model = api.inherit('PlaceBulkItem', place_model, {
+    'owner_id': fields.String(required=True, description='ID of the owner')
+})
+bulk_model = bulk_result_model(api)
+
+
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    """Bulk place creation."""
+
+    @api.expect([place_bulk_model])
+    @api.response(201, 'All places created', bulk_model)
+    @api.response(207, 'Some places created, see errors', bulk_model)
+    @api.response(400, 'No place created')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Create many places in chunked transactions (Admin only)."""
+        return run_bulk(api.payload, facade.create_places_bulk)
 
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     """Single place resource."""
 
-    @api.response(200, 'Place details retrieved successfully')
+    @api.expect(shape_parser)
+    @api.response(200, 'Place details retrieved successfully', place_response_model)
+    @api.response(304, 'Place not modified')
+    @api.response(400, 'Invalid fields or include parameters')
     @api.response(404, 'Place not found')
-    @api.marshal_with(place_response_model)
     def get(self, place_id):
         """Get place details by ID."""
-        place = facade.get_place(place_id)
+        try:
+            shape = parse_shape(place_expanded_model)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        fields_, include = shape or (None, None)
+        place = facade.get_place(place_id, fields_, include)
         if not place:
             return {'error': 'Place not found'}, 404
-        return place_to_dict(place), 200
+        if shape:
+            serialize = shaped_serializer(place_expanded_model, shape)
+            related = included_objects(place, include)
+        else:
+            serialize = place_to_dict
+            related = [place.owner] + list(place.amenities)
+        return conditional(
+            entity_etag(place, *related),
+            latest(place.updated_at, *(obj.updated_at for obj in related)),
+            lambda: (serialize(place), 200)
+        )
 
     @api.expect(place_update_model)
-    @api.response(200, 'Place successfully updated')
+    @api.response(200, 'Place successfully updated', place_response_model)
     @api.response(404, 'Place not found')
     @api.response(400, 'Invalid input data')
     @api.response(403, 'Unauthorized action')
-    @api.marshal_with(place_response_model)
     @jwt_required()
     def put(self, place_id):
         """Update place information."""
@@ -150,7 +323,7 @@ class PlaceResource(Resource):
             return {'error': 'Place not found'}, 404
 
         # Check ownership - only owner or admin can modify
-        if place.owner_id != current_user_id and not is_admin:
+        if canonical_id(place.owner_id) != canonical_id(current_user_id) and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
         place_data = dict(api.payload or {})
@@ -172,8 +345,6 @@ class PlaceResource(Resource):
     @jwt_required()
     def delete(self, place_id):
         """Delete a place."""
-        from app import db
-
         current_user_id = get_jwt_identity()
         claims = get_jwt()
         is_admin = claims.get('is_admin', False)
@@ -182,11 +353,10 @@ class PlaceResource(Resource):
         if not place:
             return {'error': 'Place not found'}, 404
 
-        if place.owner_id != current_user_id and not is_admin:
+        if canonical_id(place.owner_id) != canonical_id(current_user_id) and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
-        db.session.delete(place)
-        db.session.commit()
+        facade.delete_place(place_id)
         return {'message': 'Place deleted successfully'}, 200
 
 
@@ -195,19 +365,12 @@ class PlaceReviewList(Resource):
     """Reviews for a specific place."""
 
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(304, 'Reviews not modified')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get all reviews for a specific place."""
         reviews = facade.get_reviews_by_place(place_id)
         if reviews is None:
             return {'error': 'Place not found'}, 404
-        return [
-            {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user_id': review.user_id,
-                'place_id': review.place_id
-            }
-            for review in reviews
-        ], 200
\ No newline at end of file
+        return conditional(entity_etag(*reviews), latest(*(review.updated_at for review in reviews)),
+                           lambda: ([review_to_dict(review) for review in reviews], 200))
\ No newline at end of file
@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 """Reviews API endpoints."""
 
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.models.ids import canonical_id
 from app.services import facade
+from app.api.serialization import compile_model
+from app.api.v1.bulk import bulk_result_model, run_bulk
+from app.api.v1.etags import conditional, entity_etag, latest, with_related
+from app.api.v1.fieldsets import included_objects, parse_shape, shaped_serializer
+from app.api.v1.multiget import multi_get
 
 api = Namespace('reviews', description='Review operations')
 
@@ -29,16 +36,36 @@ review_response_model = api.model('ReviewResponse', {
     'place_id': fields.String(description='ID of the place')
 })
 
+review_user_model = api.model('ReviewUser', {
+    'id': fields.String(description='User ID'),
+    'first_name': fields.String(description='First name of the author'),
+    'last_name': fields.String(description='Last name of the author')
+})
+
+review_place_model = api.model('ReviewPlace', {
+    'id': fields.String(description='Place ID'),
+    'title': fields.String(description='Title of the place')
+})
+
+# Everything ?fields= and ?include= can select on a review
+review_expanded_model = api.inherit('ReviewExpanded', review_response_model, {
+    'user': fields.Nested(review_user_model, description='Author (with ?include=user)'),
+    'place': fields.Nested(review_place_model, description='Reviewed place (with ?include=place)')
+})
+
+shape_parser = api.parser()
+shape_parser.add_argument('fields', type=str, location='args',
+                          help='Comma-separated review fields to return, e.g. "id,rating"')
+shape_parser.add_argument('include', type=str, location='args',
+                          help='Comma-separated relations to embed: user, place')
 
-def review_to_dict(review):
-    """Convert a Review object to a dictionary."""
-    return {
-        'id': review.id,
-        'text': review.text,
-        'rating': review.rating,
-        'user_id': review.user_id,
-        'place_id': review.place_id
-    }
+list_parser = shape_parser.copy()
+list_parser.add_argument('ids', type=str, location='args',
+                         help='Comma-separated review IDs to fetch in one request')
+
+
+# Compiled once: reads the Review attributes straight into the response dict
+review_to_dict = compile_model(review_response_model)
 
 
 @api.route('/')
@@ -46,10 +73,9 @@ class ReviewList(Resource):
     """Review collection resource."""
 
     @api.expect(review_model)
-    @api.response(201, 'Review successfully created')
+    @api.response(201, 'Review successfully created', review_response_model)
     @api.response(400, 'Invalid input data')
     @api.response(401, 'Missing or invalid token')
-    @api.marshal_with(review_response_model, code=201)
     @jwt_required()
     def post(self):
         """Create a new review."""
@@ -74,7 +100,7 @@ class ReviewList(Resource):
             return {'error': 'Place not found'}, 404
 
         # Non-admin users cannot review their own place.
-        if not is_admin and place.owner_id == review_data['user_id']:
+        if not is_admin and canonical_id(place.owner_id) == canonical_id(review_data['user_id']):
             return {'error': 'You cannot review your own place'}, 400
 
         # Non-admin users cannot review the same place twice.
@@ -88,34 +114,79 @@ class ReviewList(Resource):
 
         return review_to_dict(new_review), 201
 
-    @api.response(200, 'List of reviews retrieved successfully')
-    @api.marshal_list_with(review_response_model)
+    @api.expect(list_parser)
+    @api.response(200, 'List of reviews retrieved successfully', [review_response_model])
+    @api.response(304, 'Reviews not modified')
+    @api.response(400, 'Invalid ids, fields or include parameters')
     def get(self):
-        """Retrieve a list of all reviews."""
-        reviews = facade.get_all_reviews()
-        return [review_to_dict(review) for review in reviews], 200
+        """Retrieve a list of all reviews, or the reviews listed in ids."""
+        try:
+            shape = parse_shape(review_expanded_model)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        fields_, include = shape or (None, None)
+        serialize = shaped_serializer(review_expanded_model, shape) if shape else review_to_dict
+        if 'ids' in request.args:
+            return multi_get('reviews', serialize, shape)
+        reviews = facade.get_all_reviews(fields_, include)
+        versioned = with_related(reviews, lambda review: included_objects(review, include or []))
+        return conditional(entity_etag(*versioned), latest(*(obj.updated_at for obj in versioned)),
+                           lambda: ([serialize(review) for review in reviews], 200))
+
+
+review_bulk_model = api.inherit('ReviewBulkItem', review_model, {
+    'user_id': fields.String(required=True, description='ID of the user')
+})
+bulk_model = bulk_result_model(api)
+
+
+@api.route('/bulk')
+class ReviewBulk(Resource):
+    """Bulk review creation."""
+
+    @api.expect([review_bulk_model])
+    @api.response(201, 'All reviews created', bulk_model)
+    @api.response(207, 'Some reviews created, see errors', bulk_model)
+    @api.response(400, 'No review created')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Create many reviews in chunked transactions (Admin only)."""
+        return run_bulk(api.payload, facade.create_reviews_bulk)
 
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     """Single review resource."""
 
-    @api.response(200, 'Review details retrieved successfully')
+    @api.expect(shape_parser)
+    @api.response(200, 'Review details retrieved successfully', review_response_model)
+    @api.response(304, 'Review not modified')
+    @api.response(400, 'Invalid fields or include parameters')
     @api.response(404, 'Review not found')
-    @api.marshal_with(review_response_model)
     def get(self, review_id):
         """Get review details by ID."""
-        review = facade.get_review(review_id)
+        try:
+            shape = parse_shape(review_expanded_model)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        fields_, include = shape or (None, None)
+        review = facade.get_review(review_id, fields_, include)
         if not review:
             return {'error': 'Review not found'}, 404
-        return review_to_dict(review), 200
+        serialize = shaped_serializer(review_expanded_model, shape) if shape else review_to_dict
+        related = included_objects(review, include or [])
+        return conditional(
+            entity_etag(review, *related),
+            latest(review.updated_at, *(obj.updated_at for obj in related)),
+            lambda: (serialize(review), 200)
+        )
 
     @api.expect(review_update_model)
-    @api.response(200, 'Review successfully updated')
+    @api.response(200, 'Review successfully updated', review_response_model)
     @api.response(404, 'Review not found')
     @api.response(400, 'Invalid input data')
     @api.response(403, 'Unauthorized action')
-    @api.marshal_with(review_response_model)
     @jwt_required()
     def put(self, review_id):
         """Update review information."""
@@ -129,7 +200,7 @@ class ReviewResource(Resource):
             return {'error': 'Review not found'}, 404
 
         # Check ownership - only the review creator or admin can modify
-        if review.user_id != current_user_id and not is_admin:
+        if canonical_id(review.user_id) != canonical_id(current_user_id) and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
         review_data = api.payload
@@ -157,7 +228,7 @@ class ReviewResource(Resource):
             return {'error': 'Review not found'}, 404
 
         # Check ownership - only the review creator or admin can delete
-        if review.user_id != current_user_id and not is_admin:
+        if canonical_id(review.user_id) != canonical_id(current_user_id) and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
         if not facade.delete_review(review_id):
@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.models.ids import canonical_id
 from app.services import facade
+from app.api.serialization import compile_model
+from app.api.v1.etags import conditional, entity_etag, latest, with_related
+from app.api.v1.fieldsets import included_objects, parse_shape, shaped_serializer
+from app.api.v1.multiget import multi_get
 
 api = Namespace('users', description='User operations')
 
@@ -21,6 +27,48 @@ user_update_model = api.model('UserUpdate', {
     'password': fields.String(description='Password of the user')
 })
 
+user_response_model = api.model('UserResponse', {
+    'id': fields.String(description='Unique identifier of the user'),
+    'first_name': fields.String(description='First name of the user'),
+    'last_name': fields.String(description='Last name of the user'),
+    'email': fields.String(description='Email of the user')
+})
+
+user_place_model = api.model('UserPlace', {
+    'id': fields.String(description='Place ID'),
+    'title': fields.String(description='Title of the place'),
+    'price': fields.Float(description='Price per night'),
+    'latitude': fields.Float(description='Latitude of the place'),
+    'longitude': fields.Float(description='Longitude of the place')
+})
+
+user_review_model = api.model('UserReview', {
+    'id': fields.String(description='Review ID'),
+    'text': fields.String(description='Text of the review'),
+    'rating': fields.Integer(description='Rating of the place'),
+    'place_id': fields.String(description='ID of the place')
+})
+
+# Everything ?fields= and ?include= can select on a user
+user_expanded_model = api.inherit('UserExpanded', user_response_model, {
+    'places': fields.List(fields.Nested(user_place_model), description='Owned places (with ?include=places)'),
+    'reviews': fields.List(fields.Nested(user_review_model), description='Written reviews (with ?include=reviews)')
+})
+
+shape_parser = api.parser()
+shape_parser.add_argument('fields', type=str, location='args',
+                          help='Comma-separated user fields to return, e.g. "id,first_name"')
+shape_parser.add_argument('include', type=str, location='args',
+                          help='Comma-separated relations to embed: places, reviews')
+
+list_parser = shape_parser.copy()
+list_parser.add_argument('ids', type=str, location='args',
+                         help='Comma-separated user IDs to fetch in one request')
+
+
+# Compiled once: shared by the users endpoints and the export (never the password)
+user_to_dict = compile_model(user_response_model)
+
 
 @api.route('/')
 class UserList(Resource):
@@ -56,43 +104,52 @@ class UserList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
-        return {
-            'id': new_user.id,
-            'first_name': new_user.first_name,
-            'last_name': new_user.last_name,
-            'email': new_user.email
-        }, 201
+        return user_to_dict(new_user), 201
 
+    @api.expect(list_parser)
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(304, 'Users not modified')
+    @api.response(400, 'Invalid ids, fields or include parameters')
     def get(self):
-        """Retrieve a list of all users"""
-        users = facade.get_all_users()
-        return [
-            {
-                'id': user.id,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'email': user.email
-            }
-            for user in users
-        ], 200
+        """Retrieve a list of all users, or the users listed in ids"""
+        try:
+            shape = parse_shape(user_expanded_model)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        fields_, include = shape or (None, None)
+        serialize = shaped_serializer(user_expanded_model, shape) if shape else user_to_dict
+        if 'ids' in request.args:
+            return multi_get('users', serialize, shape)
+        users = facade.get_all_users(fields_, include)
+        versioned = with_related(users, lambda user: included_objects(user, include or []))
+        return conditional(entity_etag(*versioned), latest(*(obj.updated_at for obj in versioned)),
+                           lambda: ([serialize(user) for user in users], 200))
 
 
 @api.route('/<user_id>')
 class UserResource(Resource):
+    @api.expect(shape_parser)
     @api.response(200, 'User details retrieved successfully')
+    @api.response(304, 'User not modified')
+    @api.response(400, 'Invalid fields or include parameters')
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID"""
-        user = facade.get_user(user_id)
+        try:
+            shape = parse_shape(user_expanded_model)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        fields_, include = shape or (None, None)
+        user = facade.get_user(user_id, fields_, include)
         if not user:
             return {'error': 'User not found'}, 404
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email
-        }, 200
+        serialize = shaped_serializer(user_expanded_model, shape) if shape else user_to_dict
+        related = included_objects(user, include or [])
+        return conditional(
+            entity_etag(user, *related),
+            latest(user.updated_at, *(obj.updated_at for obj in related)),
+            lambda: (serialize(user), 200)
+        )
 
     @api.expect(user_update_model)
     @api.response(200, 'User successfully updated')
@@ -107,7 +164,7 @@ class UserResource(Resource):
         is_admin = claims.get('is_admin', False)
 
         # Check if user is trying to modify their own data or is admin
-        if current_user_id != user_id and not is_admin:
+        if canonical_id(current_user_id) != canonical_id(user_id) and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
         user_data = dict(api.payload or {})
@@ -133,9 +190,4 @@ class UserResource(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
-        return {
-            'id': updated_user.id,
-            'first_name': updated_user.first_name,
-            'last_name': updated_user.last_name,
-            'email': updated_user.email
-        }, 200
\ No newline at end of file
+        return user_to_dict(updated_user), 200
\ No newline at end of file
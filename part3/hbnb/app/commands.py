@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Management commands, run with ``flask --app run <command>``."""
+
+import time
+
+import click
+
+
+@click.command('recompute-ratings')
+def recompute_ratings_command():
+    """Rebuild every place's review_count and rating_sum from its reviews."""
+    from app.services import facade
+    updated = facade.recompute_place_ratings()
+    click.echo(f"Recomputed rating aggregates for {updated} places.")
+
+
+@click.command('backfill-geo-cells')
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+def backfill_geo_cells_command(batch_size):
+    """Compute the search grid cell of every place that has none."""
+    from app import db
+    from app.persistence.migrations import backfill_geo_cells
+    filled = backfill_geo_cells(db.engine, batch_size)
+    click.echo(f"Filled the grid cell of {filled} places.")
+
+
+@click.command('init-db')
+def init_db_command():
+    """Create the database tables."""
+    from app import db
+    from app.persistence.migrations import stamp
+    db.create_all()
+    # The tables are created at the latest schema: no migration is pending
+    stamp(db.engine)
+    click.echo("Database tables created successfully.")
+
+
+@click.command('db-upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Stop after this version.')
+def db_upgrade_command(target):
+    """Apply the pending schema migrations."""
+    from app import db
+    from app.persistence.migrations import check_parity, upgrade
+    applied = upgrade(db.engine, target, log=click.echo)
+    click.echo(f"Applied {len(applied)} migrations.")
+    if target is None:
+        for problem in check_parity(db.engine):
+            click.echo(f"Schema drift: {problem}", err=True)
+
+
+@click.command('db-status')
+def db_status_command():
+    """List the schema migrations and whether they are applied."""
+    from app import db
+    from app.persistence.migrations import MIGRATIONS, applied_versions
+    applied = applied_versions(db.engine)
+    for step in MIGRATIONS:
+        state = 'applied' if step.version in applied else 'pending'
+        click.echo(f"{step.version:03d} {state:<8} {step.description}")
+
+
+@click.command('db-check')
+def db_check_command():
+    """Compare the live schema with the ORM models; fail on any difference."""
+    from app import db
+    from app.persistence.migrations import check_parity, pending_migrations
+    problems = [f"pending migration {step.version:03d} {step.description}"
+                for step in pending_migrations(db.engine)]
+    problems.extend(check_parity(db.engine))
+    for problem in problems:
+        click.echo(problem, err=True)
+    if problems:
+        raise click.ClickException(f"{len(problems)} schema differences")
+    click.echo("The schema matches the models.")
+
+
+@click.command('seed')
+def seed_command():
+    """Create the initial admin user and amenities if they are missing."""
+    from app.services import facade
+    admin_email = "admin@hbnb.io"
+    if not facade.get_user_by_email(admin_email):
+        facade.create_user({
+            'first_name': 'Admin',
+            'last_name': 'HBnB',
+            'email': admin_email,
+            'is_admin': True,
+            'password': 'admin1234'
+        })
+        click.echo(f"Admin user created: {admin_email} / admin1234")
+    else:
+        click.echo(f"Admin user already exists: {admin_email}")
+
+    for amenity_name in ['WiFi', 'Swimming Pool', 'Air Conditioning']:
+        if not facade.amenity_repo.get_amenity_by_name(amenity_name):
+            facade.create_amenity({'name': amenity_name})
+            click.echo(f"Amenity created: {amenity_name}")
+
+
+@click.command('sync-replicas')
+@click.option('--interval', type=float, default=0,
+              help='Seconds between copies; 0 copies once.')
+def sync_replicas_command(interval):
+    """Copy the primary SQLite database into the SQLite replica files."""
+    from flask import current_app
+    from app.persistence.replicas import sync_replicas
+    if current_app.extensions['replicas'] is None:
+        raise click.ClickException("No replica configured (DATABASE_REPLICA_URLS)")
+    app = current_app._get_current_object()
+    while True:
+        copied = sync_replicas(app)
+        click.echo(f"Copied the primary into {copied} replicas.")
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+@click.command('migrate-ids')
+@click.argument('source_url')
+@click.argument('target_url')
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+def migrate_ids_command(source_url, target_url, batch_size):
+    """Copy SOURCE_URL into a new TARGET_URL database with the configured ID_STORAGE."""
+    from app.persistence.id_migration import migrate_ids
+    try:
+        copied = migrate_ids(source_url, target_url, batch_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for table, count in copied.items():
+        click.echo(f"{table}: {count} rows")
+
+
+def register_commands(app):
+    """Attach the management commands to the app's CLI."""
+    app.cli.add_command(recompute_ratings_command)
+    app.cli.add_command(backfill_geo_cells_command)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(db_status_command)
+    app.cli.add_command(db_check_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(sync_replicas_command)
+    app.cli.add_command(migrate_ids_command)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Response compression negotiated on Accept-Encoding.
+
+Bodies of at least ``COMPRESS_MIN_SIZE`` bytes with a compressible media
+type are encoded with the first of ``COMPRESS_ALGORITHMS`` the client
+accepts (gzip always, br and zstd when their packages are installed).
+Responses carrying an ETag are compressed once per encoding: the encoded
+body is kept in an LRU keyed by path, ETag and encoding, so a hot
+collection is not recompressed on every hit. Each encoding is a different
+representation, so its ETag gets the encoding as a suffix (``"abc-gzip"``);
+``strip_encoding`` maps it back for the conditional-request check.
+"""
+
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, br is not offered without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, zstd is not offered without it
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+}
+
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=level)
+
+
+def _zstd(data, level):
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Encoding -> (encoder, config key of its level, whether its library is present)
+ENCODERS = {
+    'gzip': (_gzip, 'COMPRESS_GZIP_LEVEL', True),
+    'br': (_brotli, 'COMPRESS_BROTLI_LEVEL', brotli is not None),
+    'zstd': (_zstd, 'COMPRESS_ZSTD_LEVEL', zstandard is not None),
+}
+
+
+def strip_encoding(tag):
+    """Unquoted ETag without the encoding suffix added by compress_response."""
+    for name in ENCODERS:
+        if tag.endswith('-' + name):
+            return tag[:-len(name) - 1]
+    return tag
+
+
+def available_encodings(config):
+    """Encodings enabled by COMPRESS_ALGORITHMS and installed, in preference order."""
+    encodings = []
+    for name in config.get('COMPRESS_ALGORITHMS', '').split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in ENCODERS:
+            raise ValueError(f"Unknown compression algorithm: {name}")
+        if ENCODERS[name][2]:
+            encodings.append(name)
+    return encodings
+
+
+def compress_response(response):
+    """after_request hook encoding the body with the negotiated algorithm."""
+    encodings = current_app.extensions['compression_encodings']
+    if (not encodings
+            or response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or response.status_code == 204
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding is None:
+        return response
+
+    cache = current_app.extensions['compression_cache']
+    etag = response.headers.get('ETag')
+    tag, weak = response.get_etag()
+    key = f'{request.path}|{etag}|{encoding}' if etag else None
+    body = cache.get(key) if key else None
+    if body is None:
+        encode, level_key, _ = ENCODERS[encoding]
+        body = encode(data, current_app.config[level_key])
+        if key:
+            cache.set(key, body)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if tag:
+        response.set_etag(f'{tag}-{encoding}', weak)
+    return response
+
+
+def init_compression(app):
+    """Register response compression on the application."""
+    from app.services.cache import LRUTTLCache
+    app.extensions['compression_encodings'] = available_encodings(app.config)
+    app.extensions['compression_cache'] = LRUTTLCache(
+        app.config['COMPRESS_CACHE_MAX_ENTRIES'], app.config['CACHE_TTL_SECONDS'])
+    app.after_request(compress_response)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""bcrypt password hashing off the request thread.
+
+Hashes and checks run in a bounded process pool (``BCRYPT_POOL_SIZE``
+workers, 0 to run inline) so a login or user creation does not pin the
+CPU of the worker serving other requests. The pool processes are started
+by a forkserver (spawn where unavailable), never forked from a threaded
+worker, and ``BCRYPT_POOL_SIZE`` defaults to the CPUs per web worker so
+the host runs about one hashing process per CPU. At most two jobs per worker may
+be pending; a job that cannot be queued or finished within
+``BCRYPT_TIMEOUT_SECONDS`` raises PasswordHashingTimeout. The cost factor
+is ``BCRYPT_LOG_ROUNDS``.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt as _bcrypt
+
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+
+class PasswordHashingTimeout(RuntimeError):
+    """Raised when the hashing pool is saturated or a job runs too long."""
+
+
+def _pool_context():
+    """Start method of the pool: forkserver where available, else spawn."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _hash(password, rounds):
+    return _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(pw_hash, password):
+    return _bcrypt.checkpw(password.encode('utf-8'), pw_hash.encode('utf-8'))
+
+
+def hash_cost(pw_hash):
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12)."""
+    return int(pw_hash.split('$')[2])
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification in a bounded process pool."""
+
+    def __init__(self, rounds=12, pool_size=0, timeout=10.0):
+        """Initialize with the cost factor, the worker count and a timeout in seconds."""
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read BCRYPT_LOG_ROUNDS, BCRYPT_POOL_SIZE and BCRYPT_TIMEOUT_SECONDS."""
+        self.shutdown()
+        self.rounds = app.config['BCRYPT_LOG_ROUNDS']
+        self.pool_size = app.config['BCRYPT_POOL_SIZE']
+        self.timeout = app.config['BCRYPT_TIMEOUT_SECONDS']
+
+    def _run(self, func, *args):
+        """Run func in the pool (or inline without one) within the timeout."""
+        if not self.pool_size:
+            return func(*args)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_size,
+                                                     mp_context=_pool_context())
+                self._slots = threading.BoundedSemaphore(self.pool_size * 2)
+            executor, slots = self._executor, self._slots
+        deadline = time.monotonic() + self.timeout
+        if not slots.acquire(timeout=self.timeout):
+            raise PasswordHashingTimeout("Password hashing is saturated")
+        try:
+            future = executor.submit(func, *args)
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()
+                raise PasswordHashingTimeout("Password hashing timed out")
+        finally:
+            slots.release()
+
+    def hash(self, password):
+        """Return the bcrypt hash of password at the configured cost."""
+        return self._run(_hash, password, self.rounds)
+
+    def check(self, pw_hash, password):
+        """Whether password matches the bcrypt hash."""
+        return self._run(_check, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """Whether a stored hash uses a cost other than the configured one."""
+        return hash_cost(pw_hash) != self.rounds
+
+    def shutdown(self):
+        """Stop the worker processes (a new pool starts on next use)."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
-import uuid
 from datetime import datetime
 from app import db
+from app.models.ids import EntityId, new_id
+from app.persistence.unit_of_work import save_changes
 
 
 class BaseModel(db.Model):
@@ -10,14 +11,14 @@ class BaseModel(db.Model):
 
     __abstract__ = True  # This ensures SQLAlchemy does not create a table for BaseModel
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(EntityId(), primary_key=True, default=new_id)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def save(self):
         """Update the updated_at timestamp whenever the object is modified."""
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+        save_changes()
 
     def update(self, data):
         """Update the attributes of the object based on the provided dictionary."""
@@ -29,4 +30,4 @@ class BaseModel(db.Model):
     def delete(self):
         """Delete the object from the database."""
         db.session.delete(self)
-        db.session.commit()
\ No newline at end of file
+        save_changes()
\ No newline at end of file
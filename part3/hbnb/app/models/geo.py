@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Grid cell helpers for geospatial place search.
+
+The globe is split into square cells of ``CELL_DEGREES`` degrees. Each cell
+gets an integer number laid out row by row (latitude) then column by column
+(longitude), so the cells of one latitude row covering a longitude interval
+form a contiguous integer range that an index can scan.
+"""
+
+import math
+
+CELL_DEGREES = 0.1
+GRID_ROWS = int(round(180 / CELL_DEGREES))
+GRID_COLS = int(round(360 / CELL_DEGREES))
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+MAX_CELL_RANGES = 400
+
+
+def _row(latitude):
+    """Grid row of a latitude."""
+    return min(int((latitude + 90.0) / CELL_DEGREES), GRID_ROWS - 1)
+
+
+def _col(longitude):
+    """Grid column of a longitude."""
+    return min(int((longitude + 180.0) / CELL_DEGREES), GRID_COLS - 1)
+
+
+def geo_cell(latitude, longitude):
+    """Return the grid cell number containing a coordinate."""
+    return _row(latitude) * GRID_COLS + _col(longitude)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two coordinates in kilometers."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bounds(latitude, longitude, radius_km):
+    """Bounding box (min_lat, min_lng, max_lat, max_lng) enclosing a circle.
+
+    ``min_lng > max_lng`` means the box crosses the antimeridian.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat = max(-90.0, latitude - dlat)
+    max_lat = min(90.0, latitude + dlat)
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 90.0:
+        return min_lat, -180.0, max_lat, 180.0
+    dlng = dlat / math.cos(math.radians(widest))
+    if dlng >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    min_lng = longitude - dlng
+    max_lng = longitude + dlng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def cell_ranges(min_lat, min_lng, max_lat, max_lng):
+    """Return merged (low, high) cell number ranges covering a bounding box."""
+    if min_lng <= max_lng:
+        cols = [(_col(min_lng), _col(max_lng))]
+    else:
+        cols = [(0, _col(max_lng)), (_col(min_lng), GRID_COLS - 1)]
+
+    ranges = []
+    for row in range(_row(min_lat), _row(max_lat) + 1):
+        base = row * GRID_COLS
+        for low, high in cols:
+            if ranges and ranges[-1][1] + 1 == base + low:
+                ranges[-1] = (ranges[-1][0], base + high)
+            else:
+                ranges.append((base + low, base + high))
+
+    if len(ranges) > MAX_CELL_RANGES:
+        raise ValueError("Search area is too large")
+    return ranges
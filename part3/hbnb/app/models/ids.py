@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Entity IDs: generation strategy and column storage.
+
+``ID_STRATEGY`` picks how new IDs are generated:
+
+- ``uuid4``: random UUIDs, the historical format;
+- ``uuid7``: UUIDv7, a 48-bit millisecond timestamp followed by random bits,
+  so new rows land at the end of the primary-key and foreign-key indexes;
+- ``ulid``: the same 128-bit layout, written as 26 Crockford base32 characters.
+
+``ID_STORAGE`` picks the column type of every ID and foreign key: ``text``
+(``VARCHAR(36)``, values stored as given) or ``binary`` (the 16 raw bytes).
+With binary storage any accepted text form (hyphenated or plain-hex UUID,
+ULID) designates the same row, and IDs read back in the canonical form of
+the strategy. Switching storage on an existing database needs
+``flask --app run migrate-ids`` (see app/persistence/id_migration.py).
+
+The settings are kept per app (``app.extensions['ids']``) and read from the
+current app; outside an app context the historical ``uuid4``/``text`` apply.
+"""
+
+import os
+import time
+import uuid
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy.types import LargeBinary, String, TypeDecorator
+
+ID_STRATEGIES = ('uuid4', 'uuid7', 'ulid')
+ID_STORAGES = ('text', 'binary')
+CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_CROCKFORD_VALUES = {char: index for index, char in enumerate(CROCKFORD)}
+_CROCKFORD_VALUES.update({'I': 1, 'L': 1, 'O': 0})
+_MAX_ID = (1 << 128) - 1
+
+IdSettings = namedtuple('IdSettings', 'strategy storage')
+_DEFAULT_SETTINGS = IdSettings('uuid4', 'text')
+
+
+def configure_ids(app):
+    """Validate ID_STRATEGY and ID_STORAGE and store them on the app."""
+    strategy, storage = app.config['ID_STRATEGY'], app.config['ID_STORAGE']
+    if strategy not in ID_STRATEGIES:
+        raise ValueError(f"ID_STRATEGY must be one of {', '.join(ID_STRATEGIES)}")
+    if storage not in ID_STORAGES:
+        raise ValueError(f"ID_STORAGE must be one of {', '.join(ID_STORAGES)}")
+    app.extensions['ids'] = IdSettings(strategy, storage)
+
+
+def id_settings():
+    """ID settings of the current app."""
+    if has_app_context():
+        return current_app.extensions.get('ids', _DEFAULT_SETTINGS)
+    return _DEFAULT_SETTINGS
+
+
+def _time_ordered_int():
+    """48-bit Unix time in milliseconds followed by 80 random bits."""
+    millis = time.time_ns() // 1_000_000
+    return (millis & ((1 << 48) - 1)) << 80 | int.from_bytes(os.urandom(10), 'big')
+
+
+def uuid7():
+    """A new UUIDv7 in its hyphenated text form."""
+    value = _time_ordered_int()
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+
+def encode_ulid(value):
+    """Crockford base32 text (26 characters) of a 128-bit integer."""
+    chars = []
+    for _ in range(26):
+        chars.append(CROCKFORD[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def decode_ulid(text):
+    """128-bit integer of a ULID; raises ValueError if it is not one."""
+    if len(text) != 26:
+        raise ValueError("Invalid ULID")
+    value = 0
+    for char in text.upper():
+        if char not in _CROCKFORD_VALUES:
+            raise ValueError("Invalid ULID")
+        value = value * 32 + _CROCKFORD_VALUES[char]
+    if value > _MAX_ID:
+        raise ValueError("Invalid ULID")
+    return value
+
+
+def ulid():
+    """A new ULID."""
+    return encode_ulid(_time_ordered_int())
+
+
+def new_id():
+    """A new entity ID following ID_STRATEGY."""
+    strategy = id_settings().strategy
+    if strategy == 'uuid7':
+        return uuid7()
+    if strategy == 'ulid':
+        return ulid()
+    return str(uuid.uuid4())
+
+
+def id_to_int(value):
+    """128-bit integer of an ID given as text (UUID or ULID) or 16 bytes."""
+    if isinstance(value, (bytes, bytearray)):
+        if len(value) != 16:
+            raise ValueError("Invalid ID")
+        return int.from_bytes(value, 'big')
+    if not isinstance(value, str):
+        raise ValueError("Invalid ID")
+    if len(value) == 26:
+        return decode_ulid(value)
+    return uuid.UUID(value).int
+
+
+def int_to_id(value):
+    """Canonical text of a 128-bit ID for the configured strategy."""
+    if id_settings().strategy == 'ulid':
+        return encode_ulid(value)
+    return str(uuid.UUID(int=value))
+
+
+def canonical_id(value):
+    """The form IDs are read back in, so any accepted form maps to one cache key.
+
+    Text storage keeps IDs exactly as stored; invalid IDs are returned unchanged.
+    """
+    if value is None or id_settings().storage == 'text':
+        return value
+    try:
+        return int_to_id(id_to_int(value))
+    except ValueError:
+        return value
+
+
+class EntityId(TypeDecorator):
+    """Column type of entity IDs and the foreign keys pointing at them."""
+
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        """VARCHAR(36) with text storage, 16-byte BLOB/BYTEA with binary storage."""
+        if id_settings().storage == 'binary':
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        """Convert an ID to the stored form."""
+        if value is None:
+            return None
+        if id_settings().storage == 'text':
+            return int_to_id(id_to_int(value)) if isinstance(value, (bytes, bytearray)) else value
+        try:
+            return id_to_int(value).to_bytes(16, 'big')
+        except ValueError:
+            # An ID that cannot be parsed matches no row
+            return b''
+
+    def process_result_value(self, value, dialect):
+        """Convert a stored ID to its text form."""
+        if value is None or isinstance(value, str):
+            return value
+        return int_to_id(int.from_bytes(value, 'big'))
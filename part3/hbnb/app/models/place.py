@@ -3,12 +3,16 @@
 
 from app import db
 from app.models import BaseModel
+from app.models.ids import EntityId
+from app.models.geo import geo_cell
 
 
 # Association table for many-to-many relationship between Place and Amenity
 place_amenity = db.Table('place_amenity',
-    db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
+    db.Column('place_id', EntityId(), db.ForeignKey('places.id'), primary_key=True),
+    db.Column('amenity_id', EntityId(), db.ForeignKey('amenities.id'), primary_key=True),
+    # The primary key covers lookups by place; this one serves lookups by amenity
+    db.Index('idx_place_amenity_amenity', 'amenity_id')
 )
 
 
@@ -22,11 +26,27 @@ class Place(BaseModel):
     _price = db.Column('price', db.Float, nullable=False)
     _latitude = db.Column('latitude', db.Float, nullable=False)
     _longitude = db.Column('longitude', db.Float, nullable=False)
-    _owner_id = db.Column('owner_id', db.String(36), db.ForeignKey('users.id'), nullable=False)
+    _owner_id = db.Column('owner_id', EntityId(), db.ForeignKey('users.id'), nullable=False)
+    # Grid cell of (latitude, longitude), kept in sync by the coordinate setters
+    _geo_cell = db.Column('geo_cell', db.Integer)
+    # Review aggregates maintained by the facade on review writes
+    _review_count = db.Column('review_count', db.Integer, nullable=False, default=0)
+    _rating_sum = db.Column('rating_sum', db.Integer, nullable=False, default=0)
+
+    # Composite index backing keyset pagination on (created_at, id)
+    __table_args__ = (
+        db.Index('idx_places_owner', 'owner_id'),
+        db.Index('idx_places_created_at_id', 'created_at', 'id'),
+        db.Index('idx_places_geo_cell', 'geo_cell'),
+    )
+
+    # Columns read by derived properties, for sparse loads (?fields=)
+    FIELD_COLUMNS = {'average_rating': ('_review_count', '_rating_sum')}
 
     # Relationships
     reviews = db.relationship('Review', backref='place', lazy=True, cascade='all, delete-orphan')
-    amenities = db.relationship('Amenity', secondary=place_amenity, lazy='subquery',
+    # Loaded lazily by default; PlaceRepository eager-loads it for reads
+    amenities = db.relationship('Amenity', secondary=place_amenity, lazy=True,
                                  backref=db.backref('places', lazy=True))
 
     def __init__(self, title, description, price, latitude, longitude, owner=None, owner_id=None, **kwargs):
@@ -95,6 +115,7 @@ class Place(BaseModel):
         if value < -90.0 or value > 90.0:
             raise ValueError("Latitude must be between -90.0 and 90.0")
         self._latitude = float(value)
+        self._update_geo_cell()
 
     @property
     def longitude(self):
@@ -109,6 +130,12 @@ class Place(BaseModel):
         if value < -180.0 or value > 180.0:
             raise ValueError("Longitude must be between -180.0 and 180.0")
         self._longitude = float(value)
+        self._update_geo_cell()
+
+    def _update_geo_cell(self):
+        """Recompute the grid cell once both coordinates are known."""
+        if self._latitude is not None and self._longitude is not None:
+            self._geo_cell = geo_cell(self._latitude, self._longitude)
 
     @property
     def owner_id(self):
@@ -120,10 +147,29 @@ class Place(BaseModel):
         """Set the owner ID."""
         self._owner_id = value
 
+    @property
+    def review_count(self):
+        """Get the number of reviews."""
+        return self._review_count or 0
+
+    @property
+    def average_rating(self):
+        """Get the average review rating, or None without reviews."""
+        if not self._review_count:
+            return None
+        return round(self._rating_sum / self._review_count, 2)
+
     def add_review(self, review):
         """Add a review to the place."""
         self.reviews.append(review)
 
+    def set_amenities(self, amenities):
+        """Replace the amenities, keeping the first occurrence of each one."""
+        unique = {}
+        for amenity in amenities:
+            unique.setdefault(amenity.id, amenity)
+        self.amenities = list(unique.values())
+
     def add_amenity(self, amenity):
         """Add an amenity to the place."""
         if amenity not in self.amenities:
@@ -3,6 +3,7 @@
 
 from app import db
 from app.models import BaseModel
+from app.models.ids import EntityId
 
 
 class Review(BaseModel):
@@ -12,12 +13,14 @@ class Review(BaseModel):
 
     _text = db.Column('text', db.Text, nullable=False)
     _rating = db.Column('rating', db.Integer, nullable=False)
-    _place_id = db.Column('place_id', db.String(36), db.ForeignKey('places.id'), nullable=False)
-    _user_id = db.Column('user_id', db.String(36), db.ForeignKey('users.id'), nullable=False)
+    _place_id = db.Column('place_id', EntityId(), db.ForeignKey('places.id'), nullable=False)
+    _user_id = db.Column('user_id', EntityId(), db.ForeignKey('users.id'), nullable=False)
 
     # Add unique constraint: one review per user per place
     __table_args__ = (
         db.UniqueConstraint('user_id', 'place_id', name='unique_user_place_review'),
+        db.Index('idx_reviews_place', 'place_id'),
+        db.Index('idx_reviews_user', 'user_id'),
     )
 
     def __init__(self, text, rating, place=None, user=None, place_id=None, user_id=None, **kwargs):
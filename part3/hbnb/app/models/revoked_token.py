@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""Revoked token model module."""
+
+from app import db
+
+
+class RevokedToken(db.Model):
+    """An access token revoked by logout, kept until the token expires.
+
+    The table is shared by every worker process, so a logout on one worker
+    is refused by all of them.
+    """
+
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = (
+        db.Index('idx_revoked_tokens_expires_at', 'expires_at'),
+    )
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.Float, nullable=True)  # UNIX time; NULL for tokens without exp
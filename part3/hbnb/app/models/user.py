@@ -2,7 +2,8 @@
 """User model module."""
 
 import re
-from app import db, bcrypt
+from app import db, hasher
+from app.hashing import BCRYPT_PREFIXES
 from app.models import BaseModel
 
 
@@ -97,11 +98,11 @@ class User(BaseModel):
             raise ValueError("Password is required and must be a string")
 
         # Keep already-hashed bcrypt strings untouched.
-        if value.startswith('$2a$') or value.startswith('$2b$') or value.startswith('$2y$'):
+        if value.startswith(BCRYPT_PREFIXES):
             self._password = value
             return
 
-        self._password = bcrypt.generate_password_hash(value).decode('utf-8')
+        self._password = hasher.hash(value)
 
     def hash_password(self, password):
         """Hashes the password before storing it."""
@@ -111,7 +112,11 @@ class User(BaseModel):
         """Verifies if the provided password matches the hashed password."""
         if not self.password:
             return False
-        return bcrypt.check_password_hash(self.password, password)
+        return hasher.check(self.password, password)
+
+    def needs_rehash(self):
+        """Whether the stored hash uses a cost other than BCRYPT_LOG_ROUNDS."""
+        return hasher.needs_rehash(self.password)
 
     @staticmethod
     def create_user(first_name, last_name, email, password=None, is_admin=False):
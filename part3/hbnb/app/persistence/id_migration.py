@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Copy a database into a new one with the configured ID storage.
+
+The source is read with reflected tables, so its IDs come back exactly as
+stored (text or 16 bytes). Rows are written through the app's own table
+definitions, whose EntityId columns convert every ID and foreign key to the
+target ``ID_STORAGE``. Tables are copied parents first, ``batch_size`` rows
+per INSERT. The source database is left untouched.
+
+The target is created at the latest schema and stamped with every
+migration, so the source must be at the latest schema too (run
+``db-upgrade`` on it first); otherwise nothing is copied.
+"""
+
+from sqlalchemy import MetaData, create_engine, insert, select
+
+from app.persistence.migrations import check_parity, stamp
+
+
+def migrate_ids(source_url, target_url, batch_size=1000):
+    """Copy every table of source_url into target_url; return {table: row count}.
+
+    Raises ValueError when the source schema is behind the models.
+    """
+    from app import db
+    source = create_engine(source_url)
+    target = create_engine(target_url)
+    copied = {}
+    try:
+        problems = check_parity(source)
+        if problems:
+            raise ValueError("The source schema is behind the models, run db-upgrade on it first: "
+                             + '; '.join(problems))
+        reflected = MetaData()
+        reflected.reflect(source)
+        db.metadata.create_all(target)
+        with source.connect() as reader, target.begin() as writer:
+            for table in db.metadata.sorted_tables:
+                if table.name not in reflected.tables:
+                    continue
+                source_table = reflected.tables[table.name]
+                columns = [column.name for column in table.columns if column.name in source_table.c]
+                result = reader.execution_options(yield_per=batch_size).execute(
+                    select(*(source_table.c[name] for name in columns)))
+                copied[table.name] = 0
+                for rows in result.partitions():
+                    writer.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+                    copied[table.name] += len(rows)
+        stamp(target)
+    finally:
+        source.dispose()
+        target.dispose()
+    return copied
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Versioned schema migrations.
+
+Each migration has a version number and an ``upgrade(engine)`` function.
+Applied versions are recorded in the ``schema_migrations`` table. Every
+migration is idempotent: it checks the live schema before changing it, so
+a database created by ``db.create_all()`` (already at the latest schema)
+simply gets stamped. ``flask --app run db-upgrade`` applies the pending
+migrations, ``db-status`` lists them, and ``db-check`` compares the live
+schema with the ORM models.
+
+Indexes are built online: ``CREATE INDEX CONCURRENTLY`` on PostgreSQL,
+``ALGORITHM=INPLACE, LOCK=NONE`` on MySQL. SQLite has no online build, so
+each index gets its own short transaction; in WAL mode readers are never
+blocked, and writers wait (up to ``busy_timeout``) only for that one index.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+
+Migration = namedtuple('Migration', 'version description upgrade')
+
+MIGRATIONS = []
+
+_meta = MetaData()
+schema_migrations = Table(
+    'schema_migrations', _meta,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def migration(version, description):
+    """Register the decorated upgrade(engine) function as a migration."""
+    def register(upgrade):
+        assert not MIGRATIONS or MIGRATIONS[-1].version < version, "Migrations must be in order"
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        return upgrade
+    return register
+
+
+# ==================== Framework ====================
+
+def applied_versions(engine):
+    """Versions recorded in schema_migrations."""
+    _meta.create_all(engine)
+    with engine.connect() as connection:
+        return set(connection.scalars(select(schema_migrations.c.version)))
+
+
+def pending_migrations(engine):
+    """Migrations not applied yet, in order."""
+    applied = applied_versions(engine)
+    return [step for step in MIGRATIONS if step.version not in applied]
+
+
+def _record(engine, step):
+    with engine.begin() as connection:
+        connection.execute(schema_migrations.insert().values(
+            version=step.version, description=step.description, applied_at=datetime.utcnow()))
+
+
+def upgrade(engine, target=None, log=print):
+    """Apply the pending migrations up to target (default: all); return them."""
+    applied = []
+    for step in pending_migrations(engine):
+        if target is not None and step.version > target:
+            break
+        log(f"Applying {step.version:03d} {step.description}")
+        step.upgrade(engine)
+        _record(engine, step)
+        applied.append(step)
+    return applied
+
+
+def stamp(engine):
+    """Record every migration as applied (for a schema created by create_all)."""
+    for step in pending_migrations(engine):
+        _record(engine, step)
+
+
+def check_parity(engine, metadata=None):
+    """Differences between the ORM models and the live schema, as messages.
+
+    Reports the tables, columns and indexes the models declare but the
+    database lacks, and indexes whose columns differ. Extra database
+    objects are allowed.
+    """
+    if metadata is None:
+        from app import db
+        metadata = db.metadata
+    inspector = inspect(engine)
+    problems = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            problems.append(f"missing table {table.name}")
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        problems.extend(f"missing column {table.name}.{column.name}"
+                        for column in table.columns if column.name not in columns)
+        indexes = {index['name']: tuple(index['column_names'])
+                   for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            expected = tuple(column.name for column in index.columns)
+            if index.name not in indexes:
+                problems.append(f"missing index {index.name} on {table.name}({', '.join(expected)})")
+            elif indexes[index.name] != expected:
+                problems.append(f"index {index.name} is on ({', '.join(indexes[index.name])}), "
+                                f"expected ({', '.join(expected)})")
+    return problems
+
+
+# ==================== Helpers ====================
+
+def add_column(engine, table, name, ddl):
+    """ALTER TABLE ... ADD COLUMN unless it exists; whether it was added."""
+    if name in {column['name'] for column in inspect(engine).get_columns(table)}:
+        return False
+    with engine.begin() as connection:
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
+    return True
+
+
+def create_index_online(engine, table, name, columns):
+    """Build an index without blocking the table for the build, if it is missing."""
+    if name in {index['name'] for index in inspect(engine).get_indexes(table)}:
+        return False
+    column_list = ', '.join(columns)
+    dialect = engine.dialect.name
+    if dialect == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction block
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column_list})'))
+        return True
+    if dialect in ('mysql', 'mariadb'):
+        statement = f'CREATE INDEX {name} ON {table} ({column_list}) ALGORITHM=INPLACE LOCK=NONE'
+    else:
+        statement = f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({column_list})'
+    with engine.begin() as connection:
+        connection.execute(text(statement))
+    return True
+
+
+def backfill_geo_cells(engine, batch_size=1000):
+    """Fill places.geo_cell where it is NULL; return the number of places filled.
+
+    Runs one short transaction per batch_size places, so writers are only
+    held up for one batch at a time.
+    """
+    from app.models.geo import geo_cell
+    filled = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(text(
+                'SELECT id, latitude, longitude FROM places WHERE geo_cell IS NULL LIMIT :limit'),
+                {'limit': batch_size}).all()
+            if not rows:
+                return filled
+            connection.execute(text('UPDATE places SET geo_cell = :cell WHERE id = :id'),
+                               [{'cell': geo_cell(lat, lng), 'id': place_id}
+                                for place_id, lat, lng in rows])
+        filled += len(rows)
+
+
+# ==================== Migrations ====================
+
+@migration(1, 'base tables')
+def create_base_tables(engine):
+    """Create the tables of a new database (existing ones are left as they are)."""
+    from app import db
+    db.metadata.create_all(engine, checkfirst=True)
+
+
+@migration(2, 'place geo cell and review aggregates')
+def add_place_derived_columns(engine, batch_size=1000):
+    """Add and backfill places.geo_cell, review_count and rating_sum."""
+    add_column(engine, 'places', 'geo_cell', 'INTEGER')
+    counts_added = add_column(engine, 'places', 'review_count', 'INTEGER NOT NULL DEFAULT 0')
+    sums_added = add_column(engine, 'places', 'rating_sum', 'INTEGER NOT NULL DEFAULT 0')
+
+    backfill_geo_cells(engine, batch_size)
+    if counts_added or sums_added:
+        # The same UPDATE as recompute-ratings, so both paths agree on the aggregates
+        from app.persistence.repository import rating_aggregates_update
+        with engine.begin() as connection:
+            connection.execute(rating_aggregates_update())
+
+
+@migration(3, 'keyset pagination and geo indexes')
+def add_place_search_indexes(engine):
+    """Indexes of cursor pagination and of the geospatial search."""
+    create_index_online(engine, 'places', 'idx_places_created_at_id', ('created_at', 'id'))
+    create_index_online(engine, 'places', 'idx_places_geo_cell', ('geo_cell',))
+
+
+@migration(4, 'foreign key lookup indexes')
+def add_foreign_key_indexes(engine):
+    """Indexes of the owner, place, user and amenity lookups."""
+    create_index_online(engine, 'places', 'idx_places_owner', ('owner_id',))
+    create_index_online(engine, 'reviews', 'idx_reviews_place', ('place_id',))
+    create_index_online(engine, 'reviews', 'idx_reviews_user', ('user_id',))
+    create_index_online(engine, 'place_amenity', 'idx_place_amenity_amenity', ('amenity_id',))
+
+
+@migration(5, 'revoked tokens')
+def create_revoked_tokens(engine):
+    """Table of the access tokens revoked by logout, shared by every worker."""
+    from app.models.revoked_token import RevokedToken
+    RevokedToken.__table__.create(engine, checkfirst=True)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Read-replica routing with read-your-writes.
+
+``SQLALCHEMY_REPLICA_URIS`` gives one engine per replica, kept on the app
+(``app.extensions['replicas']``) rather than registered as Flask-SQLAlchemy
+binds, so other apps of the process never see them. The session routes
+SELECTs to one replica, chosen round-robin once per session (i.e. per
+request). Writes, and reads inside a unit of work, go to the primary; the
+repositories refresh the rows a unit of work reads, so an object first read
+from a lagging replica is never written from its stale state.
+
+After a write, the session reads from the primary for the rest of the
+request. The response also carries a token (the ``X-Primary-Until``
+header and a cookie of the same name) that keeps the client's following
+requests on the primary for ``REPLICA_PIN_SECONDS``, to cover the
+replication lag. The token is signed with the app's ``SECRET_KEY``.
+
+``sync_replicas`` copies the primary into SQLite replica files with
+SQLite's online backup API (``flask --app run sync-replicas``), which is
+enough to run replicas locally.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app, has_app_context, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, Signer
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+from app.persistence.unit_of_work import in_unit_of_work
+
+PIN_HEADER = 'X-Primary-Until'
+PIN_COOKIE = 'primary_until'
+_PINNED = 'replica_pinned'
+_REPLICA = 'replica_index'
+_TOKEN_SALT = 'primary-until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaSet:
+    """Engines of the replicas, chosen round-robin, and read counters."""
+
+    def __init__(self, engines, pin_seconds=5.0):
+        """Initialize with the replicas' engines and the read-your-writes window."""
+        self.engines = list(engines)
+        self.pin_seconds = pin_seconds
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self._next = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+
+    def choose(self):
+        """Index of the next replica."""
+        with self._lock:
+            return next(self._next)
+
+    def as_dict(self):
+        """Return the replicas and the read counters."""
+        return {
+            'replicas': len(self.engines),
+            'primary_reads': self.primary_reads,
+            'replica_reads': self.replica_reads
+        }
+
+
+class RoutingSession(Session):
+    """Session sending reads to a replica unless they must see the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        """Pick the replica for a SELECT on the default bind, the primary otherwise."""
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        replicas = current_app.extensions.get('replicas') if has_app_context() else None
+        if bind is not None or replicas is None or primary is not self._db.engines.get(None):
+            return primary
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info[_PINNED] = True
+            return primary
+        if not getattr(clause, 'is_select', False):
+            return primary
+        if self.info.get(_PINNED) or in_unit_of_work(self):
+            replicas.primary_reads += 1
+            return primary
+        replicas.replica_reads += 1
+        if _REPLICA not in self.info:
+            self.info[_REPLICA] = replicas.choose()
+        return replicas.engines[self.info[_REPLICA]]
+
+
+def pinned_to_primary():
+    """Whether reads of the current session must come from the primary (replicas only)."""
+    from app import db
+    return current_app.extensions.get('replicas') is not None and db.session.info.get(_PINNED, False)
+
+
+def _signer():
+    return Signer(current_app.secret_key, salt=_TOKEN_SALT)
+
+
+def pin_from_token():
+    """before_request hook: keep a client that wrote recently on the primary."""
+    from app import db
+    token = request.headers.get(PIN_HEADER) or request.cookies.get(PIN_COOKIE)
+    if not token:
+        return None
+    try:
+        until = float(_signer().unsign(token))
+    except (BadSignature, ValueError):
+        return None
+    now = time.time()
+    # A token further away than one window was not issued with this configuration
+    if now < until <= now + current_app.extensions['replicas'].pin_seconds:
+        db.session.info[_PINNED] = True
+    return None
+
+
+def issue_token(response):
+    """after_request hook: hand a read-your-writes token to a client that wrote."""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return response
+    pin_seconds = current_app.extensions['replicas'].pin_seconds
+    until = _signer().sign(f"{time.time() + pin_seconds:.3f}").decode('ascii')
+    response.headers[PIN_HEADER] = until
+    response.set_cookie(PIN_COOKIE, until, max_age=int(pin_seconds) + 1, httponly=True, samesite='Lax')
+    return response
+
+
+def sync_replicas(app):
+    """Copy the primary SQLite database into every SQLite replica file; returns the count."""
+    from app import db
+    with app.app_context():
+        source = db.engine.url
+    targets = [engine.url for engine in app.extensions['replicas'].engines]
+    if source.get_backend_name() != 'sqlite' or not source.database:
+        raise ValueError("Replica sync needs a SQLite file as the primary")
+    copied = 0
+    primary = sqlite3.connect(source.database)
+    try:
+        for target in targets:
+            if target.get_backend_name() != 'sqlite' or not target.database:
+                continue
+            replica = sqlite3.connect(target.database)
+            try:
+                primary.backup(replica)
+            finally:
+                replica.close()
+            copied += 1
+    finally:
+        primary.close()
+    return copied
+
+
+def _replica_url(app, uri):
+    """URL of a replica, with relative SQLite paths in the instance folder like the primary."""
+    url = make_url(uri)
+    if (url.get_backend_name() == 'sqlite' and url.database
+            and url.database != ':memory:' and not os.path.isabs(url.database)):
+        url = url.set(database=os.path.join(app.instance_path, url.database))
+    return url
+
+
+def init_replicas(app):
+    """Create the engines of the SQLALCHEMY_REPLICA_URIS and register the token hooks."""
+    uris = app.config['SQLALCHEMY_REPLICA_URIS']
+    if not uris:
+        app.extensions['replicas'] = None
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    engines = [create_engine(_replica_url(app, uri), **options) for uri in uris]
+    app.extensions['replicas'] = ReplicaSet(engines, app.config['REPLICA_PIN_SECONDS'])
+    app.before_request(pin_from_token)
+    app.after_request(issue_token)
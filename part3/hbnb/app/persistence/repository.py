@@ -1,6 +1,44 @@
 #!/usr/bin/env python3
 
+import base64
+import json
 from abc import ABC, abstractmethod
+from datetime import datetime
+
+from app.models.ids import canonical_id
+from app.persistence.unit_of_work import in_unit_of_work, save_changes
+
+
+def encode_cursor(obj):
+    """Build an opaque pagination cursor from an object's (created_at, id)."""
+    raw = json.dumps([obj.created_at.isoformat(), obj.id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor back to its (created_at, id) pair."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        created_at, obj_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(obj_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def rating_aggregates_update():
+    """UPDATE recomputing every place's review_count and rating_sum from reviews.
+
+    One statement with correlated subqueries, shared by recompute-ratings
+    and the schema migration that adds the columns.
+    """
+    from sqlalchemy import func, select
+    from app.models.place import Place
+    from app.models.review import Review
+    places, reviews = Place.__table__, Review.__table__
+    count = select(func.count()).where(reviews.c.place_id == places.c.id).scalar_subquery()
+    total = select(func.coalesce(func.sum(reviews.c.rating), 0)).where(
+        reviews.c.place_id == places.c.id).scalar_subquery()
+    return places.update().values(review_count=count, rating_sum=total)
 
 
 class Repository(ABC):
@@ -66,25 +104,120 @@ class SQLAlchemyRepository(Repository):
         """Add an object to the database."""
         from app import db
         db.session.add(obj)
-        db.session.commit()
+        save_changes()
+
+    def read_options(self):
+        """Loader options applied to every read query (none by default)."""
+        return []
+
+    def shape_options(self, fields=None, include=()):
+        """Loader options for a sparse read of the given fields and relations.
+
+        ``fields`` are attribute names: a property ``title`` loads the
+        ``_title`` column and a derived property loads the columns listed in
+        the model's ``FIELD_COLUMNS``. None loads every column. Each included
+        relation is eager-loaded in batch (a JOIN for a single object, one
+        ``IN`` query for a collection); the others are not loaded at all.
+        Raises ValueError on an unknown name.
+        """
+        from sqlalchemy import inspect
+        from sqlalchemy.orm import configure_mappers, joinedload, load_only, selectinload
+        configure_mappers()  # backrefs exist once mappers are configured
+        mapper = inspect(self.model)
+        options = []
+        if fields is not None:
+            derived = getattr(self.model, 'FIELD_COLUMNS', {})
+            columns = {'created_at', 'updated_at'}  # needed for the ETag
+            for name in fields:
+                if name in derived:
+                    columns.update(derived[name])
+                elif '_' + name in mapper.column_attrs:
+                    columns.add('_' + name)
+                elif name in mapper.column_attrs:
+                    columns.add(name)
+                else:
+                    raise ValueError(f"Unknown field: {name}")
+            options.append(load_only(*(getattr(self.model, column) for column in sorted(columns))))
+        for name in include:
+            if name not in mapper.relationships:
+                raise ValueError(f"Unknown include: {name}")
+            relation = getattr(self.model, name)
+            if mapper.relationships[name].uselist:
+                options.append(selectinload(relation))
+            else:
+                options.append(joinedload(relation))
+        return options
+
+    def _query(self, options=None):
+        """Build the base read query with the given or the default loader options."""
+        if options is None:
+            options = self.read_options()
+        return self.model.query.options(*options)
+
+    def add_many(self, objs):
+        """Stage objects for insertion and flush them; the caller commits.
+
+        The unit of work groups the INSERTs into executemany batches.
+        """
+        from app import db
+        db.session.add_all(objs)
+        db.session.flush()
 
-    def get(self, obj_id):
-        """Get an object by its ID."""
+    def get(self, obj_id, options=None):
+        """Get an object by its ID.
+
+        Inside a unit of work the row is always read again, so an instance
+        already in the session (a cached snapshot, or a read from a lagging
+        replica) is refreshed before it is written.
+        """
         from app import db
-        return db.session.get(self.model, obj_id)
+        if options is None:
+            options = self.read_options()
+        return db.session.get(self.model, obj_id, options=options,
+                              populate_existing=in_unit_of_work())
 
-    def get_all(self):
+    def get_all(self, options=None):
         """Get all objects of this model."""
-        return self.model.query.all()
+        return self._query(options).all()
+
+    def existing_ids(self, obj_ids):
+        """Return the subset of obj_ids that exist, without loading objects."""
+        from app import db
+        if not obj_ids:
+            return set()
+        model = self.model
+        found = set(db.session.scalars(db.select(model.id).where(model.id.in_(obj_ids))))
+        return {obj_id for obj_id in obj_ids if canonical_id(obj_id) in found}
+
+    def get_many(self, obj_ids, options=None):
+        """Get the objects whose IDs are in obj_ids with a single IN query.
+
+        Objects come back in the order of obj_ids; unknown IDs are skipped.
+        """
+        if not obj_ids:
+            return []
+        query = self._query(options).filter(self.model.id.in_(obj_ids))
+        if in_unit_of_work():
+            query = query.populate_existing()
+        found = {obj.id: obj for obj in query}
+        return [found[canonical_id(obj_id)] for obj_id in dict.fromkeys(obj_ids)
+                if canonical_id(obj_id) in found]
+
+    def iter_all(self, batch_size=1000):
+        """Iterate over all objects, fetching batch_size rows at a time.
+
+        Rows are streamed from a server-side cursor (``yield_per``) instead of
+        being materialized in one list, so memory stays bounded.
+        """
+        return self._query().yield_per(batch_size)
 
     def update(self, obj_id, data):
         """Update an object with the given data."""
-        from app import db
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            save_changes()
         return obj
 
     def delete(self, obj_id):
@@ -93,13 +226,36 @@ class SQLAlchemyRepository(Repository):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            save_changes()
             return True
         return False
 
     def get_by_attribute(self, attr_name, attr_value):
         """Get an object by a specific attribute."""
-        return self.model.query.filter_by(**{attr_name: attr_value}).first()
+        return self._query().filter_by(**{attr_name: attr_value}).first()
+
+    def get_page(self, limit, cursor=None, options=None):
+        """Get one page of objects ordered by (created_at, id).
+
+        Uses a keyset condition on the last seen row instead of OFFSET so
+        every page costs the same index range scan. Returns the objects and
+        the cursor of the next page (None on the last page).
+        """
+        from sqlalchemy import and_, or_
+        model = self.model
+        query = self._query(options).order_by(model.created_at, model.id)
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > last_id)
+            ))
+        items = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1])
+        return items, next_cursor
 
 
 class UserRepository(SQLAlchemyRepository):
@@ -121,9 +277,80 @@ class PlaceRepository(SQLAlchemyRepository):
         from app.models.place import Place
         super().__init__(Place)
 
+    def read_options(self):
+        """Load owner and amenities with every place in a fixed number of queries.
+
+        The owner is joined into the main SELECT and the amenities of all
+        returned places are fetched by one extra ``IN`` query, so a list of
+        N places costs two statements instead of 1 + 2N lazy loads.
+        """
+        from sqlalchemy.orm import configure_mappers, joinedload, selectinload
+        configure_mappers()  # the ``owner`` backref exists once mappers are configured
+        return [joinedload(self.model.owner), selectinload(self.model.amenities)]
+
     def get_places_by_owner(self, owner_id):
         """Get all places owned by a specific user."""
-        return self.model.query.filter_by(_owner_id=owner_id).all()
+        return self._query().filter_by(_owner_id=owner_id).all()
+
+    def adjust_rating(self, place_id, count_delta, sum_delta):
+        """Atomically shift a place's review_count and rating_sum (no commit)."""
+        model = self.model
+        self.model.query.filter_by(id=place_id).update({
+            model._review_count: model._review_count + count_delta,
+            model._rating_sum: model._rating_sum + sum_delta
+        }, synchronize_session='fetch')
+
+    def recompute_rating_aggregates(self):
+        """Recompute review_count and rating_sum of every place from reviews.
+
+        Runs as one UPDATE with correlated subqueries and returns the number
+        of places written.
+        """
+        from app import db
+        result = db.session.execute(rating_aggregates_update())
+        save_changes()
+        return result.rowcount
+
+    def _in_cells(self, min_lat, min_lng, max_lat, max_lng):
+        """Filter matching the grid cells that cover a bounding box."""
+        from sqlalchemy import or_
+        from app.models.geo import cell_ranges
+        column = self.model._geo_cell
+        return or_(*(column.between(low, high)
+                     for low, high in cell_ranges(min_lat, min_lng, max_lat, max_lng)))
+
+    def search_radius(self, latitude, longitude, radius_km):
+        """Get (place, distance_km) pairs within radius_km, nearest first.
+
+        Candidates come from an index range scan over the covering grid
+        cells; the exact haversine distance is then checked on each one.
+        """
+        from app.models.geo import haversine_km, radius_bounds
+        bounds = radius_bounds(latitude, longitude, radius_km)
+        results = []
+        for place in self._query().filter(self._in_cells(*bounds)):
+            distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+            if distance <= radius_km:
+                results.append((place, distance))
+        results.sort(key=lambda result: result[1])
+        return results
+
+    def search_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """Get all places inside a bounding box.
+
+        ``min_lng > max_lng`` selects a box crossing the antimeridian.
+        """
+        from sqlalchemy import or_
+        model = self.model
+        if min_lng <= max_lng:
+            lng_filter = model._longitude.between(min_lng, max_lng)
+        else:
+            lng_filter = or_(model._longitude >= min_lng, model._longitude <= max_lng)
+        return self._query().filter(
+            self._in_cells(min_lat, min_lng, max_lat, max_lng),
+            model._latitude.between(min_lat, max_lat),
+            lng_filter
+        ).all()
 
 
 class ReviewRepository(SQLAlchemyRepository):
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""SQLite connection tuning.
+
+``SQLITE_PRAGMAS`` (for example WAL journaling, ``busy_timeout`` and
+``synchronous=NORMAL``) are executed on every new DBAPI connection by a
+connect-event listener, so each pooled connection gets the same profile.
+"""
+
+from sqlalchemy import event
+
+
+def pragma_listener(pragmas):
+    """Build a connect-event listener running ``PRAGMA name=value`` for each pragma."""
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+    return set_pragmas
+
+
+def init_sqlite(app, db):
+    """Attach the SQLITE_PRAGMAS listener to the app's SQLite engines (replicas included)."""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+    with app.app_context():
+        engines = list(db.engines.values())
+    if app.extensions.get('replicas') is not None:
+        engines.extend(app.extensions['replicas'].engines)
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', pragma_listener(pragmas))
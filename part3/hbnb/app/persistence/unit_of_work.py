@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Unit-of-work transaction scope shared by the facade and repositories.
+
+Inside a unit of work, repositories only flush; the outermost scope commits
+once on success and rolls back on any exception. Nested scopes join the
+outer one. The state lives in the session's ``info`` dict, so it is scoped
+to the current application context (one request).
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+
+_DEPTH = 'uow_depth'
+_AFTER_COMMIT = 'uow_after_commit'
+
+
+def _session():
+    from app import db
+    return db.session
+
+
+def in_unit_of_work(session=None):
+    """Whether a unit of work is open on the given (default: current) session."""
+    return (session or _session()).info.get(_DEPTH, 0) > 0
+
+
+@contextmanager
+def unit_of_work():
+    """Open (or join) a unit of work on the current session."""
+    session = _session()
+    depth = session.info.get(_DEPTH, 0)
+    session.info[_DEPTH] = depth + 1
+    if depth == 0:
+        session.info[_AFTER_COMMIT] = []
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except BaseException:
+        if depth == 0:
+            session.info.pop(_AFTER_COMMIT, None)
+            session.rollback()
+        raise
+    finally:
+        session.info[_DEPTH] = depth
+    if depth == 0:
+        for callback in session.info.pop(_AFTER_COMMIT, []):
+            callback()
+
+
+def transactional(func):
+    """Run a facade method inside a unit of work."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with unit_of_work():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def save_changes():
+    """Flush inside a unit of work, commit outside of one."""
+    session = _session()
+    if in_unit_of_work():
+        session.flush()
+    else:
+        session.commit()
+
+
+def after_commit(callback):
+    """Run callback once the current unit of work commits (now if none is open)."""
+    session = _session()
+    if in_unit_of_work():
+        session.info[_AFTER_COMMIT].append(callback)
+    else:
+        callback()
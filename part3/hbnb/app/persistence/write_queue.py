@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Group commit: concurrent facade writes batched into one transaction.
+
+With ``WRITE_QUEUE_ENABLED``, writes decorated with ``group_committed`` are
+handed to a single writer thread per process instead of each committing on
+its own. The writer collects up to ``WRITE_QUEUE_MAX_BATCH`` writes, waiting
+at most ``WRITE_QUEUE_MAX_DELAY_MS`` after the first one, runs them in one
+unit of work and commits once. Each caller gets its own result or exception.
+
+A write that raises rolls the batch back; it fails alone and the rest of the
+batch runs again without it. Results are detached from the writer's session
+and merged into the caller's with merge(load=False). A write still queued
+after ``WRITE_QUEUE_TIMEOUT_SECONDS`` is cancelled and raises
+WriteQueueTimeout, so it can be retried. A write the writer already started
+cannot be cancelled: its caller waits up to the same timeout again for the
+batch, then gets WriteOutcomeUnknown, since the write may yet commit.
+"""
+
+import copy
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from functools import wraps
+
+from sqlalchemy import inspect
+
+from app.persistence.unit_of_work import in_unit_of_work, unit_of_work
+
+
+class WriteQueueTimeout(RuntimeError):
+    """Raised when a queued write was cancelled before it ran; it is safe to retry."""
+
+
+class WriteOutcomeUnknown(RuntimeError):
+    """Raised when a running write did not finish in time; it may still commit."""
+
+
+class WriteQueueStats:
+    """Batch counters of the group-commit writer."""
+
+    def __init__(self):
+        """Initialize all counters at zero."""
+        self.writes = 0
+        self.batches = 0
+        self.failed = 0
+        self.retries = 0
+
+    @property
+    def average_batch(self):
+        """Average number of writes per committed batch."""
+        return self.writes / self.batches if self.batches else 0.0
+
+    def as_dict(self):
+        """Return the counters with the average batch size."""
+        return {
+            'writes': self.writes,
+            'batches': self.batches,
+            'failed': self.failed,
+            'retries': self.retries,
+            'average_batch': round(self.average_batch, 3)
+        }
+
+
+class _Write:
+    """A queued facade call and the future of its result."""
+
+    __slots__ = ('func', 'args', 'kwargs', 'future')
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class GroupCommitQueue:
+    """Single writer thread committing queued writes in batches."""
+
+    def __init__(self, app, max_batch=64, max_delay=0.002, timeout=10.0):
+        """Initialize with the app, the batch bounds (delay in seconds) and a timeout."""
+        self.app = app
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.stats = WriteQueueStats()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_writer(self):
+        """Start the writer thread (again in a forked worker, where it did not survive)."""
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.SimpleQueue()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='group-commit-writer', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+            return self._queue
+
+    def is_writer(self):
+        """Whether the current thread is the writer."""
+        return threading.current_thread() is self._thread
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and wait for its batch to commit."""
+        write = _Write(func, args, kwargs)
+        self._ensure_writer().put(write)
+        try:
+            result = write.future.result(timeout=self.timeout)
+        except FutureTimeout:
+            if write.future.cancel():
+                raise WriteQueueTimeout("The write was not committed in time")
+            # The writer is running it: only its batch knows whether it commits
+            try:
+                result = write.future.result(timeout=self.timeout)
+            except FutureTimeout:
+                raise WriteOutcomeUnknown("The write is still running and may yet commit")
+        return _attach(result)
+
+    def _run(self, writes):
+        """Writer loop: gather a batch, then commit it."""
+        while True:
+            batch = [writes.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(writes.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            pending = [write for write in batch if write.future.set_running_or_notify_cancel()]
+            with self.app.app_context():
+                try:
+                    self._commit(pending)
+                except Exception as e:
+                    for write in pending:
+                        if not write.future.done():
+                            write.future.set_exception(e)
+
+    def _commit(self, pending):
+        """Run the writes in one unit of work, dropping any that raises."""
+        from app import db
+        while pending:
+            db.session().expire_on_commit = False
+            results, failure = [], None
+            try:
+                with unit_of_work():
+                    for write in pending:
+                        try:
+                            args, kwargs = _copy_data(write.args, write.kwargs)
+                            results.append(write.func(*args, **kwargs))
+                        except Exception as e:
+                            failure = (write, e)
+                            raise
+            except Exception as e:
+                db.session.remove()
+                if failure is None:
+                    # The commit itself failed: every write in the batch fails with it
+                    for write in pending:
+                        write.future.set_exception(e)
+                    self.stats.failed += len(pending)
+                    return
+                write, error = failure
+                write.future.set_exception(error)
+                self.stats.failed += 1
+                pending = [other for other in pending if other is not write]
+                if pending:
+                    self.stats.retries += 1
+                continue
+            # Detach the results before handing them to their callers
+            db.session.remove()
+            self.stats.writes += len(pending)
+            self.stats.batches += 1
+            for write, result in zip(pending, results):
+                write.future.set_result(result)
+            return
+
+
+def _copy_data(args, kwargs):
+    """Copy the dict and list arguments, which the facade mutates, so a retry sees the originals."""
+    def fresh(value):
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+    return [fresh(arg) for arg in args], {key: fresh(value) for key, value in kwargs.items()}
+
+
+def _attach(value):
+    """Merge detached ORM objects (also inside lists and tuples) into the current session."""
+    from app import db
+    if isinstance(value, (list, tuple)):
+        return type(value)(_attach(item) for item in value)
+    state = inspect(value, raiseerr=False)
+    if state is None or not hasattr(state, 'was_deleted') or state.was_deleted:
+        return value
+    return db.session.merge(value, load=False)
+
+
+def group_committed(func):
+    """Send a facade write through the group-commit queue when it is enabled.
+
+    Calls made inside a unit of work (including the writer's own) run directly.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        from flask import current_app
+        writes = current_app.extensions.get('write_queue')
+        if writes is None or writes.is_writer() or in_unit_of_work():
+            return func(*args, **kwargs)
+        return writes.submit(func, *args, **kwargs)
+    return wrapper
+
+
+def init_write_queue(app):
+    """Create the group-commit queue of the application (WRITE_QUEUE_ENABLED)."""
+    config = app.config
+    if not config['WRITE_QUEUE_ENABLED']:
+        app.extensions['write_queue'] = None
+        return
+    app.extensions['write_queue'] = GroupCommitQueue(
+        app,
+        max_batch=config['WRITE_QUEUE_MAX_BATCH'],
+        max_delay=config['WRITE_QUEUE_MAX_DELAY_MS'] / 1000,
+        timeout=config['WRITE_QUEUE_TIMEOUT_SECONDS']
+    )
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Cache backends used by the facade for entity lookups.
+
+The ``memory`` backend lives in each process: with several workers
+(``WEB_CONCURRENCY`` > 1) a write only invalidates the cache of the worker
+that served it, and the others may serve the old entity for up to
+``CACHE_TTL_SECONDS``. Use the ``redis`` backend to share one cache between
+workers. Cached entities are only ever read; writes load their targets
+from the database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # Optional dependency, only needed for the redis backend
+    redis = None
+
+
+class CacheStats:
+    """Hit, miss and eviction counters shared by all backends."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def as_dict(self):
+        """Return the counters and the hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'errors': self.errors,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class NullCache:
+    """Cache that stores nothing; every lookup is a miss."""
+
+    shared = True
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key):
+        self.stats.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUTTLCache:
+    """Thread-safe in-process cache with LRU eviction and per-entry TTL."""
+
+    shared = False  # each worker process has its own copy
+
+    def __init__(self, max_entries=1024, ttl=60):
+        """Initialize with a maximum entry count and a TTL in seconds."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        """Store a value, evicting the least recently used entries if full.
+
+        ``ttl`` overrides the cache-wide TTL for this entry.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key):
+        """Remove a key if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache stored in a Redis-compatible server, with TTL set per key.
+
+    The cache is an optimization: when the server cannot be reached, a
+    lookup is a miss and a write is skipped (counted in ``stats.errors``),
+    so requests fall back to the database instead of failing.
+    """
+
+    shared = True
+
+    def __init__(self, url, ttl=60, prefix='hbnb:', timeout=0.5):
+        """Connect to the server at url, giving up on a command after timeout seconds."""
+        if redis is None:
+            raise RuntimeError("The redis cache backend requires the 'redis' package")
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout,
+                                           socket_connect_timeout=timeout)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def get(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except redis.RedisError:
+            self.stats.errors += 1
+            value = None
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.setex(self.prefix + key, max(1, int(self.ttl if ttl is None else ttl)), value)
+        except redis.RedisError:
+            self.stats.errors += 1
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + key)
+        except redis.RedisError:
+            self.stats.errors += 1
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except redis.RedisError:
+            self.stats.errors += 1
+
+
+def make_cache(config):
+    """Build the cache backend selected by CACHE_BACKEND."""
+    backend = config.get('CACHE_BACKEND', 'memory')
+    ttl = config.get('CACHE_TTL_SECONDS', 60)
+    if backend == 'memory':
+        return LRUTTLCache(config.get('CACHE_MAX_ENTRIES', 1024), ttl)
+    if backend == 'redis':
+        return RedisCache(config['CACHE_REDIS_URL'], ttl)
+    if backend == 'none':
+        return NullCache()
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+def per_process_warning(cache, workers):
+    """Warning to print when several workers would each keep their own cache, else None."""
+    if workers > 1 and not cache.shared:
+        return (f"CACHE_BACKEND=memory with {workers} workers: each worker caches on its own "
+                f"and may serve entities up to CACHE_TTL_SECONDS old after a write elsewhere; "
+                f"use CACHE_BACKEND=redis to share the cache")
+    return None
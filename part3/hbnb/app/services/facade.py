@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
 """Facade module for HBnB application."""
 
+import pickle
+from datetime import datetime
+
 from app.persistence.repository import UserRepository, PlaceRepository, ReviewRepository, AmenityRepository
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
+from app.persistence.unit_of_work import after_commit, in_unit_of_work, save_changes, transactional
+from app.models.ids import canonical_id
+from app.persistence.replicas import pinned_to_primary
+from app.persistence.write_queue import group_committed
+from app.services.cache import LRUTTLCache
+from app.services.singleflight import SingleFlight
+
+
+def _is_id_list(value):
+    """Whether value is a list of string IDs (as sent in JSON payloads)."""
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
 
 
 class HBnBFacade:
@@ -17,9 +31,146 @@ class HBnBFacade:
         self.place_repo = PlaceRepository()
         self.review_repo = ReviewRepository()
         self.amenity_repo = AmenityRepository()
+        self.cache = LRUTTLCache()
+        self.flights = SingleFlight()
+
+    def configure_cache(self, cache):
+        """Replace the entity cache backend (see app.services.cache)."""
+        self.cache = cache
+
+    # ==================== Cache Helpers ====================
+
+    def _cached_get(self, kind, repo, obj_id):
+        """Read-through lookup of an entity by ID.
+
+        The cache holds pickled snapshots; a hit is attached to the current
+        session with merge(load=False), which emits no SQL. Nested data such
+        as a place's owner may be up to CACHE_TTL_SECONDS stale. A session
+        pinned to the primary after a write skips the cache lookup, and a
+        unit of work skips the cache entirely: the objects it reads may be
+        written, so they are always loaded fresh.
+        """
+        from app import db
+        if in_unit_of_work():
+            return repo.get(obj_id)
+        key = f'{kind}:{canonical_id(obj_id)}'
+        data = None if pinned_to_primary() else self.cache.get(key)
+        if data is not None:
+            return db.session.merge(pickle.loads(data), load=False)
+
+        def load():
+            obj = repo.get(obj_id)
+            if obj is not None:
+                self.cache.set(key, pickle.dumps(obj))
+            return obj
+        return self._load_once(key, load)
+
+    def _load_once(self, key, load):
+        """Run load() once for all concurrent callers of the same key.
+
+        The leader keeps the objects it loaded; the callers that waited get
+        a pickled snapshot attached to their own session with
+        merge(load=False), since ORM objects cannot be shared across sessions.
+        A session pinned to the primary, or inside a unit of work, loads on
+        its own, as the leader may be reading from a replica.
+        """
+        from app import db
+        if pinned_to_primary() or in_unit_of_work():
+            return load()
+        result, shared = self.flights.do(key, load, pickle.dumps)
+        if not shared:
+            return result
+        result = pickle.loads(result)
+        if isinstance(result, list):
+            return [db.session.merge(obj, load=False) for obj in result]
+        if result is not None:
+            return db.session.merge(result, load=False)
+        return None
+
+    def _invalidate(self, kind, obj_id):
+        """Drop an entity from the cache once the write has committed."""
+        key = f'{kind}:{canonical_id(obj_id)}'
+        after_commit(lambda: self.cache.delete(key))
+
+    @staticmethod
+    def _shape_options(repo, fields, include):
+        """Loader options for a sparse read, or None for the default shape."""
+        if fields is None and include is None:
+            return None
+        return repo.shape_options(fields, include or ())
+
+    def _repo(self, entity):
+        """Repository of users, places, reviews or amenities."""
+        repos = {
+            'users': self.user_repo,
+            'places': self.place_repo,
+            'reviews': self.review_repo,
+            'amenities': self.amenity_repo,
+        }
+        return repos[entity]
+
+    def get_many(self, entity, obj_ids, fields=None, include=None):
+        """Get users, places, reviews or amenities by ID with one IN query.
+
+        Returns the objects in the order of obj_ids and the IDs not found.
+        """
+        repo = self._repo(entity)
+        objs = repo.get_many(obj_ids, self._shape_options(repo, fields, include))
+        found = {obj.id for obj in objs}
+        return objs, [obj_id for obj_id in obj_ids if canonical_id(obj_id) not in found]
+
+    def _bulk_insert(self, repo, candidates, chunk_size, errors, on_flush=None):
+        """Insert (index, obj) candidates chunk_size at a time, one commit per chunk.
+
+        ``on_flush`` runs inside each chunk's transaction after its INSERTs.
+        When a chunk hits an integrity error it is retried item by item so
+        that only the conflicting items are reported in ``errors``.
+        Bulk inserts manage these per-chunk transactions themselves and are
+        not run inside a unit of work.
+        Returns the IDs of the inserted objects.
+        """
+        from app import db
+        from sqlalchemy.exc import IntegrityError
+
+        def insert(objs):
+            repo.add_many(objs)
+            ids = [obj.id for obj in objs]
+            if on_flush:
+                on_flush(objs)
+            db.session.commit()
+            return ids
+
+        created = []
+        for start in range(0, len(candidates), chunk_size):
+            chunk = candidates[start:start + chunk_size]
+            try:
+                created.extend(insert([obj for _, obj in chunk]))
+            except IntegrityError:
+                db.session.rollback()
+                for index, obj in chunk:
+                    try:
+                        created.extend(insert([obj]))
+                    except IntegrityError:
+                        db.session.rollback()
+                        errors.append({'index': index, 'error': 'Conflicts with an existing record'})
+        return created
+
+    @staticmethod
+    def _bulk_build(items, build, errors):
+        """Build (index, obj) candidates, recording validation errors by index."""
+        candidates = []
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Item must be an object")
+                candidates.append((index, build(dict(item))))
+            except (ValueError, TypeError) as e:
+                errors.append({'index': index, 'error': str(e)})
+        return candidates
 
     # ==================== User Methods ====================
 
+    @transactional
     def create_user(self, user_data):
         """Create a new user."""
         payload = dict(user_data)
@@ -31,22 +182,47 @@ class HBnBFacade:
         self.user_repo.add(user)
         return user
 
-    def get_user(self, user_id):
-        """Get a user by ID."""
-        return self.user_repo.get(user_id)
+    def get_user(self, user_id, fields=None, include=None):
+        """Get a user by ID, optionally with only some fields and relations.
+
+        Sparse reads bypass the cache, which only holds complete entities.
+        """
+        options = self._shape_options(self.user_repo, fields, include)
+        if options is not None:
+            return self.user_repo.get(user_id, options)
+        return self._cached_get('user', self.user_repo, user_id)
 
     def get_user_by_email(self, email):
         """Get a user by email."""
         return self.user_repo.get_user_by_email(email)
 
-    def get_all_users(self):
-        """Get all users."""
-        return self.user_repo.get_all()
+    @transactional
+    def authenticate(self, email, password):
+        """Return the user matching the credentials, or None.
 
+        A password stored with another bcrypt cost than BCRYPT_LOG_ROUNDS
+        is rehashed at the configured cost while the plain text is known.
+        """
+        user = self.user_repo.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if user.needs_rehash():
+            user.password = password
+            save_changes()
+            self._invalidate('user', user.id)
+        return user
+
+    def get_all_users(self, fields=None, include=None):
+        """Get all users, optionally with only some fields and relations."""
+        return self.user_repo.get_all(self._shape_options(self.user_repo, fields, include))
+
+    def iter_all_users(self, batch_size=1000):
+        """Stream all users in batches of batch_size rows."""
+        return self.user_repo.iter_all(batch_size)
+
+    @transactional
     def update_user(self, user_id, user_data):
         """Update a user's information."""
-        from app import db
-
         user = self.user_repo.get(user_id)
         if not user:
             return None
@@ -60,11 +236,14 @@ class HBnBFacade:
         if password is not None:
             user.password = password
 
-        db.session.commit()
+        save_changes()
+        self._invalidate('user', user_id)
         return user
 
     # ==================== Amenity Methods ====================
 
+    @group_committed
+    @transactional
     def create_amenity(self, amenity_data):
         """Create a new amenity."""
         amenity = Amenity(**amenity_data)
@@ -73,22 +252,58 @@ class HBnBFacade:
 
     def get_amenity(self, amenity_id):
         """Get an amenity by ID."""
-        return self.amenity_repo.get(amenity_id)
+        return self._cached_get('amenity', self.amenity_repo, amenity_id)
 
     def get_all_amenities(self):
         """Get all amenities."""
         return self.amenity_repo.get_all()
 
+    def create_amenities_bulk(self, items, chunk_size=500):
+        """Create many amenities; returns (created IDs, per-item errors)."""
+        errors = []
+        seen = set()
+
+        def build(data):
+            name = data.get('name')
+            if name in seen:
+                raise ValueError("Duplicate amenity name in request")
+            seen.add(name)
+            return Amenity(**data)
+
+        candidates = self._bulk_build(items, build, errors)
+        created = self._bulk_insert(self.amenity_repo, candidates, chunk_size, errors)
+        return created, sorted(errors, key=lambda error: error['index'])
+
+    def get_amenities_by_ids(self, amenity_ids):
+        """Get the amenities for a list of IDs in one query.
+
+        Duplicate IDs are ignored; unknown IDs raise a ValueError naming them.
+        """
+        if not _is_id_list(amenity_ids):
+            raise ValueError("amenities must be a list of amenity IDs")
+        unique_ids = list(dict.fromkeys(amenity_ids))
+        amenities = self.amenity_repo.get_many(unique_ids)
+        found = {amenity.id for amenity in amenities}
+        missing = [amenity_id for amenity_id in unique_ids if canonical_id(amenity_id) not in found]
+        if missing:
+            raise ValueError(f"Amenity not found: {', '.join(missing)}")
+        return amenities
+
+    @group_committed
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity's information."""
         amenity = self.amenity_repo.get(amenity_id)
         if not amenity:
             return None
         self.amenity_repo.update(amenity_id, amenity_data)
+        self._invalidate('amenity', amenity_id)
         return self.amenity_repo.get(amenity_id)
 
     # ==================== Place Methods ====================
 
+    @group_committed
+    @transactional
     def create_place(self, place_data):
         """Create a new place."""
         # Get the owner from owner_id
@@ -100,50 +315,113 @@ class HBnBFacade:
         if not owner:
             raise ValueError("Owner not found")
 
-        # Handle amenities
-        amenity_ids = place_data.pop('amenities', [])
+        # Resolve amenities before the place exists to keep it out of autoflush
+        amenities = self.get_amenities_by_ids(place_data.pop('amenities', []))
 
         # Create place with owner_id
         place = Place(owner_id=owner_id, **place_data)
-
-        # Add amenities to place
-        for amenity_id in amenity_ids:
-            amenity = self.get_amenity(amenity_id)
-            if amenity:
-                place.add_amenity(amenity)
+        place.set_amenities(amenities)
 
         self.place_repo.add(place)
         return place
 
-    def get_place(self, place_id):
-        """Get a place by ID."""
-        return self.place_repo.get(place_id)
-
-    def get_all_places(self):
-        """Get all places."""
-        return self.place_repo.get_all()
-
+    def create_places_bulk(self, items, chunk_size=500):
+        """Create many places; returns (created IDs, per-item errors).
+
+        Owners and amenities of the whole batch are resolved with one query each.
+        """
+        dicts = [item for item in items if isinstance(item, dict)]
+        owners = self.user_repo.existing_ids(list({item.get('owner_id') for item in dicts
+                                                   if isinstance(item.get('owner_id'), str)}))
+        amenity_ids = {amenity_id for item in dicts
+                       if isinstance(item.get('amenities', []), list)
+                       for amenity_id in item.get('amenities', []) if isinstance(amenity_id, str)}
+        amenities = {amenity.id: amenity for amenity in self.amenity_repo.get_many(list(amenity_ids))}
+        errors = []
+
+        def build(data):
+            owner_id = data.pop('owner_id', None)
+            if owner_id not in owners:
+                raise ValueError("Owner not found")
+            for field in ('title', 'price', 'latitude', 'longitude'):
+                if field not in data:
+                    raise ValueError(f"{field} is required")
+            ids = data.pop('amenities', [])
+            if not _is_id_list(ids):
+                raise ValueError("amenities must be a list of amenity IDs")
+            missing = [amenity_id for amenity_id in ids if canonical_id(amenity_id) not in amenities]
+            if missing:
+                raise ValueError(f"Amenity not found: {', '.join(missing)}")
+            data.setdefault('description', '')
+            place = Place(owner_id=owner_id, **data)
+            place.set_amenities([amenities[canonical_id(amenity_id)] for amenity_id in ids])
+            return place
+
+        candidates = self._bulk_build(items, build, errors)
+        created = self._bulk_insert(self.place_repo, candidates, chunk_size, errors)
+        return created, sorted(errors, key=lambda error: error['index'])
+
+    def get_place(self, place_id, fields=None, include=None):
+        """Get a place by ID, optionally with only some fields and relations.
+
+        Sparse reads bypass the cache, which only holds complete entities.
+        """
+        options = self._shape_options(self.place_repo, fields, include)
+        if options is not None:
+            return self.place_repo.get(place_id, options)
+        return self._cached_get('place', self.place_repo, place_id)
+
+    def get_all_places(self, fields=None, include=None):
+        """Get all places, optionally with only some fields and relations."""
+        return self.place_repo.get_all(self._shape_options(self.place_repo, fields, include))
+
+    def iter_all_places(self, batch_size=1000):
+        """Stream all places in batches of batch_size rows."""
+        return self.place_repo.iter_all(batch_size)
+
+    def get_places_page(self, limit, cursor=None, fields=None, include=None):
+        """Get one page of places and the cursor of the next page."""
+        options = self._shape_options(self.place_repo, fields, include)
+        return self.place_repo.get_page(limit, cursor, options)
+
+    def search_places_by_radius(self, latitude, longitude, radius_km):
+        """Get (place, distance_km) pairs within a radius, nearest first."""
+        return self.place_repo.search_radius(latitude, longitude, radius_km)
+
+    def search_places_by_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """Get all places inside a bounding box."""
+        return self.place_repo.search_bbox(min_lat, min_lng, max_lat, max_lng)
+
+    @group_committed
+    @transactional
     def update_place(self, place_id, place_data):
         """Update a place's information."""
-        from app import db
         place = self.place_repo.get(place_id)
         if not place:
             return None
 
         # Handle amenities update if provided
         if 'amenities' in place_data:
-            amenity_ids = place_data.pop('amenities')
-            place.amenities = []
-            for amenity_id in amenity_ids:
-                amenity = self.get_amenity(amenity_id)
-                if amenity:
-                    place.add_amenity(amenity)
+            place.set_amenities(self.get_amenities_by_ids(place_data.pop('amenities')))
+            # The link table has no timestamp; bump the place's own
+            place.updated_at = datetime.utcnow()
 
         self.place_repo.update(place_id, place_data)
+        self._invalidate('place', place_id)
         return self.place_repo.get(place_id)
 
+    @group_committed
+    @transactional
+    def delete_place(self, place_id):
+        """Delete a place and its reviews."""
+        deleted = self.place_repo.delete(place_id)
+        self._invalidate('place', place_id)
+        return deleted
+
     # ==================== Review Methods ====================
 
+    @group_committed
+    @transactional
     def create_review(self, review_data):
         """Create a new review."""
         # Get user and place from IDs
@@ -163,41 +441,112 @@ class HBnBFacade:
         if not place:
             raise ValueError("Place not found")
 
-        # Create review with IDs
+        # Create review with IDs; the place aggregates commit with it
         review = Review(user_id=user_id, place_id=place_id, **review_data)
+        self.place_repo.adjust_rating(place_id, 1, review.rating)
         self.review_repo.add(review)
+        self._invalidate('place', place_id)
         return review
 
-    def get_review(self, review_id):
-        """Get a review by ID."""
-        return self.review_repo.get(review_id)
-
-    def get_all_reviews(self):
-        """Get all reviews."""
-        return self.review_repo.get_all()
+    def create_reviews_bulk(self, items, chunk_size=500):
+        """Create many reviews; returns (created IDs, per-item errors).
+
+        Place rating aggregates are adjusted in the same transaction as
+        each chunk, with one UPDATE per reviewed place.
+        """
+        dicts = [item for item in items if isinstance(item, dict)]
+        users = self.user_repo.existing_ids(list({item.get('user_id') for item in dicts
+                                                  if isinstance(item.get('user_id'), str)}))
+        places = self.place_repo.existing_ids(list({item.get('place_id') for item in dicts
+                                                    if isinstance(item.get('place_id'), str)}))
+        errors = []
+        pairs = set()
+        touched_places = set()
+
+        def build(data):
+            if data.get('user_id') not in users:
+                raise ValueError("User not found")
+            if data.get('place_id') not in places:
+                raise ValueError("Place not found")
+            pair = (data['user_id'], data['place_id'])
+            if pair in pairs:
+                raise ValueError("Duplicate review of the same place by the same user")
+            pairs.add(pair)
+            review = Review(**data)
+            touched_places.add(data['place_id'])
+            return review
+
+        def adjust_ratings(reviews):
+            totals = {}
+            for review in reviews:
+                count, rating_sum = totals.get(review.place_id, (0, 0))
+                totals[review.place_id] = (count + 1, rating_sum + review.rating)
+            for place_id, (count, rating_sum) in totals.items():
+                self.place_repo.adjust_rating(place_id, count, rating_sum)
+
+        candidates = self._bulk_build(items, build, errors)
+        created = self._bulk_insert(self.review_repo, candidates, chunk_size, errors, adjust_ratings)
+        for place_id in touched_places:
+            self._invalidate('place', place_id)
+        return created, sorted(errors, key=lambda error: error['index'])
+
+    def get_review(self, review_id, fields=None, include=None):
+        """Get a review by ID, optionally with only some fields and relations."""
+        return self.review_repo.get(review_id, self._shape_options(self.review_repo, fields, include))
+
+    def get_all_reviews(self, fields=None, include=None):
+        """Get all reviews, optionally with only some fields and relations."""
+        return self.review_repo.get_all(self._shape_options(self.review_repo, fields, include))
+
+    def iter_all_reviews(self, batch_size=1000):
+        """Stream all reviews in batches of batch_size rows."""
+        return self.review_repo.iter_all(batch_size)
 
     def get_reviews_by_place(self, place_id):
         """Get all reviews for a specific place."""
         place = self.get_place(place_id)
         if not place:
             return None
-        return self.review_repo.get_reviews_by_place(place_id)
+        return self._load_once(f'reviews_by_place:{canonical_id(place_id)}',
+                               lambda: self.review_repo.get_reviews_by_place(place_id))
 
     def user_has_reviewed_place(self, user_id, place_id):
         """Check whether a user has already reviewed a place."""
         return self.review_repo.get_user_review_for_place(user_id, place_id) is not None
 
+    @group_committed
+    @transactional
     def update_review(self, review_id, review_data):
         """Update a review's information."""
         review = self.review_repo.get(review_id)
         if not review:
             return None
+        # An invalid value raises and rolls back the aggregate change with the update
+        if 'rating' in review_data:
+            old_rating = review.rating
+            review.rating = review_data['rating']
+            if review.rating != old_rating:
+                self.place_repo.adjust_rating(review.place_id, 0, review.rating - old_rating)
         self.review_repo.update(review_id, review_data)
+        self._invalidate('place', review.place_id)
         return self.review_repo.get(review_id)
 
+    @group_committed
+    @transactional
     def delete_review(self, review_id):
         """Delete a review."""
         review = self.review_repo.get(review_id)
         if not review:
             return False
-        return self.review_repo.delete(review_id)
\ No newline at end of file
+        place_id = review.place_id
+        self.place_repo.adjust_rating(place_id, -1, -review.rating)
+        deleted = self.review_repo.delete(review_id)
+        self._invalidate('place', place_id)
+        return deleted
+
+    @transactional
+    def recompute_place_ratings(self):
+        """Rebuild every place's rating aggregates from its reviews."""
+        updated = self.place_repo.recompute_rating_aggregates()
+        after_commit(self.cache.clear)
+        return updated
\ No newline at end of file
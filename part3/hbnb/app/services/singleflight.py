@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Single-flight execution: concurrent calls for one key share one load."""
+
+import threading
+
+
+class SingleFlightStats:
+    """Counters of executed and coalesced loads."""
+
+    def __init__(self):
+        self.loads = 0
+        self.coalesced = 0
+
+    def as_dict(self):
+        """Return the counters and the share of calls that were coalesced."""
+        calls = self.loads + self.coalesced
+        return {
+            'loads': self.loads,
+            'coalesced': self.coalesced,
+            'coalesced_rate': round(self.coalesced / calls, 4) if calls else 0.0
+        }
+
+
+class _Flight:
+    """One in-flight load and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.shared = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution.
+
+    The first caller of a key (the leader) runs the load; callers arriving
+    while it runs wait and receive ``share(result)`` instead of running it
+    again. ``share`` only runs when somebody is waiting, so an uncontended
+    load costs one lock round-trip.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, load, share=lambda result: result):
+        """Return (result, shared): the leader's own result or a shared copy."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.stats.loads += 1
+                leader = True
+            else:
+                flight.waiters += 1
+                self.stats.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.shared, True
+
+        try:
+            result = load()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            # Once the key is removed no new caller can join, so the waiter
+            # count is final and the snapshot is made only when needed.
+            with self._lock:
+                del self._flights[key]
+                waiters = flight.waiters
+            if waiters:
+                try:
+                    flight.shared = share(result)
+                except BaseException as e:
+                    flight.error = e
+            return result, False
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""JWT manager with a cache of verified tokens and a shared revocation list.
+
+Clients reuse one access token for many calls, so the claims of a token
+whose signature was verified are kept in a per-worker LRU keyed by the
+SHA-256 of the encoded token, until the token's ``exp``
+(``JWT_DECODE_CACHE_MAX_ENTRIES``, 0 disables). Later requests with the
+same token skip signature verification and claim parsing.
+
+Revoked token IDs (``jti``) are rows of the ``revoked_tokens`` table, so a
+logout on one worker is honored by every worker. Each worker keeps the
+unexpired revocations in memory and reloads them from the primary at most
+every ``JWT_REVOCATION_REFRESH_SECONDS``; the blocklist check that runs on
+every request, cached token or not, is a set lookup.
+"""
+
+import hashlib
+import threading
+import time
+
+from flask_jwt_extended import JWTManager
+from sqlalchemy import delete, or_, select
+
+from app.persistence.unit_of_work import save_changes
+
+
+class TokenRevocations:
+    """Revoked token IDs, mirrored from the revoked_tokens table."""
+
+    def __init__(self, refresh_seconds=1.0):
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at = None
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, expires_at):
+        """Revoke a token until its expiry (a UNIX timestamp, None for never)."""
+        from app import db
+        from app.models.revoked_token import RevokedToken
+        # Revocations of expired tokens are useless: the signature check refuses them
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < time.time()))
+        db.session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        save_changes()
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti):
+        """Whether a token ID is revoked, reloading the table when the copy is stale."""
+        if jti is None:
+            return False
+        if self.loaded_at is None or time.monotonic() - self.loaded_at >= self.refresh_seconds:
+            self.refresh()
+        with self._lock:
+            return jti in self._revoked
+
+    def refresh(self):
+        """Reload the unexpired revocations from the primary database."""
+        from app import db
+        from app.models.revoked_token import RevokedToken
+        now = time.time()
+        rows = db.session.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(
+                or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at >= now)),
+            bind_arguments={'bind': db.engine}).all()
+        with self._lock:
+            self._revoked = {jti: expires_at for jti, expires_at in rows}
+            self.loaded_at = time.monotonic()
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that verifies each token's signature once per worker."""
+
+    def __init__(self, app=None):
+        self.revocations = TokenRevocations()
+        self.token_cache = None
+        self._cached_tokens = None
+        super().__init__(app)
+        self.token_in_blocklist_loader(
+            lambda jwt_header, jwt_payload: self.revocations.is_revoked(jwt_payload.get('jti')))
+
+    def init_app(self, app):
+        """Register on the app and size the cache with JWT_DECODE_CACHE_MAX_ENTRIES (0 disables)."""
+        super().init_app(app)
+        from app.models.revoked_token import RevokedToken  # noqa: F401  (registers the table)
+        from app.services.cache import LRUTTLCache, NullCache
+        self.revocations = TokenRevocations(app.config['JWT_REVOCATION_REFRESH_SECONDS'])
+        max_entries = app.config['JWT_DECODE_CACHE_MAX_ENTRIES']
+        self.token_cache = LRUTTLCache(max_entries) if max_entries else NullCache()
+        # jti -> cache key, so a revocation can evict the verified claims
+        self._cached_tokens = LRUTTLCache(max_entries) if max_entries else NullCache()
+
+    def revoke(self, claims):
+        """Revoke the token with these claims and drop its cached claims."""
+        self.revocations.revoke(claims['jti'], claims.get('exp'))
+        key = self._cached_tokens.get(claims['jti'])
+        if key is not None:
+            self.token_cache.delete(key)
+            self._cached_tokens.delete(claims['jti'])
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        """Decode a token, from the verified-token cache when possible.
+
+        flask_jwt_extended has no public hook that can skip verification, so
+        the cache wraps the manager's single decode entry point.
+        """
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.sha256(encoded_token.encode('utf-8')).hexdigest()
+        claims = self.token_cache.get(key)
+        if claims is not None:
+            return dict(claims)
+
+        claims = super()._decode_jwt_from_config(encoded_token)
+        if 'exp' in claims:
+            ttl = claims['exp'] - time.time()
+            if ttl > 0:
+                self.token_cache.set(key, dict(claims), ttl=ttl)
+                if 'jti' in claims:
+                    self._cached_tokens.set(claims['jti'], key, ttl=ttl)
+        return claims
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Preloading and per-worker warmup for the production launchers.
+
+The master process builds the app and its Swagger spec once (``preload``)
+so forked workers share them copy-on-write. Each worker then runs
+``warm_up`` before it accepts traffic; until it finishes, the worker's
+readiness endpoint answers 503.
+"""
+
+import os
+import time
+
+
+def build_spec(app):
+    """Build (and memoize) the Swagger spec of the app's Api."""
+    with app.test_request_context():
+        return app.extensions['api'].__schema__
+
+
+def preload(app):
+    """Prepare the shared app in the master process before forking workers."""
+    build_spec(app)
+    app.extensions['preload_pid'] = os.getpid()
+    app.extensions['ready'] = False
+
+
+def warm_up(app):
+    """Warm one worker up, then mark it ready.
+
+    In a child of the preloading process, drops the database connections
+    inherited through fork. Then opens ``WARMUP_DB_CONNECTIONS`` fresh ones
+    into the pool, builds the Swagger spec if the master did not, and loads
+    the first ``WARMUP_CACHE_PLACES`` places into the entity cache.
+    """
+    from sqlalchemy import text
+    from app import db
+    from app.services import facade
+
+    start = time.perf_counter()
+    with app.app_context():
+        if app.extensions.get('preload_pid', os.getpid()) != os.getpid():
+            db.engine.dispose(close=False)
+            for engine in getattr(app.extensions.get('replicas'), 'engines', ()):
+                engine.dispose(close=False)
+        connections = [db.engine.connect() for _ in range(app.config['WARMUP_DB_CONNECTIONS'])]
+        for connection in connections:
+            connection.execute(text('SELECT 1'))
+            connection.close()
+        build_spec(app)
+        places, _ = facade.get_places_page(app.config['WARMUP_CACHE_PLACES'])
+        for place in places:
+            facade.get_place(place.id)
+        db.session.remove()
+    app.extensions['warmup_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    app.extensions['ready'] = True
+
+
+def readiness(app):
+    """Readiness of the current worker (ready unless a launcher is warming it)."""
+    return {
+        'ready': app.extensions.get('ready', True),
+        'pid': os.getpid(),
+        'warmup_ms': app.extensions.get('warmup_ms')
+    }
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""ASGI entry point (``asgi:application``), e.g. ``uvicorn asgi:application --workers 4``.
+
+The Flask app is wrapped with asgiref's WSGI adapter, so requests still
+run on a thread pool. ASGI servers import this module in each worker,
+which warms that worker up before it serves traffic.
+"""
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # Optional dependency, only needed to serve over ASGI
+    WsgiToAsgi = None
+
+from app.warmup import warm_up
+from wsgi import app
+
+if WsgiToAsgi is None:
+    raise RuntimeError("Serving over ASGI requires the 'asgiref' package")
+
+warm_up(app)
+application = WsgiToAsgi(app)
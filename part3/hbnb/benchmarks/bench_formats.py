@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Benchmark place list payloads: JSON vs MessagePack vs CBOR (encode, decode, size).
+
+Usage (from part3/hbnb):
+    python -m benchmarks.bench_formats --places 10000 --rounds 20
+"""
+
+import argparse
+import json
+
+from benchmarks.bench_serialization import build_places
+from benchmarks.common import make_app, report, timed
+from app.api.serialization import BINARY_FORMATS, dumps, orjson
+from app.api.v1.places import place_to_dict
+
+
+def formats():
+    """(label, encode, decode) of JSON and of every installed binary format."""
+    json_loads = orjson.loads if orjson else json.loads
+    yield 'orjson' if orjson else 'json', dumps, json_loads
+    for mediatype, (encode, decode, _) in BINARY_FORMATS.items():
+        yield mediatype.split('/')[1], encode, decode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        data = [place_to_dict(place) for place in build_places(args.places)]
+    if not BINARY_FORMATS:
+        print("msgpack and cbor2 are not installed, only JSON is measured")
+
+    for label, encode, decode in formats():
+        body = encode(data)
+        assert decode(body) == data
+        report(f"{label} encode ({args.places} places)",
+               [timed(encode, data)[1] for _ in range(args.rounds)])
+        report(f"{label} decode ({args.places} places)",
+               [timed(decode, body)[1] for _ in range(args.rounds)])
+        print(f"{label} payload: {len(body) / 1024:.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark geospatial place search on synthetic data.
+
+Usage (from part3/hbnb):
+    python -m benchmarks.bench_geo_search --places 1000000 --queries 1000
+"""
+
+import argparse
+import random
+import uuid
+from datetime import datetime
+
+from benchmarks.common import make_app, report, timed
+from app import db
+from app.models.geo import geo_cell
+from app.models.place import Place
+from app.services import facade
+
+
+def seed(count, owner_id, rng, batch=50000):
+    """Insert count places clustered around 200 random city centers."""
+    cities = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(200)]
+    table = Place.__table__
+    now = datetime.utcnow()
+    for start in range(0, count, batch):
+        rows = []
+        for _ in range(min(batch, count - start)):
+            clat, clng = rng.choice(cities)
+            lat = max(-90.0, min(90.0, rng.gauss(clat, 0.3)))
+            lng = (rng.gauss(clng, 0.3) + 180.0) % 360.0 - 180.0
+            rows.append({
+                'id': str(uuid.uuid4()), 'title': 'Synthetic', 'description': '',
+                'price': 100.0, 'latitude': lat, 'longitude': lng, 'owner_id': owner_id,
+                'geo_cell': geo_cell(lat, lng), 'created_at': now, 'updated_at': now
+            })
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+    return cities
+
+
+def full_scan(lat, lng, radius_km):
+    """Baseline: bounding-box filter on the raw, unindexed coordinates."""
+    from app.models.geo import radius_bounds
+    min_lat, min_lng, max_lat, max_lng = radius_bounds(lat, lng, radius_km)
+    return Place.query.filter(Place._latitude.between(min_lat, max_lat),
+                              Place._longitude.between(min_lng, max_lng)).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--radius-km', type=float, default=10.0)
+    parser.add_argument('--baseline-queries', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    app = make_app()
+    with app.app_context():
+        owner = facade.create_user({'first_name': 'Bench', 'last_name': 'Owner',
+                                    'email': 'bench@hbnb.io', 'password': 'bench'})
+        cities = seed(args.places, owner.id, rng)
+        print(f"Seeded {args.places} places")
+
+        centers = [(rng.gauss(lat, 0.3), rng.gauss(lng, 0.3))
+                   for lat, lng in (rng.choice(cities) for _ in range(args.queries))]
+
+        samples, found = [], 0
+        for lat, lng in centers:
+            results, elapsed = timed(facade.search_places_by_radius, lat, lng, args.radius_km)
+            db.session.expunge_all()
+            samples.append(elapsed)
+            found += len(results)
+        report(f"radius {args.radius_km:g} km (grid index)", samples)
+        print(f"  average matches per query: {found / len(centers):.1f}")
+
+        samples = []
+        for lat, lng in centers[:args.baseline_queries]:
+            _, elapsed = timed(full_scan, lat, lng, args.radius_km)
+            db.session.expunge_all()
+            samples.append(elapsed)
+        report(f"radius {args.radius_km:g} km (full scan)", samples)
+
+
+if __name__ == '__main__':
+    main()
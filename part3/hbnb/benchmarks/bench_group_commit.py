@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark sustained write throughput with and without group commit.
+
+--threads threads create places and update their prices through the
+facade for --seconds, first committing every write on its own, then
+through the group-commit write queue. Both runs use the same SQLite
+settings (--profile production adds the tuned pragmas of ProductionConfig).
+
+Usage (from part3/hbnb):
+    python -m benchmarks.bench_group_commit --threads 16 --seconds 10
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.bench_sqlite_profile import seed
+from benchmarks.common import make_app, percentiles
+from app import db
+from app.services import facade
+from config import ProductionConfig
+
+
+def run(app, owner_id, place_ids, args):
+    """Return (writes per second, latency samples in ms, error count)."""
+    samples, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        local_samples, local_errors = [], 0
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    if rng.random() < 0.5:
+                        facade.create_place({'title': 'Bench place', 'description': '',
+                                             'price': 100.0, 'latitude': 48.85,
+                                             'longitude': 2.35, 'owner_id': owner_id})
+                    else:
+                        facade.update_place(rng.choice(place_ids), {'price': rng.uniform(10, 500)})
+                except Exception:
+                    local_errors += 1
+                db.session.remove()
+                local_samples.append((time.perf_counter() - start) * 1000)
+        samples.extend(local_samples)
+        errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(samples) / (time.perf_counter() - start), samples, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--profile', choices=('default', 'production'), default='production')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-delay-ms', type=float, default=2)
+    args = parser.parse_args()
+
+    settings = {'CACHE_BACKEND': 'none', 'BCRYPT_POOL_SIZE': 0,
+                'WRITE_QUEUE_MAX_BATCH': args.max_batch,
+                'WRITE_QUEUE_MAX_DELAY_MS': args.max_delay_ms}
+    if args.profile == 'production':
+        settings['SQLALCHEMY_ENGINE_OPTIONS'] = ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS
+        settings['SQLITE_PRAGMAS'] = ProductionConfig.SQLITE_PRAGMAS
+
+    for label, enabled in (('commit per write', False), ('group commit', True)):
+        app = make_app(WRITE_QUEUE_ENABLED=enabled, **settings)
+        place_ids = seed(app, args.places)
+        with app.app_context():
+            owner_id = facade.get_user_by_email('owner@hbnb.io').id
+        rate, samples, errors = run(app, owner_id, place_ids, args)
+        stats = percentiles(samples)
+        line = (f"{label:<18} {rate:8.1f} writes/s  p50={stats['p50']:8.3f} ms  "
+                f"p99={stats['p99']:8.3f} ms  errors={errors}")
+        writes = app.extensions['write_queue']
+        if writes is not None:
+            line += f"  average batch={writes.stats.average_batch:.1f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
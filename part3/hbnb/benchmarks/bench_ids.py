@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Benchmark ID strategies: insert rate and index sizes.
+
+For each (ID_STRATEGY, ID_STORAGE) pair, inserts --places places (each
+linked to two amenities) into a fresh SQLite file through the bulk facade
+path, in chunks of --chunk-size, and reports places per second. It then
+reports the on-disk size of the places table, its primary-key index, the
+other indexes and the place_amenity join table (SQLite's dbstat).
+
+Usage (from part3/hbnb):
+    python -m benchmarks.bench_ids --places 100000
+"""
+
+import argparse
+import sqlite3
+import time
+
+from benchmarks.common import make_app
+from app import db
+from app.services import facade
+
+VARIANTS = (('uuid4', 'text'), ('uuid7', 'text'), ('uuid7', 'binary'), ('ulid', 'binary'))
+
+
+def insert_places(app, count, chunk_size):
+    """Insert count places; return places per second."""
+    with app.app_context():
+        owner = facade.create_user({'first_name': 'Bench', 'last_name': 'Owner',
+                                    'email': 'owner@hbnb.io', 'password': 'secret'})
+        amenities = [facade.create_amenity({'name': name}).id for name in ('WiFi', 'Pool')]
+        owner_id = owner.id
+        db.session.remove()
+        start = time.perf_counter()
+        for offset in range(0, count, chunk_size):
+            items = [{'title': f'Place {i}', 'price': 100.0, 'latitude': 48.85,
+                      'longitude': 2.35, 'owner_id': owner_id, 'amenities': amenities}
+                     for i in range(offset, min(count, offset + chunk_size))]
+            facade.create_places_bulk(items, chunk_size)
+            db.session.remove()
+        return count / (time.perf_counter() - start)
+
+
+def object_sizes(path):
+    """Bytes used per table and index, from SQLite's dbstat virtual table."""
+    connection = sqlite3.connect(path)
+    try:
+        return dict(connection.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name'))
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    for strategy, storage in VARIANTS:
+        app = make_app(ID_STRATEGY=strategy, ID_STORAGE=storage, CACHE_BACKEND='none',
+                       BCRYPT_POOL_SIZE=0)
+        rate = insert_places(app, args.places, args.chunk_size)
+        path = app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+        sizes = object_sizes(path)
+        kib = {name: size / 1024 for name, size in sizes.items()}
+        print(f"{strategy:<6} {storage:<7} {rate:9.1f} places/s  "
+              f"places={kib['places']:9.1f} KiB  "
+              f"pk index={kib['sqlite_autoindex_places_1']:8.1f} KiB  "
+              f"(created_at, id) index={kib['idx_places_created_at_id']:8.1f} KiB  "
+              f"place_amenity={kib['place_amenity'] + kib['sqlite_autoindex_place_amenity_1']:8.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
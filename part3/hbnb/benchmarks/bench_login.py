@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmark login throughput with bcrypt inline vs in the process pool.
+
+Each run fires --logins POST /api/v1/auth/login requests from --threads
+client threads and reports logins per second and per core.
+
+Usage (from part3/hbnb):
+    python -m benchmarks.bench_login --rounds 12 --logins 64 --threads 8
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.common import make_app
+from app import db, hasher
+from app.services import facade
+
+
+def run(pool_size, args):
+    """Return logins per second with BCRYPT_POOL_SIZE=pool_size."""
+    app = make_app(BCRYPT_LOG_ROUNDS=args.rounds, BCRYPT_POOL_SIZE=pool_size,
+                   ADMISSION_ENABLED=False)
+    with app.app_context():
+        facade.create_user({'first_name': 'Bench', 'last_name': 'User',
+                            'email': 'bench@hbnb.io', 'password': 'secret'})
+        db.session.remove()
+    remaining = list(range(args.logins))
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if not remaining:
+                    return
+                remaining.pop()
+            response = client.post('/api/v1/auth/login',
+                                   json={'email': 'bench@hbnb.io', 'password': 'secret'})
+            assert response.status_code == 200, response.get_json()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    return args.logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    for label, pool_size in (('inline', 0), (f'pool of {cores}', cores)):
+        rate = run(pool_size, args)
+        print(f"{label:<16} cost={args.rounds}  {rate:8.1f} logins/s  "
+              f"{rate / cores:6.1f} logins/s/core")
+
+
+if __name__ == '__main__':
+    main()
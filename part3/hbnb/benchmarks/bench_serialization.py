@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark place list serialization: hand-built dict + marshal + json vs compiled + fast encoder.
+
+Usage (from part3/hbnb):
+    python -m benchmarks.bench_serialization --places 10000 --rounds 20
+"""
+
+import argparse
+import json
+import uuid
+
+from flask_restx import marshal
+
+from benchmarks.common import make_app, report, timed
+from app.api.serialization import dumps, orjson
+from app.api.v1.places import place_response_model, place_to_dict
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+
+
+def legacy_place_to_dict(place):
+    """The hand-written conversion the resources used before compilation."""
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'review_count': place.review_count,
+        'average_rating': place.average_rating,
+        'owner': {
+            'id': place.owner.id,
+            'first_name': place.owner.first_name,
+            'last_name': place.owner.last_name,
+            'email': place.owner.email
+        },
+        'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in place.amenities]
+    }
+
+
+def legacy(places):
+    data = marshal([legacy_place_to_dict(place) for place in places], place_response_model)
+    return json.dumps(data) + '\n'
+
+
+def compiled(places):
+    return dumps([place_to_dict(place) for place in places])
+
+
+def build_places(count):
+    """Build transient places with an owner and three amenities each."""
+    amenities = [Amenity(name=f'Amenity {i}', id=str(uuid.uuid4())) for i in range(3)]
+    places = []
+    for i in range(count):
+        owner = User('Owner', str(i), f'owner{i}@hbnb.io', password='$2b$12$' + 'x' * 53,
+                     id=str(uuid.uuid4()))
+        place = Place(f'Place {i}', 'A nice place', 100.0 + i, 48.85, 2.35,
+                      owner_id=owner.id, id=str(uuid.uuid4()))
+        place.owner = owner
+        place.amenities = list(amenities)
+        places.append(place)
+    return places
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        places = build_places(args.places)
+        assert json.loads(legacy(places)) == json.loads(compiled(places))
+        results = {}
+        for label, func in (('dict + marshal + json', legacy), ('compiled + ' + ('orjson' if orjson else 'json'), compiled)):
+            samples = [timed(func, places)[1] for _ in range(args.rounds)]
+            report(f"{label} ({args.places} places)", samples)
+            results[label] = sorted(samples)[len(samples) // 2]
+        old, new = results.values()
+        print(f"speedup (p50): {old / new:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
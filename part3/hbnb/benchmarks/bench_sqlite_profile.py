@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark a mixed read/write load: default SQLite vs the production profile.
+
+Each run seeds --places places, then --threads threads go through the
+facade (entity cache disabled) for --seconds: reads fetch a place and a
+page of places, --write-ratio of the operations update a place's price.
+Reports operations per second, latency percentiles and failed operations
+(for example "database is locked").
+
+Usage (from part3/hbnb):
+    python -m benchmarks.bench_sqlite_profile --places 1000 --threads 8 --seconds 10
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import make_app, percentiles
+from app import db
+from app.services import facade
+from config import ProductionConfig
+
+
+def seed(app, count):
+    """Create an owner and count places; return the place IDs."""
+    with app.app_context():
+        owner = facade.create_user({'first_name': 'Bench', 'last_name': 'Owner',
+                                    'email': 'owner@hbnb.io', 'password': 'secret'})
+        items = [{'title': f'Place {i}', 'price': 100.0 + i, 'latitude': 48.85,
+                  'longitude': 2.35, 'owner_id': owner.id} for i in range(count)]
+        place_ids, _ = facade.create_places_bulk(items)
+        db.session.remove()
+    return place_ids
+
+
+def run(app, place_ids, args):
+    """Return (operations per second, latency samples in ms, error count)."""
+    samples, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        local_samples, local_errors = [], 0
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                place_id = rng.choice(place_ids)
+                start = time.perf_counter()
+                try:
+                    if rng.random() < args.write_ratio:
+                        facade.update_place(place_id, {'price': rng.uniform(10, 500)})
+                    else:
+                        facade.get_place(place_id)
+                        facade.get_places_page(20)
+                except Exception:
+                    local_errors += 1
+                db.session.remove()
+                local_samples.append((time.perf_counter() - start) * 1000)
+        samples.extend(local_samples)
+        errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(samples) / (time.perf_counter() - start), samples, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    profiles = (
+        ('default', {}),
+        ('production profile', {
+            'SQLALCHEMY_ENGINE_OPTIONS': ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS,
+            'SQLITE_PRAGMAS': ProductionConfig.SQLITE_PRAGMAS
+        }),
+    )
+    for label, settings in profiles:
+        app = make_app(CACHE_BACKEND='none', BCRYPT_POOL_SIZE=0, **settings)
+        place_ids = seed(app, args.places)
+        rate, samples, errors = run(app, place_ids, args)
+        stats = percentiles(samples)
+        print(f"{label:<20} {rate:8.1f} ops/s  p50={stats['p50']:8.3f} ms  "
+              f"p99={stats['p99']:8.3f} ms  errors={errors}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Shared helpers for the HBnB benchmark scripts."""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Allow running the scripts from the hbnb directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from config import Config
+
+
+def make_app(db_path=None, **settings):
+    """Create an app bound to a throw-away SQLite file with the tables created."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='hbnb-bench-'), 'bench.db')
+    attrs = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'}
+    attrs.update(settings)
+    app = create_app(type('BenchConfig', (Config,), attrs))
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def timed(func, *args, **kwargs):
+    """Run func once and return (result, elapsed milliseconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def percentiles(samples):
+    """Return p50/p99/max of a list of millisecond samples."""
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return {'p50': statistics.median(ordered), 'p99': p99, 'max': ordered[-1]}
+
+
+def report(label, samples):
+    """Print a one-line latency summary."""
+    stats = percentiles(samples)
+    print(f"{label:<32} n={len(samples):<6} p50={stats['p50']:8.3f} ms  "
+          f"p99={stats['p99']:8.3f} ms  max={stats['max']:8.3f} ms")
@@ -8,6 +8,53 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     DEBUG = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 20))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 100))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    GEO_SEARCH_MAX_RADIUS_KM = float(os.getenv('GEO_SEARCH_MAX_RADIUS_KM', 200))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 500))
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 50000))
+    MULTI_GET_MAX_IDS = int(os.getenv('MULTI_GET_MAX_IDS', 100))
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # memory, redis or none
+    CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    COMPRESS_ALGORITHMS = os.getenv('COMPRESS_ALGORITHMS', 'br,zstd,gzip')  # preference order, empty disables
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_LEVEL = int(os.getenv('COMPRESS_BROTLI_LEVEL', 5))
+    COMPRESS_ZSTD_LEVEL = int(os.getenv('COMPRESS_ZSTD_LEVEL', 3))
+    COMPRESS_CACHE_MAX_ENTRIES = int(os.getenv('COMPRESS_CACHE_MAX_ENTRIES', 256))
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # 0 hashes inline; defaults to the CPUs per web worker (WEB_CONCURRENCY)
+    BCRYPT_POOL_SIZE = int(os.getenv('BCRYPT_POOL_SIZE', max(
+        1, (os.cpu_count() or 1) // int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1)))))
+    BCRYPT_TIMEOUT_SECONDS = float(os.getenv('BCRYPT_TIMEOUT_SECONDS', 10))
+    JWT_DECODE_CACHE_MAX_ENTRIES = int(os.getenv('JWT_DECODE_CACHE_MAX_ENTRIES', 4096))  # 0 disables
+    JWT_REVOCATION_REFRESH_SECONDS = float(os.getenv('JWT_REVOCATION_REFRESH_SECONDS', 1))
+    ID_STRATEGY = os.getenv('ID_STRATEGY', 'uuid7')  # uuid4, uuid7 or ulid
+    ID_STORAGE = os.getenv('ID_STORAGE', 'text')  # text or binary (16 bytes)
+    SQLITE_PRAGMAS = {}
+    SQLALCHEMY_REPLICA_URIS = [uri for uri in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if uri]
+    REPLICA_PIN_SECONDS = float(os.getenv('REPLICA_PIN_SECONDS', 5))
+    WRITE_QUEUE_ENABLED = os.getenv('WRITE_QUEUE_ENABLED', 'false').lower() == 'true'
+    WRITE_QUEUE_MAX_BATCH = int(os.getenv('WRITE_QUEUE_MAX_BATCH', 64))
+    WRITE_QUEUE_MAX_DELAY_MS = float(os.getenv('WRITE_QUEUE_MAX_DELAY_MS', 2))
+    WRITE_QUEUE_TIMEOUT_SECONDS = float(os.getenv('WRITE_QUEUE_TIMEOUT_SECONDS', 10))
+    WARMUP_DB_CONNECTIONS = int(os.getenv('WARMUP_DB_CONNECTIONS', 4))
+    WARMUP_CACHE_PLACES = int(os.getenv('WARMUP_CACHE_PLACES', 100))
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_READ_LIMIT = int(os.getenv('ADMISSION_READ_LIMIT', 64))
+    ADMISSION_WRITE_LIMIT = int(os.getenv('ADMISSION_WRITE_LIMIT', 16))
+    ADMISSION_LOGIN_LIMIT = int(os.getenv('ADMISSION_LOGIN_LIMIT', 4))
+    ADMISSION_BULK_LIMIT = int(os.getenv('ADMISSION_BULK_LIMIT', 2))  # fixed, bulk imports and exports
+    ADMISSION_READ_TARGET_MS = int(os.getenv('ADMISSION_READ_TARGET_MS', 250))
+    ADMISSION_WRITE_TARGET_MS = int(os.getenv('ADMISSION_WRITE_TARGET_MS', 500))
+    ADMISSION_LOGIN_TARGET_MS = int(os.getenv('ADMISSION_LOGIN_TARGET_MS', 1000))
+    ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', 16))
+    ADMISSION_QUEUE_TIMEOUT_MS = int(os.getenv('ADMISSION_QUEUE_TIMEOUT_MS', 100))
+    ADMISSION_BACKOFF = float(os.getenv('ADMISSION_BACKOFF', 0.9))
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 1))
 
 
 class DevelopmentConfig(Config):
@@ -17,11 +64,27 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    BCRYPT_POOL_SIZE = 0
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
 
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///production.db')
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    }
+    # SQLite performance profile, run on every new connection (app/persistence/sqlite.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'synchronous': 'NORMAL',
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024)),
+        'foreign_keys': 'ON',
+    }
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Gunicorn settings: ``gunicorn -c gunicorn.conf.py wsgi:app``.
+
+The app is preloaded in the master and every forked worker warms up
+before it accepts connections.
+"""
+
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+threads = int(os.getenv('THREADS', 4))
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Warm the new worker up with the preloaded app."""
+    from app.warmup import warm_up
+    warm_up(worker.app.wsgi())
+
+
+def when_ready(server):
+    """Warn when every worker would keep its own entity cache."""
+    from app.services import facade
+    from app.services.cache import per_process_warning
+    warning = per_process_warning(facade.cache, server.cfg.workers)
+    if warning:
+        server.log.warning(warning)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Preforking production launcher without extra dependencies.
+
+The master process imports ``wsgi`` (which creates the app and builds its
+Swagger spec once), binds the listening socket and forks one worker per
+core. Each worker warms up (database connections, caches) and only then
+starts accepting connections on the shared socket with a threaded WSGI
+server. Workers that die are replaced; SIGINT/SIGTERM stop them all.
+
+Usage (from part3/hbnb):
+    python serve.py --port 8000 --workers 4
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+from werkzeug.serving import make_server
+
+
+def run_worker(app, sock):
+    """Worker process body: warm up, then serve until killed."""
+    from app.warmup import warm_up
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    warm_up(app)
+    print(f"[{os.getpid()}] worker ready in {app.extensions['warmup_ms']} ms", flush=True)
+    server = make_server(*sock.getsockname()[:2], app, threaded=True, fd=sock.fileno())
+    server.serve_forever()
+
+
+def spawn(app, sock):
+    """Fork a worker and return its pid."""
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock)
+        except BaseException as e:
+            print(f"[{os.getpid()}] worker failed: {e!r}", file=sys.stderr, flush=True)
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', 8000)))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1)))
+    parser.add_argument('--backlog', type=int, default=1024)
+    args = parser.parse_args()
+    os.environ['WEB_CONCURRENCY'] = str(args.workers)  # sizes per-worker pools (config.py)
+
+    from wsgi import app  # preloaded once, shared copy-on-write by the workers
+    from app.services import facade
+    from app.services.cache import per_process_warning
+
+    warning = per_process_warning(facade.cache, args.workers)
+    if warning:
+        print(f"[{os.getpid()}] warning: {warning}", file=sys.stderr, flush=True)
+
+    sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    sock.set_inheritable(True)
+    workers = {spawn(app, sock) for _ in range(args.workers)}
+    print(f"[{os.getpid()}] master listening on {args.host}:{args.port} "
+          f"with {args.workers} workers", flush=True)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            time.sleep(1)  # do not spin if workers keep failing
+            workers.add(spawn(app, sock))
+    sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@ PRAGMA foreign_keys = ON;
 -- ===========================================
 -- DROP TABLES (in reverse order of dependencies)
 -- ===========================================
+DROP TABLE IF EXISTS revoked_tokens;
 DROP TABLE IF EXISTS place_amenity;
 DROP TABLE IF EXISTS reviews;
 DROP TABLE IF EXISTS places;
@@ -55,6 +56,9 @@ CREATE TABLE places (
     latitude DECIMAL(9, 6) CHECK(latitude >= -90.0 AND latitude <= 90.0),
     longitude DECIMAL(10, 6) CHECK(longitude >= -180.0 AND longitude <= 180.0),
     owner_id VARCHAR(36) NOT NULL,
+    geo_cell INTEGER,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
@@ -63,6 +67,12 @@ CREATE TABLE places (
 -- Index for owner lookups
 CREATE INDEX idx_places_owner ON places(owner_id);
 
+-- Index for keyset pagination
+CREATE INDEX idx_places_created_at_id ON places(created_at, id);
+
+-- Index for geospatial search (grid cell of latitude/longitude)
+CREATE INDEX idx_places_geo_cell ON places(geo_cell);
+
 -- ===========================================
 -- REVIEWS TABLE
 -- ===========================================
@@ -98,3 +108,14 @@ CREATE TABLE place_amenity (
 -- Index for amenity lookups
 CREATE INDEX idx_place_amenity_place ON place_amenity(place_id);
 CREATE INDEX idx_place_amenity_amenity ON place_amenity(amenity_id);
+
+-- ===========================================
+-- REVOKED_TOKENS TABLE (logout)
+-- ===========================================
+CREATE TABLE revoked_tokens (
+    jti VARCHAR(36) PRIMARY KEY,
+    expires_at FLOAT
+);
+
+-- Index for purging the revocations of expired tokens
+CREATE INDEX idx_revoked_tokens_expires_at ON revoked_tokens(expires_at);
@@ -4,12 +4,15 @@
 import sys
 import os
 import json
+import tempfile
+import time
 import unittest
 
 # Add the parent directory to the path to allow imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import create_app
+from app import create_app, db
+from config import TestingConfig
 
 
 class TestUserAPI(unittest.TestCase):
@@ -578,5 +581,1551 @@ class TestReviewAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class DatabaseAPITestCase(unittest.TestCase):
+    """Base test case backed by a fresh in-memory database and an admin token."""
+
+    config = TestingConfig
+
+    def setUp(self):
+        """Create the schema, an admin user and its access token."""
+        from app.services import facade
+        self.app = create_app(self.config)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.admin = facade.create_user({
+            'first_name': 'Admin',
+            'last_name': 'HBnB',
+            'email': 'admin@hbnb.io',
+            'password': 'admin1234',
+            'is_admin': True
+        })
+        response = self.client.post('/api/v1/auth/login', json={
+            'email': 'admin@hbnb.io',
+            'password': 'admin1234'
+        })
+        self.headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    def tearDown(self):
+        """Drop the schema and release the application context."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def create_place(self, title='Place', **extra):
+        """Create a place owned by the admin and return its JSON."""
+        payload = {'title': title, 'description': '', 'price': 100.0, 'latitude': 10.0, 'longitude': 20.0}
+        payload.update(extra)
+        response = self.client.post('/api/v1/places/', json=payload, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()
+
+
+class TestPlacePagination(DatabaseAPITestCase):
+    """Test cases for cursor pagination on the place list."""
+
+    def test_pages_cover_every_place_once(self):
+        """Test that walking the cursors returns each place exactly once."""
+        created = [self.create_place(f'Place {i}')['id'] for i in range(7)]
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/v1/places/?limit=3' + (f'&cursor={cursor}' if cursor else '')
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            self.assertLessEqual(len(data['places']), 3)
+            seen.extend(place['id'] for place in data['places'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(created))
+
+    def test_unpaginated_list_is_unchanged(self):
+        """Test that omitting limit/cursor still returns a plain list."""
+        self.create_place()
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.get_json(), list)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        response = self.client.get('/api/v1/places/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestPlaceQueryCount(DatabaseAPITestCase):
+    """Test that place reads issue a constant number of SQL statements."""
+
+    def seed_places(self, count):
+        """Create places with distinct owners and two amenities each."""
+        from app.services import facade
+        amenities = [
+            facade.create_amenity({'name': f'Amenity {count}-{i}'}).id
+            for i in range(2)
+        ]
+        for i in range(count):
+            owner = facade.create_user({
+                'first_name': 'Owner',
+                'last_name': str(i),
+                'email': f'owner{count}.{i}@hbnb.io',
+                'password': 'secret'
+            })
+            self.create_place(f'Place {i}', owner_id=owner.id, amenities=amenities)
+
+    def count_statements(self, url):
+        """Return how many SQL statements a GET on url executes."""
+        from sqlalchemy import event
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+
+    def test_list_statement_count_is_constant(self):
+        """Test that listing 3 or 15 places costs the same number of queries."""
+        self.seed_places(3)
+        small = self.count_statements('/api/v1/places/')
+        self.seed_places(12)
+        large = self.count_statements('/api/v1/places/')
+        self.assertEqual(small, large)
+        # Three ETag version probes, then places+owners and amenities
+        self.assertLessEqual(large, 5)
+
+    def test_detail_statement_count(self):
+        """Test that a place detail read loads owner and amenities eagerly."""
+        self.seed_places(1)
+        place_id = self.client.get('/api/v1/places/').get_json()[0]['id']
+        self.assertLessEqual(self.count_statements(f'/api/v1/places/{place_id}'), 2)
+
+
+class TestExportAPI(DatabaseAPITestCase):
+    """Test cases for the NDJSON export endpoint."""
+
+    def test_export_places(self):
+        """Test that every place is streamed as one JSON line."""
+        ids = {self.create_place(f'Place {i}')['id'] for i in range(3)}
+        response = self.client.get('/api/v1/export/places', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual({json.loads(line)['id'] for line in lines}, ids)
+
+    def test_export_users_hides_password(self):
+        """Test that exported users do not include password hashes."""
+        response = self.client.get('/api/v1/export/users', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        user = json.loads(response.get_data(as_text=True).splitlines()[0])
+        self.assertNotIn('password', user)
+
+    def test_export_unknown_entity(self):
+        """Test that exporting an unknown entity returns 404."""
+        response = self.client.get('/api/v1/export/bookings', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_requires_token(self):
+        """Test that exporting without a token is rejected."""
+        response = self.client.get('/api/v1/export/places')
+        self.assertEqual(response.status_code, 401)
+
+
+class TestPlaceSearch(DatabaseAPITestCase):
+    """Test cases for geospatial place search."""
+
+    def setUp(self):
+        """Create places in Paris, Versailles and London."""
+        super().setUp()
+        self.paris = self.create_place('Paris', latitude=48.8566, longitude=2.3522)['id']
+        self.versailles = self.create_place('Versailles', latitude=48.8049, longitude=2.1204)['id']
+        self.london = self.create_place('London', latitude=51.5074, longitude=-0.1278)['id']
+
+    def test_radius_search(self):
+        """Test that a radius search returns nearby places nearest first."""
+        response = self.client.get('/api/v1/places/search?lat=48.85&lng=2.35&radius_km=30')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([place['id'] for place in data], [self.paris, self.versailles])
+        self.assertLess(data[0]['distance_km'], data[1]['distance_km'])
+
+    def test_bbox_search(self):
+        """Test that a bounding box search returns the places inside it."""
+        response = self.client.get('/api/v1/places/search?bbox=-1,48,3,52')
+        self.assertEqual(response.status_code, 200)
+        ids = {place['id'] for place in response.get_json()}
+        self.assertEqual(ids, {self.paris, self.versailles, self.london})
+
+    def test_search_follows_updates(self):
+        """Test that moving a place updates its grid cell."""
+        self.client.put(f'/api/v1/places/{self.london}', json={
+            'latitude': 48.86, 'longitude': 2.34
+        }, headers=self.headers)
+        response = self.client.get('/api/v1/places/search?lat=48.85&lng=2.35&radius_km=5')
+        self.assertIn(self.london, [place['id'] for place in response.get_json()])
+
+    def test_search_invalid_parameters(self):
+        """Test that missing or out of range parameters are rejected."""
+        self.assertEqual(self.client.get('/api/v1/places/search?lat=48').status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/v1/places/search?lat=48&lng=2&radius_km=100000').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/search?bbox=1,2,3').status_code, 400)
+
+    def test_backfill_command_fills_missing_cells(self):
+        """Test that backfill-geo-cells makes places written without a cell searchable."""
+        from sqlalchemy import text
+        from app.services import facade
+        db.session.execute(text('UPDATE places SET geo_cell = NULL'))
+        db.session.commit()
+        facade.cache.clear()
+        response = self.client.get('/api/v1/places/search?lat=48.85&lng=2.35&radius_km=30')
+        self.assertEqual(response.get_json(), [])
+
+        result = self.app.test_cli_runner().invoke(args=['backfill-geo-cells', '--batch-size', '2'])
+        self.assertIn('3 places', result.output)
+        response = self.client.get('/api/v1/places/search?lat=48.85&lng=2.35&radius_km=30')
+        self.assertEqual([place['id'] for place in response.get_json()], [self.paris, self.versailles])
+
+
+class TestPlaceRatingAggregates(DatabaseAPITestCase):
+    """Test cases for the denormalized place rating aggregates."""
+
+    def setUp(self):
+        """Create a place to review."""
+        super().setUp()
+        self.place_id = self.create_place()['id']
+
+    def post_review(self, rating, email):
+        """Create a review of the place by a new user."""
+        from app.services import facade
+        user = facade.create_user({'first_name': 'R', 'last_name': 'R', 'email': email,
+                                   'password': 'secret'})
+        response = self.client.post('/api/v1/reviews/', json={
+            'text': 'Nice', 'rating': rating, 'place_id': self.place_id, 'user_id': user.id
+        }, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['id']
+
+    def get_place(self):
+        """Return the place JSON."""
+        return self.client.get(f'/api/v1/places/{self.place_id}').get_json()
+
+    def test_aggregates_follow_review_writes(self):
+        """Test that create, update and delete keep the average in sync."""
+        self.assertIsNone(self.get_place()['average_rating'])
+        first = self.post_review(5, 'r1@hbnb.io')
+        self.post_review(2, 'r2@hbnb.io')
+        self.assertEqual(self.get_place()['review_count'], 2)
+        self.assertEqual(self.get_place()['average_rating'], 3.5)
+
+        self.client.put(f'/api/v1/reviews/{first}', json={'text': 'Ok', 'rating': 4},
+                        headers=self.headers)
+        self.assertEqual(self.get_place()['average_rating'], 3.0)
+
+        self.client.delete(f'/api/v1/reviews/{first}', headers=self.headers)
+        place = self.get_place()
+        self.assertEqual(place['review_count'], 1)
+        self.assertEqual(place['average_rating'], 2.0)
+
+    def test_invalid_update_leaves_aggregates(self):
+        """Test that a rejected rating update does not change the aggregates."""
+        review_id = self.post_review(4, 'r1@hbnb.io')
+        response = self.client.put(f'/api/v1/reviews/{review_id}', json={'text': 'x', 'rating': 9},
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.get_place()['average_rating'], 4.0)
+
+    def test_recompute_command_repairs_drift(self):
+        """Test that recompute-ratings rebuilds the aggregates from reviews."""
+        from app.services import facade
+        self.post_review(3, 'r1@hbnb.io')
+        facade.place_repo.adjust_rating(self.place_id, 10, 100)
+        db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['recompute-ratings'])
+        self.assertIn('1 places', result.output)
+        place = self.get_place()
+        self.assertEqual(place['review_count'], 1)
+        self.assertEqual(place['average_rating'], 3.0)
+
+
+class TestEntityCache(DatabaseAPITestCase):
+    """Test cases for the facade read-through cache."""
+
+    def test_cache_hit_skips_database(self):
+        """Test that a repeated lookup is served from the cache."""
+        from unittest import mock
+        from app.services import facade
+        amenity_id = facade.create_amenity({'name': 'Sauna'}).id
+        db.session.remove()
+        self.assertEqual(facade.get_amenity(amenity_id).name, 'Sauna')
+        db.session.remove()
+        with mock.patch.object(facade.amenity_repo, 'get') as repo_get:
+            self.assertEqual(facade.get_amenity(amenity_id).name, 'Sauna')
+        repo_get.assert_not_called()
+        self.assertEqual(facade.cache.stats.hits, 1)
+
+    def test_update_invalidates(self):
+        """Test that updates are visible on the next lookup."""
+        from app.services import facade
+        place_id = self.create_place('Before')['id']
+        self.client.get(f'/api/v1/places/{place_id}')
+        self.client.put(f'/api/v1/places/{place_id}', json={'title': 'After'}, headers=self.headers)
+        db.session.remove()
+        self.assertEqual(self.client.get(f'/api/v1/places/{place_id}').get_json()['title'], 'After')
+        self.client.delete(f'/api/v1/places/{place_id}', headers=self.headers)
+        self.assertEqual(self.client.get(f'/api/v1/places/{place_id}').status_code, 404)
+
+    def test_writes_do_not_use_cached_snapshots(self):
+        """Test that a write reloads its target instead of mutating a stale cached copy."""
+        from sqlalchemy import text
+        from app.services import facade
+        wifi = facade.create_amenity({'name': 'WiFi'}).id
+        pool = facade.create_amenity({'name': 'Pool'}).id
+        place_id = self.create_place(amenities=[wifi])['id']
+        db.session.remove()
+        self.client.get(f'/api/v1/places/{place_id}')
+        db.session.remove()
+        # Another worker unlinks WiFi; this worker's cache still lists it
+        db.session.execute(text('DELETE FROM place_amenity'))
+        db.session.commit()
+        db.session.remove()
+        response = self.client.put(f'/api/v1/places/{place_id}', json={'amenities': [pool]},
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([amenity['id'] for amenity in response.get_json()['amenities']], [pool])
+
+    def test_unreachable_redis_is_a_miss(self):
+        """Test that Redis connection errors degrade to cache misses."""
+        from app.services.cache import RedisCache, redis
+        if redis is None:
+            self.skipTest('redis is not installed')
+        cache = RedisCache('redis://127.0.0.1:1/0', timeout=0.1)
+        self.assertIsNone(cache.get('place:x'))
+        cache.set('place:x', b'data')
+        cache.delete('place:x')
+        cache.clear()
+        self.assertEqual(cache.stats.misses, 1)
+        self.assertEqual(cache.stats.errors, 4)
+
+    def test_memory_cache_warns_with_several_workers(self):
+        """Test that the per-process memory backend is flagged for multi-worker runs."""
+        from app.services.cache import LRUTTLCache, NullCache, per_process_warning
+        self.assertIsNone(per_process_warning(LRUTTLCache(), 1))
+        self.assertIn('CACHE_BACKEND=redis', per_process_warning(LRUTTLCache(), 4))
+        self.assertIsNone(per_process_warning(NullCache(), 4))
+
+    def test_lru_eviction_and_ttl(self):
+        """Test LRU eviction order and TTL expiry of the memory backend."""
+        from app.services.cache import LRUTTLCache
+        cache = LRUTTLCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats.evictions, 1)
+        expired = LRUTTLCache(ttl=-1)
+        expired.set('a', 1)
+        self.assertIsNone(expired.get('a'))
+
+    def test_metrics_report_cache_counters(self):
+        """Test that the metrics endpoint exposes the cache counters."""
+        response = self.client.get('/api/v1/metrics/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.get_json()['cache'])
+
+
+class TestConditionalRequests(DatabaseAPITestCase):
+    """Test cases for ETag / Last-Modified handling on GET resources."""
+
+    def test_entity_not_modified(self):
+        """Test that a matching If-None-Match returns 304 until the place changes."""
+        place_id = self.create_place()['id']
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+
+        response = self.client.get(f'/api/v1/places/{place_id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        self.client.put(f'/api/v1/places/{place_id}', json={'title': 'Changed'}, headers=self.headers)
+        response = self.client.get(f'/api/v1/places/{place_id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_collection_not_modified(self):
+        """Test that collection ETags change when an item is added."""
+        for url in ('/api/v1/amenities/', '/api/v1/users/', '/api/v1/reviews/', '/api/v1/places/'):
+            etag = self.client.get(url).headers['ETag']
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304, url)
+
+        etag = self.client.get('/api/v1/amenities/').headers['ETag']
+        self.client.post('/api/v1/amenities/', json={'name': 'Gym'}, headers=self.headers)
+        response = self.client.get('/api/v1/amenities/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_page_tags_come_from_its_rows(self):
+        """Test that a page is tagged from its rows, without counting the tables."""
+        from sqlalchemy import event
+        self.create_place('First')
+        self.create_place('Second')
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            etag = self.client.get('/api/v1/places/?limit=2').headers['ETag']
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual([s for s in statements if 'count(' in s.lower()], [])
+        response = self.client.get('/api/v1/places/?limit=2', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        # A third place gives the same two rows a next cursor
+        self.create_place('Third')
+        response = self.client.get('/api/v1/places/?limit=2', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_tag_changes_when_a_row_is_deleted(self):
+        """Test that deleting a place changes the list ETag."""
+        place_id = self.create_place()['id']
+        self.create_place('Other')
+        etag = self.client.get('/api/v1/places/').headers['ETag']
+        self.client.delete(f'/api/v1/places/{place_id}', headers=self.headers)
+        response = self.client.get('/api/v1/places/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 1)
+
+    def test_errors_have_no_etag(self):
+        """Test that 404 responses carry no validators."""
+        response = self.client.get('/api/v1/places/missing')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response.headers)
+
+
+class TestPlaceAmenityResolution(DatabaseAPITestCase):
+    """Test cases for batch amenity resolution on place writes."""
+
+    def test_duplicates_are_ignored(self):
+        """Test that repeated amenity IDs are stored once."""
+        from app.services import facade
+        wifi = facade.create_amenity({'name': 'WiFi'}).id
+        pool = facade.create_amenity({'name': 'Pool'}).id
+        place = self.create_place(amenities=[wifi, pool, wifi])
+        self.assertEqual(sorted(a['id'] for a in place['amenities']), sorted([wifi, pool]))
+
+    def test_unknown_amenities_are_reported(self):
+        """Test that unknown amenity IDs are listed in the error."""
+        from app.services import facade
+        wifi = facade.create_amenity({'name': 'WiFi'}).id
+        response = self.client.post('/api/v1/places/', json={
+            'title': 'Place', 'description': '', 'price': 10.0, 'latitude': 1.0, 'longitude': 1.0,
+            'amenities': [wifi, 'nope-1', 'nope-2']
+        }, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope-1, nope-2', response.get_json()['error'])
+
+        place_id = self.create_place(amenities=[wifi])['id']
+        response = self.client.put(f'/api/v1/places/{place_id}', json={'amenities': ['nope-3']},
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope-3', response.get_json()['error'])
+
+    def test_non_string_amenity_ids_are_rejected(self):
+        """Test that amenities must be a list of string IDs."""
+        place = {'title': 'Place', 'description': '', 'price': 10.0, 'latitude': 1.0,
+                 'longitude': 1.0}
+        for amenities in ([['nested']], [{'id': 'x'}], [1], 'not-a-list'):
+            response = self.client.post('/api/v1/places/', json=dict(place, amenities=amenities),
+                                        headers=self.headers)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('must be a list', response.get_json()['error'])
+
+        place_id = self.create_place()['id']
+        response = self.client.put(f'/api/v1/places/{place_id}', json={'amenities': [['x']]},
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/v1/places/bulk', json=[
+            dict(place, owner_id=self.admin.id, amenities=[{'id': 'x'}])], headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('must be a list', response.get_json()['errors'][0]['error'])
+
+
+class TestBulkCreate(DatabaseAPITestCase):
+    """Test cases for the bulk create endpoints."""
+
+    def test_bulk_places_with_item_errors(self):
+        """Test that valid places are created and invalid ones reported by index."""
+        from app.services import facade
+        wifi = facade.create_amenity({'name': 'WiFi'}).id
+        item = {'title': 'Bulk', 'price': 10.0, 'latitude': 1.0, 'longitude': 2.0,
+                'owner_id': self.admin.id, 'amenities': [wifi]}
+        payload = [dict(item, title=f'Bulk {i}') for i in range(5)]
+        payload.insert(2, dict(item, price=-1))
+        payload.append(dict(item, owner_id='missing'))
+        response = self.client.post('/api/v1/places/bulk', json=payload, headers=self.headers)
+        self.assertEqual(response.status_code, 207)
+        data = response.get_json()
+        self.assertEqual(len(data['created']), 5)
+        self.assertEqual([error['index'] for error in data['errors']], [2, 6])
+        self.assertIn('items_per_second', data)
+        self.assertEqual(len(self.client.get('/api/v1/places/').get_json()), 5)
+
+    def test_bulk_amenities_conflicts_are_isolated(self):
+        """Test that an existing name only rejects its own item."""
+        self.app.config['BULK_CHUNK_SIZE'] = 2
+        self.client.post('/api/v1/amenities/', json={'name': 'Pool'}, headers=self.headers)
+        payload = [{'name': 'Gym'}, {'name': 'Pool'}, {'name': 'Sauna'}, {'name': 'Gym'}]
+        response = self.client.post('/api/v1/amenities/bulk', json=payload, headers=self.headers)
+        self.assertEqual(response.status_code, 207)
+        data = response.get_json()
+        self.assertEqual(len(data['created']), 2)
+        self.assertEqual([error['index'] for error in data['errors']], [1, 3])
+
+    def test_bulk_reviews_update_ratings(self):
+        """Test that bulk reviews update the place aggregates."""
+        from app.services import facade
+        place_id = self.create_place()['id']
+        users = [facade.create_user({'first_name': 'U', 'last_name': str(i), 'email': f'u{i}@hbnb.io',
+                                     'password': 'secret'}).id for i in range(2)]
+        payload = [{'text': 'Good', 'rating': rating, 'place_id': place_id, 'user_id': user_id}
+                   for user_id, rating in zip(users, (4, 2))]
+        response = self.client.post('/api/v1/reviews/bulk', json=payload, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        place = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(place['review_count'], 2)
+        self.assertEqual(place['average_rating'], 3.0)
+
+    def test_bulk_requires_array(self):
+        """Test that a non-array body is rejected."""
+        response = self.client.post('/api/v1/amenities/bulk', json={'name': 'Gym'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+class TestUnitOfWork(DatabaseAPITestCase):
+    """Test cases for the one-commit-per-request unit of work."""
+
+    def count_commits(self, method, url, **kwargs):
+        """Return (response, number of commits) for one request."""
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        commits = []
+
+        def record(session):
+            commits.append(session)
+
+        event.listen(Session, 'after_commit', record)
+        try:
+            response = getattr(self.client, method)(url, headers=self.headers, **kwargs)
+        finally:
+            event.remove(Session, 'after_commit', record)
+        return response, len(commits)
+
+    def test_review_creation_commits_once(self):
+        """Test that creating a review and its aggregates is one commit."""
+        from app.services import facade
+        place_id = self.create_place()['id']
+        user = facade.create_user({'first_name': 'R', 'last_name': 'R', 'email': 'r@hbnb.io',
+                                   'password': 'secret'})
+        response, commits = self.count_commits('post', '/api/v1/reviews/', json={
+            'text': 'Great', 'rating': 5, 'place_id': place_id, 'user_id': user.id
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(commits, 1)
+
+    def test_failed_update_rolls_back(self):
+        """Test that a rejected update commits nothing and leaves the row unchanged."""
+        place_id = self.create_place('Original')['id']
+        response, commits = self.count_commits('put', f'/api/v1/places/{place_id}', json={
+            'title': 'Changed', 'price': -5
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(commits, 0)
+        db.session.remove()
+        self.assertEqual(self.client.get(f'/api/v1/places/{place_id}').get_json()['title'], 'Original')
+
+    def test_nested_scopes_commit_once(self):
+        """Test that nested units of work join the outermost one."""
+        from app.persistence.unit_of_work import in_unit_of_work, unit_of_work
+        from app.services import facade
+        with unit_of_work():
+            facade.create_amenity({'name': 'Gym'})
+            facade.create_amenity({'name': 'Spa'})
+            self.assertTrue(in_unit_of_work())
+        self.assertFalse(in_unit_of_work())
+        self.assertEqual(len(facade.get_all_amenities()), 2)
+
+
+class TestCompiledSerializers(DatabaseAPITestCase):
+    """Test cases for the compiled model serializers."""
+
+    def test_compiled_matches_marshal(self):
+        """Test that a compiled serializer produces what marshal produces."""
+        from flask_restx import marshal
+        from app.api.v1.places import place_response_model, place_to_dict
+        from app.services import facade
+        wifi = facade.create_amenity({'name': 'WiFi'}).id
+        place = facade.get_place(self.create_place(amenities=[wifi])['id'])
+        legacy = {
+            'id': place.id, 'title': place.title, 'description': place.description,
+            'price': place.price, 'latitude': place.latitude, 'longitude': place.longitude,
+            'review_count': place.review_count, 'average_rating': place.average_rating,
+            'owner': {'id': place.owner.id, 'first_name': place.owner.first_name,
+                      'last_name': place.owner.last_name, 'email': place.owner.email},
+            'amenities': [{'id': a.id, 'name': a.name} for a in place.amenities]
+        }
+        self.assertEqual(place_to_dict(place), dict(marshal(legacy, place_response_model)))
+
+    def test_json_representation(self):
+        """Test that responses are compact JSON with the JSON content type."""
+        self.create_place()
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertNotIn(b'\n    ', response.data)
+        self.assertEqual(response.get_json()[0]['title'], 'Place')
+
+
+class TestSparseFieldsets(DatabaseAPITestCase):
+    """Test cases for ?fields= projection and ?include= expansion."""
+
+    def record_statements(self, url):
+        """GET url and return the response and the SQL statements it ran."""
+        from sqlalchemy import event
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        return response, statements
+
+    def test_fields_projection_skips_columns(self):
+        """Test that ?fields= trims the body and the SELECT list."""
+        place_id = self.create_place('Loft', description='Very long text')['id']
+        response, statements = self.record_statements(
+            '/api/v1/places/?fields=title,price,latitude,longitude')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [{
+            'id': place_id, 'title': 'Loft', 'price': 100.0, 'latitude': 10.0, 'longitude': 20.0
+        }])
+        select = next(sql for sql in statements if 'FROM places' in sql and 'count' not in sql)
+        self.assertNotIn('description', select)
+        self.assertNotIn('users', select)
+
+    def test_include_expands_relations(self):
+        """Test that ?include= embeds relations loaded in batch."""
+        from app.services import facade
+        place_id = self.create_place()['id']
+        guest = facade.create_user({'first_name': 'Guest', 'last_name': 'User',
+                                    'email': 'guest@hbnb.io', 'password': 'secret'})
+        facade.create_review({'text': 'Nice', 'rating': 4, 'place_id': place_id,
+                              'user_id': guest.id})
+        response = self.client.get(f'/api/v1/places/{place_id}?fields=title&include=owner,reviews')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(set(body), {'id', 'title', 'owner', 'reviews'})
+        self.assertEqual(body['owner']['email'], 'admin@hbnb.io')
+        self.assertEqual(body['reviews'][0]['rating'], 4)
+
+        response = self.client.get(f'/api/v1/users/{guest.id}?include=reviews')
+        self.assertEqual(response.get_json()['reviews'][0]['place_id'], place_id)
+        review = self.client.get('/api/v1/reviews/?fields=rating&include=user').get_json()[0]
+        self.assertEqual(review['user']['first_name'], 'Guest')
+        self.assertNotIn('text', review)
+
+    def test_unknown_names_rejected(self):
+        """Test that unknown fields or relations return 400."""
+        self.create_place()
+        response = self.client.get('/api/v1/places/?fields=title,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.get_json()['error'])
+        response = self.client.get('/api/v1/users/?include=owner')
+        self.assertEqual(response.status_code, 400)
+
+    def test_default_shape_unchanged(self):
+        """Test that responses without the parameters keep every field."""
+        self.create_place()
+        place = self.client.get('/api/v1/places/').get_json()[0]
+        self.assertIn('owner', place)
+        self.assertIn('description', place)
+        self.assertNotIn('reviews', place)
+
+
+class TestResponseCompression(DatabaseAPITestCase):
+    """Test cases for Accept-Encoding negotiated response compression."""
+
+    def test_large_body_is_gzipped(self):
+        """Test that a large list is gzip encoded and decodes to the same JSON."""
+        import gzip
+        import json
+        for i in range(10):
+            self.create_place(f'Place {i}', description='A quiet flat near the beach. ' * 4)
+        plain = self.client.get('/api/v1/places/')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        response = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(json.loads(gzip.decompress(response.data)), plain.get_json())
+
+    def test_small_body_is_not_compressed(self):
+        """Test that bodies under COMPRESS_MIN_SIZE are sent as is."""
+        response = self.client.get('/api/v1/amenities/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_unsupported_encoding_is_not_used(self):
+        """Test that an encoding the client did not accept is never chosen."""
+        for i in range(10):
+            self.create_place(f'Place {i}', description='x' * 200)
+        response = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'compress'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_compressed_variant_is_cached(self):
+        """Test that a body with an ETag is compressed once per encoding."""
+        for i in range(10):
+            self.create_place(f'Place {i}', description='x' * 200)
+        cache = self.app.extensions['compression_cache']
+        first = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip'})
+        second = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(cache.stats.hits, 1)
+
+    def test_compressed_etag_names_the_encoding(self):
+        """Test that each encoding gets its own ETag and still revalidates."""
+        for i in range(10):
+            self.create_place(f'Place {i}', description='x' * 200)
+        plain = self.client.get('/api/v1/places/')
+        gzipped = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(gzipped.headers['ETag'], plain.headers['ETag'][:-1] + '-gzip"')
+
+        response = self.client.get('/api/v1/places/', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': gzipped.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], gzipped.headers['ETag'])
+        response = self.client.get('/api/v1/places/', headers={
+            'If-None-Match': plain.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+
+class TestBinaryRepresentations(DatabaseAPITestCase):
+    """Test cases for the MessagePack and CBOR representations."""
+
+    def check_format(self, mediatype, dumps, loads):
+        """Create a place with a binary body and read it back in that format."""
+        headers = dict(self.headers, Accept=mediatype)
+        headers['Content-Type'] = mediatype
+        payload = {'title': 'Binary', 'description': '', 'price': 80.5,
+                   'latitude': 48.85, 'longitude': 2.35}
+        response = self.client.post('/api/v1/places/', data=dumps(payload), headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.mimetype, mediatype)
+        self.assertEqual(loads(response.data)['price'], 80.5)
+
+        response = self.client.get('/api/v1/places/', headers={'Accept': mediatype})
+        self.assertEqual(response.mimetype, mediatype)
+        self.assertEqual(loads(response.data), self.client.get('/api/v1/places/').get_json())
+
+        response = self.client.post('/api/v1/places/', data=b'\xc1\xff', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_msgpack(self):
+        """Test MessagePack request and response bodies."""
+        from app.api.serialization import msgpack
+        if msgpack is None:
+            self.skipTest('msgpack is not installed')
+        self.check_format('application/msgpack', msgpack.packb, msgpack.unpackb)
+
+    def test_cbor(self):
+        """Test CBOR request and response bodies."""
+        from app.api.serialization import cbor2
+        if cbor2 is None:
+            self.skipTest('cbor2 is not installed')
+        self.check_format('application/cbor', cbor2.dumps, cbor2.loads)
+
+    def test_etag_names_the_format(self):
+        """Test that a binary copy has its own ETag and varies on Accept."""
+        from app.api.serialization import BINARY_FORMATS
+        if not BINARY_FORMATS:
+            self.skipTest('msgpack and cbor2 are not installed')
+        mediatype = next(iter(BINARY_FORMATS))
+        place_id = self.create_place()['id']
+        plain = self.client.get(f'/api/v1/places/{place_id}')
+        binary = self.client.get(f'/api/v1/places/{place_id}', headers={'Accept': mediatype})
+        self.assertIn('Accept', plain.headers['Vary'])
+        self.assertIn('Accept', binary.headers['Vary'])
+        suffix = mediatype.split('/')[1]
+        self.assertEqual(binary.headers['ETag'], plain.headers['ETag'][:-1] + f'-{suffix}"')
+
+        response = self.client.get(f'/api/v1/places/{place_id}', headers={
+            'Accept': mediatype, 'If-None-Match': plain.headers['ETag']})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/v1/places/{place_id}', headers={
+            'Accept': mediatype, 'If-None-Match': binary.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept', response.headers['Vary'])
+
+    def test_json_stays_default(self):
+        """Test that clients without a preference still get JSON."""
+        response = self.client.get('/api/v1/amenities/', headers={'Accept': '*/*'})
+        self.assertEqual(response.mimetype, 'application/json')
+
+
+class TestMultiGet(DatabaseAPITestCase):
+    """Test cases for fetching many entities by ID in one request."""
+
+    def test_places_in_requested_order(self):
+        """Test that places come back in the order asked, with missing IDs."""
+        first = self.create_place('First')['id']
+        second = self.create_place('Second')['id']
+        response = self.client.get(f'/api/v1/places/?ids={second},nope,{first}')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual([place['id'] for place in body['places']], [second, first])
+        self.assertEqual(body['places'][0]['owner']['email'], 'admin@hbnb.io')
+        self.assertEqual(body['missing'], ['nope'])
+
+    def test_single_in_query(self):
+        """Test that the entities are loaded by one SELECT ... IN."""
+        from sqlalchemy import event
+        from app.services import facade
+        ids = [facade.create_amenity({'name': f'Amenity {i}'}).id for i in range(5)]
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get('/api/v1/amenities/?ids=' + ','.join(reversed(ids)))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual([a['id'] for a in response.get_json()['amenities']], ids[::-1])
+        self.assertEqual(len(statements), 1)
+        self.assertIn(' IN ', statements[0])
+
+    def test_users_and_reviews(self):
+        """Test multi-get on users (with fields) and reviews."""
+        from app.services import facade
+        guest = facade.create_user({'first_name': 'Guest', 'last_name': 'User',
+                                    'email': 'guest@hbnb.io', 'password': 'secret'})
+        place_id = self.create_place()['id']
+        review = facade.create_review({'text': 'Nice', 'rating': 5, 'place_id': place_id,
+                                       'user_id': guest.id})
+        body = self.client.get(f'/api/v1/users/?ids={guest.id}&fields=first_name').get_json()
+        self.assertEqual(body['users'], [{'id': guest.id, 'first_name': 'Guest'}])
+        body = self.client.get(f'/api/v1/reviews/?ids={review.id}').get_json()
+        self.assertEqual(body['reviews'][0]['rating'], 5)
+
+    def test_invalid_ids(self):
+        """Test that an empty or too long ids list is rejected."""
+        self.assertEqual(self.client.get('/api/v1/places/?ids=').status_code, 400)
+        self.app.config['MULTI_GET_MAX_IDS'] = 2
+        self.assertEqual(self.client.get('/api/v1/users/?ids=a,b,c').status_code, 400)
+
+
+class TestSingleFlight(DatabaseAPITestCase):
+    """Test cases for coalescing concurrent loads of the same key."""
+
+    def run_concurrently(self, count, target, leader_started, release):
+        """Start count threads on target once the leader is blocked, then release it."""
+        import threading
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        threads[0].start()
+        self.assertTrue(leader_started.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        from app.services import facade
+        while sum(flight.waiters for flight in list(facade.flights._flights.values())) < count - 1:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+    def test_concurrent_get_place_is_loaded_once(self):
+        """Test that concurrent get_place calls share one repository load."""
+        import threading
+        from app.services import facade
+        place_id = self.create_place('Viral')['id']
+        facade.cache.clear()
+        started, release = threading.Event(), threading.Event()
+        original_get = facade.place_repo.get
+        calls, titles = [], []
+
+        def slow_get(*args, **kwargs):
+            calls.append(args)
+            started.set()
+            release.wait(5)
+            return original_get(*args, **kwargs)
+
+        def request_place():
+            with self.app.app_context():
+                titles.append(facade.get_place(place_id).title)
+
+        facade.place_repo.get = slow_get
+        try:
+            self.run_concurrently(6, request_place, started, release)
+        finally:
+            facade.place_repo.get = original_get
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(titles, ['Viral'] * 6)
+        self.assertGreaterEqual(facade.flights.stats.coalesced, 5)
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failed load is raised to the callers that waited on it."""
+        import threading
+        from app.services.singleflight import SingleFlight
+        flights = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        errors = []
+
+        def load():
+            started.set()
+            release.wait(5)
+            raise RuntimeError('database is down')
+
+        def call():
+            try:
+                flights.do('key', load)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        self.assertTrue(started.wait(5))
+        follower = threading.Thread(target=call)
+        follower.start()
+        while not flights._flights['key'].waiters:
+            time.sleep(0.001)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        self.assertEqual(errors, ['database is down'] * 2)
+        self.assertEqual(flights._flights, {})
+
+
+class TestAdmissionControl(DatabaseAPITestCase):
+    """Test cases for per-class admission control and load shedding."""
+
+    def saturate(self, kind):
+        """Take every slot of a class and disable its queue."""
+        limiter = self.app.extensions['admission'][kind]
+        limiter.queue_size = 0
+        while limiter.in_flight < int(limiter.limit):
+            self.assertTrue(limiter.acquire())
+        return limiter
+
+    def test_overloaded_class_is_shed(self):
+        """Test that a saturated class answers 503 with Retry-After."""
+        limiter = self.saturate('read')
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(limiter.rejected, 1)
+        # Metrics stay reachable under overload
+        response = self.client.get('/api/v1/metrics/', headers=self.headers)
+        self.assertEqual(response.get_json()['admission']['read']['rejected'], 1)
+
+    def test_logins_do_not_starve_reads(self):
+        """Test that saturated logins leave reads and writes admitted."""
+        self.saturate('login')
+        response = self.client.post('/api/v1/auth/login', json={
+            'email': 'admin@hbnb.io', 'password': 'admin1234'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.client.get('/api/v1/places/').status_code, 200)
+        self.create_place()
+
+    def test_slots_are_released(self):
+        """Test that every admitted request gives its slot back."""
+        self.client.get('/api/v1/places/')
+        self.client.get('/api/v1/places/missing')
+        self.create_place()
+        for limiter in self.app.extensions['admission'].values():
+            self.assertEqual(limiter.in_flight, 0)
+
+    def test_bulk_has_its_own_fixed_class(self):
+        """Test that bulk imports and exports neither take nor shrink write slots."""
+        from app.admission import AdaptiveLimiter
+        self.saturate('bulk')
+        response = self.client.post('/api/v1/amenities/bulk', json=[{'name': 'Gym'}], headers=self.headers)
+        self.assertEqual(response.status_code, 503)
+        response = self.client.get('/api/v1/export/places', headers=self.headers)
+        self.assertEqual(response.status_code, 503)
+        self.create_place()
+
+        limiter = AdaptiveLimiter(2, None, queue_size=0)
+        limiter.acquire()
+        limiter.release(60.0)
+        self.assertEqual(int(limiter.limit), 2)
+
+    def test_aimd_limit(self):
+        """Test multiplicative decrease on slow requests and additive increase."""
+        from app.admission import AdaptiveLimiter
+        limiter = AdaptiveLimiter(10, target_latency=0.05, queue_size=0)
+        limiter.acquire()
+        limiter.release(1.0)
+        self.assertEqual(int(limiter.limit), 9)
+        for _ in range(9):
+            limiter.acquire()
+        # A second slow request in the same window does not cut again
+        limiter.release(1.0)
+        self.assertEqual(int(limiter.limit), 9)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())  # 9 in flight, queue disabled
+        before = limiter.limit
+        limiter.release(0.001)
+        self.assertGreater(limiter.limit, before)
+
+
+class TestPasswordHashing(DatabaseAPITestCase):
+    """Test cases for pooled bcrypt hashing and rehash-on-login."""
+
+    def test_process_pool_hashes_and_checks(self):
+        """Test hashing and verification in a worker process."""
+        from app.hashing import PasswordHasher, hash_cost
+        pool = PasswordHasher(rounds=4, pool_size=1, timeout=30)
+        try:
+            pw_hash = pool.hash('secret')
+            self.assertEqual(hash_cost(pw_hash), 4)
+            self.assertTrue(pool.check(pw_hash, 'secret'))
+            self.assertFalse(pool.check(pw_hash, 'wrong'))
+        finally:
+            pool.shutdown()
+
+    def test_timeout(self):
+        """Test that a job running past the timeout raises PasswordHashingTimeout."""
+        from app.hashing import PasswordHasher, PasswordHashingTimeout
+        pool = PasswordHasher(rounds=16, pool_size=1, timeout=0.01)
+        try:
+            with self.assertRaises(PasswordHashingTimeout):
+                pool.hash('secret')
+        finally:
+            pool.shutdown()
+
+    def test_login_rehashes_outdated_cost(self):
+        """Test that a login upgrades a hash made with another cost factor."""
+        from app import hasher
+        from app.hashing import hash_cost
+        from app.services import facade
+        self.assertEqual(hash_cost(facade.get_user_by_email('admin@hbnb.io').password), 4)
+        hasher.rounds = 5
+        try:
+            response = self.client.post('/api/v1/auth/login', json={
+                'email': 'admin@hbnb.io', 'password': 'admin1234'})
+            self.assertEqual(response.status_code, 200)
+        finally:
+            hasher.rounds = 4
+        db.session.remove()
+        user = facade.get_user_by_email('admin@hbnb.io')
+        self.assertEqual(hash_cost(user.password), 5)
+        self.assertTrue(user.verify_password('admin1234'))
+
+
+class TestJWTDecodeCache(DatabaseAPITestCase):
+    """Test cases for the verified-token cache and token revocation."""
+
+    def test_signature_verified_once_per_token(self):
+        """Test that repeated calls reuse the verified claims."""
+        from app import jwt
+        stats = jwt.token_cache.stats
+        for _ in range(5):
+            response = self.client.get('/api/v1/auth/protected', headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(stats.hits, 4)
+        response = self.client.get('/api/v1/metrics/', headers=self.headers)
+        self.assertGreater(response.get_json()['jwt_cache']['hit_rate'], 0.5)
+
+    def test_revocation_check_stays_local(self):
+        """Test that authenticated requests do not read revoked_tokens each time."""
+        from sqlalchemy import event
+        self.client.get('/api/v1/auth/protected', headers=self.headers)
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            for _ in range(3):
+                self.client.get('/api/v1/auth/protected', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual([s for s in statements if 'revoked_tokens' in s], [])
+
+    def test_revoked_token_is_refused(self):
+        """Test that a token revoked by logout is refused and leaves the cache."""
+        import hashlib
+        from app import jwt
+        token = self.headers['Authorization'].split()[1]
+        key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        self.client.get('/api/v1/auth/protected', headers=self.headers)
+        self.assertIsNotNone(jwt.token_cache.get(key))
+        response = self.client.post('/api/v1/auth/logout', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(jwt.token_cache.get(key))
+        response = self.client.get('/api/v1/auth/protected', headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_revocations_are_shared(self):
+        """Test that a revocation recorded by another worker is honored after a refresh."""
+        from flask_jwt_extended import decode_token
+        from app import jwt
+        from app.models.revoked_token import RevokedToken
+        self.assertEqual(self.client.get('/api/v1/auth/protected', headers=self.headers).status_code, 200)
+        claims = decode_token(self.headers['Authorization'].split()[1])
+        # Another worker's logout only leaves its row in the shared table
+        db.session.add(RevokedToken(jti=claims['jti'], expires_at=claims['exp']))
+        db.session.commit()
+        jwt.revocations.loaded_at -= jwt.revocations.refresh_seconds
+        self.assertEqual(self.client.get('/api/v1/auth/protected', headers=self.headers).status_code, 401)
+
+    def test_expired_token_is_refused(self):
+        """Test that a cached token stops working at its exp."""
+        from datetime import timedelta
+        from flask_jwt_extended import create_access_token
+        token = create_access_token(identity='someone', expires_delta=timedelta(seconds=1))
+        headers = {'Authorization': f'Bearer {token}'}
+        self.assertEqual(self.client.get('/api/v1/auth/protected', headers=headers).status_code, 200)
+        time.sleep(1.1)
+        self.assertEqual(self.client.get('/api/v1/auth/protected', headers=headers).status_code, 401)
+
+
+class TestWarmup(DatabaseAPITestCase):
+    """Test cases for worker warmup and the health probes."""
+
+    def test_readiness_follows_warmup(self):
+        """Test that a preloaded worker is not ready until it warmed up."""
+        from app.services import facade
+        from app.warmup import preload, warm_up
+        place_id = self.create_place()['id']
+        self.assertEqual(self.client.get('/api/v1/health/ready').status_code, 200)
+
+        preload(self.app)
+        response = self.client.get('/api/v1/health/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['status'], 'warming up')
+        self.assertEqual(self.client.get('/api/v1/health/live').status_code, 200)
+
+        facade.cache.clear()
+        warm_up(self.app)
+        response = self.client.get('/api/v1/health/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.get_json()['warmup_ms'])
+        self.assertIsNotNone(facade.cache.get(f'place:{place_id}'))
+
+
+class TestSQLiteProfile(unittest.TestCase):
+    """Test cases for the production SQLite pragmas."""
+
+    def test_pragmas_applied_to_new_connections(self):
+        """Test that every pooled connection gets the SQLITE_PRAGMAS profile."""
+        from sqlalchemy import text
+        from config import ProductionConfig
+        path = os.path.join(tempfile.mkdtemp(), 'profile.db')
+        config = type('ProfileConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+            'SQLALCHEMY_ENGINE_OPTIONS': ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS,
+            'SQLITE_PRAGMAS': ProductionConfig.SQLITE_PRAGMAS
+        })
+        app = create_app(config)
+        with app.app_context():
+            connections = [db.engine.connect() for _ in range(2)]
+            for connection in connections:
+                self.assertEqual(connection.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+                self.assertEqual(connection.execute(text('PRAGMA synchronous')).scalar(), 1)
+                self.assertEqual(connection.execute(text('PRAGMA foreign_keys')).scalar(), 1)
+                self.assertEqual(connection.execute(text('PRAGMA busy_timeout')).scalar(),
+                                 ProductionConfig.SQLITE_PRAGMAS['busy_timeout'])
+                connection.close()
+            self.assertEqual(db.engine.pool.size(),
+                             ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS['pool_size'])
+            db.engine.dispose()
+
+
+class TestGroupCommit(DatabaseAPITestCase):
+    """Test cases for the group-commit write queue."""
+
+    config = type('GroupCommitConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'group-commit.db'),
+        'WRITE_QUEUE_ENABLED': True,
+        'WRITE_QUEUE_MAX_DELAY_MS': 200
+    })
+
+    def run_concurrently(self, calls):
+        """Run each call in its own thread and app context; return results or exceptions."""
+        import threading
+        results = [None] * len(calls)
+        barrier = threading.Barrier(len(calls))
+
+        def worker(index, call):
+            with self.app.app_context():
+                barrier.wait()
+                try:
+                    results[index] = call()
+                except Exception as e:
+                    results[index] = e
+        threads = [threading.Thread(target=worker, args=item) for item in enumerate(calls)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def place_call(self, title, price=100.0):
+        """A call creating a place through the facade and returning its title and owner email."""
+        from app.services import facade
+
+        def call():
+            place = facade.create_place({'title': title, 'description': '', 'price': price,
+                                         'latitude': 10.0, 'longitude': 20.0,
+                                         'owner_id': self.admin.id})
+            return place.title, place.owner.email
+        return call
+
+    def test_concurrent_writes_share_a_commit(self):
+        """Test that concurrent writes are committed in fewer batches, each with its result."""
+        writes = self.app.extensions['write_queue']
+        results = self.run_concurrently([self.place_call(f'Place {i}') for i in range(8)])
+        self.assertEqual(sorted(results), sorted((f'Place {i}', 'admin@hbnb.io') for i in range(8)))
+        self.assertEqual(writes.stats.writes, 8)
+        self.assertLess(writes.stats.batches, 8)
+        self.assertEqual(len(self.client.get('/api/v1/places/').get_json()), 8)
+
+    def test_failed_write_does_not_fail_its_batch(self):
+        """Test that an invalid write raises for its caller only."""
+        writes = self.app.extensions['write_queue']
+        calls = [self.place_call(f'Place {i}') for i in range(4)] + [self.place_call('Bad', price=-1)]
+        results = self.run_concurrently(calls)
+        self.assertIsInstance(results[-1], ValueError)
+        self.assertEqual(sorted(results[:-1]), sorted((f'Place {i}', 'admin@hbnb.io') for i in range(4)))
+        self.assertEqual(writes.stats.failed, 1)
+        self.assertEqual(len(self.client.get('/api/v1/places/').get_json()), 4)
+
+    def test_api_writes_through_the_queue(self):
+        """Test that API writes return their entity and show in the metrics."""
+        place = self.create_place('Queued')
+        response = self.client.put(f"/api/v1/places/{place['id']}", json={'price': 80.0},
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(f"/api/v1/places/{place['id']}").get_json()['price'], 80.0)
+        stats = self.client.get('/api/v1/metrics/', headers=self.headers).get_json()['write_queue']
+        self.assertEqual(stats['writes'], 2)
+
+    def test_timeouts_only_cancel_writes_not_started(self):
+        """Test that a timeout drops a queued write but waits for a running one."""
+        import threading
+        from app.persistence.write_queue import (GroupCommitQueue, WriteOutcomeUnknown,
+                                                 WriteQueueTimeout)
+        writes = GroupCommitQueue(self.app, max_delay=0, timeout=0.2)
+        # Started before the timeout, finished within the second wait: its result counts
+        self.assertEqual(writes.submit(lambda: time.sleep(0.3) or 'done'), 'done')
+
+        # Still queued behind a slow write when the timeout expires: cancelled, never run
+        ran = []
+        slow = threading.Thread(target=writes.submit, args=(time.sleep, 0.4))
+        slow.start()
+        time.sleep(0.05)
+        with self.assertRaises(WriteQueueTimeout):
+            writes.submit(lambda: ran.append(True))
+        slow.join()
+
+        with self.assertRaises(WriteOutcomeUnknown):
+            writes.submit(time.sleep, 0.6)
+        time.sleep(0.3)
+        self.assertEqual(ran, [])
+
+
+class TestReadReplicas(DatabaseAPITestCase):
+    """Test cases for read-replica routing and read-your-writes tokens."""
+
+    data_dir = tempfile.mkdtemp()
+    config = type('ReplicaConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(data_dir, 'primary.db'),
+        'SQLALCHEMY_REPLICA_URIS': ['sqlite:///' + os.path.join(data_dir, 'replica.db')]
+    })
+
+    def setUp(self):
+        """Start with a replica holding a copy of the seeded primary."""
+        from app.persistence.replicas import sync_replicas
+        super().setUp()
+        sync_replicas(self.app)
+
+    def tearDown(self):
+        """Also close the replica engines."""
+        super().tearDown()
+        for engine in self.app.extensions['replicas'].engines:
+            engine.dispose()
+
+    def get(self, client, url, **kwargs):
+        """GET with a fresh session, as the requests share the test's app context."""
+        db.session.remove()
+        return client.get(url, **kwargs)
+
+    def test_reads_go_to_the_replica_until_it_catches_up(self):
+        """Test that a client without a token reads the replica, which lags until synced."""
+        from app.persistence.replicas import sync_replicas
+        place = self.create_place('Fresh')
+        reader = self.app.test_client()
+        self.assertEqual(self.get(reader, f"/api/v1/places/{place['id']}").status_code, 404)
+        sync_replicas(self.app)
+        self.assertEqual(self.get(reader, f"/api/v1/places/{place['id']}").status_code, 200)
+        stats = self.client.get('/api/v1/metrics/', headers=self.headers).get_json()['replicas']
+        self.assertGreater(stats['replica_reads'], 0)
+
+    def test_writer_reads_its_own_writes(self):
+        """Test that the token of a write keeps the writer on the primary."""
+        response = self.client.post('/api/v1/places/', json={
+            'title': 'Mine', 'description': '', 'price': 50.0, 'latitude': 1.0, 'longitude': 2.0
+        }, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        token = response.headers['X-Primary-Until']
+        place_id = response.get_json()['id']
+        reader = self.app.test_client()
+        value, signature = token.rsplit('.', 1)
+        for forged in (str(time.time() + 3), f'{float(value) + 1:.3f}.{signature}'):
+            self.assertEqual(self.get(reader, f'/api/v1/places/{place_id}',
+                                      headers={'X-Primary-Until': forged}).status_code, 404)
+        self.assertEqual(self.get(reader, f'/api/v1/places/{place_id}',
+                                  headers={'X-Primary-Until': token}).status_code, 200)
+        self.assertEqual(self.client.get_cookie('primary_until').value, token)
+
+    def test_replicas_stay_on_their_app(self):
+        """Test that replica engines are not registered as binds shared by other apps."""
+        self.assertNotIn('replica_0', db.metadatas)
+        other = create_app(TestingConfig)
+        with other.app_context():
+            db.create_all()
+            self.assertIsNone(other.extensions['replicas'])
+            db.drop_all()
+
+    def test_writes_reload_targets_read_from_a_lagging_replica(self):
+        """Test that a write does not reuse the stale copy its request read from the replica."""
+        from app.persistence.replicas import sync_replicas
+        from app.services import facade
+        place_id = self.create_place()['id']
+        for email, rating in (('a@hbnb.io', 4), ('b@hbnb.io', 2)):
+            user = facade.create_user({'first_name': 'R', 'last_name': 'R', 'email': email,
+                                       'password': 'secret123'})
+            review_id = facade.create_review({'text': 'Ok', 'rating': rating,
+                                              'user_id': user.id, 'place_id': place_id}).id
+        sync_replicas(self.app)
+        # The primary moves on while the replica still has rating 2
+        facade.update_review(review_id, {'rating': 3})
+        db.session.remove()
+
+        # Held like a handler holds it, so the session keeps the stale copy
+        stale = facade.get_review(review_id)
+        self.assertEqual(stale.rating, 2)
+        facade.update_review(review_id, {'rating': 5})
+        with db.engine.connect() as primary:
+            row = primary.execute(db.text('SELECT review_count, rating_sum FROM places')).one()
+        self.assertEqual(tuple(row), (2, 9))
+
+
+class TestBinaryIds(DatabaseAPITestCase):
+    """Test cases for ULIDs stored as 16-byte keys."""
+
+    config = type('BinaryIdConfig', (TestingConfig,), {'ID_STRATEGY': 'ulid', 'ID_STORAGE': 'binary'})
+
+    def test_ids_are_stored_as_bytes(self):
+        """Test that IDs and foreign keys are 16-byte blobs read back as ULIDs."""
+        from sqlalchemy import text
+        place = self.create_place()
+        self.assertEqual(len(place['id']), 26)
+        row = db.session.execute(text('SELECT length(id), length(owner_id) FROM places')).one()
+        self.assertEqual(tuple(row), (16, 16))
+
+    def test_uuid_text_ids_are_accepted(self):
+        """Test that the UUID form of an ID finds the same entity as its ULID."""
+        import uuid
+        from app.models.ids import id_to_int
+        place = self.create_place()
+        legacy = str(uuid.UUID(int=id_to_int(place['id'])))
+        response = self.client.get(f'/api/v1/places/{legacy}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['id'], place['id'])
+        response = self.client.get(f'/api/v1/places/?ids={legacy},unknown')
+        self.assertEqual([item['id'] for item in response.get_json()['places']], [place['id']])
+        self.assertEqual(response.get_json()['missing'], ['unknown'])
+        self.assertEqual(self.client.get('/api/v1/places/not-an-id').status_code, 404)
+
+    def test_uuid_text_amenity_ids_are_accepted(self):
+        """Test that place writes resolve amenities given in their UUID form."""
+        import uuid
+        from app.models.ids import id_to_int
+        from app.services import facade
+        wifi = facade.create_amenity({'name': 'WiFi'}).id
+        legacy = str(uuid.UUID(int=id_to_int(wifi)))
+        place = self.create_place(amenities=[legacy])
+        self.assertEqual([amenity['id'] for amenity in place['amenities']], [wifi])
+        response = self.client.post('/api/v1/places/bulk', json=[{
+            'title': 'Bulk', 'price': 10.0, 'latitude': 1.0, 'longitude': 2.0,
+            'owner_id': self.admin.id, 'amenities': [legacy, wifi]}], headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+
+    def test_ownership_checks_compare_canonical_ids(self):
+        """Test that a token carrying the UUID form of an ID is its owner's."""
+        import uuid
+        from flask_jwt_extended import create_access_token
+        from app.models.ids import id_to_int
+        from app.services import facade
+        owner = facade.create_user({'first_name': 'Own', 'last_name': 'Er',
+                                    'email': 'owner@hbnb.io', 'password': 'owner1234'})
+        legacy = str(uuid.UUID(int=id_to_int(owner.id)))
+        headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=legacy, additional_claims={'is_admin': False})}
+        place = self.create_place(owner_id=owner.id)
+        response = self.client.put(f"/api/v1/places/{place['id']}", json={'title': 'Mine'}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/v1/reviews/', json={
+            'text': 'Great', 'rating': 5, 'place_id': place['id']}, headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_settings_are_per_app(self):
+        """Test that an app with text storage keeps its own ID settings."""
+        from app.models.ids import canonical_id, new_id
+        other = create_app(TestingConfig)
+        with other.app_context():
+            self.assertEqual(other.extensions['ids'].storage, 'text')
+            self.assertEqual(len(new_id()), 36)
+        self.assertEqual(len(new_id()), 26)
+        self.assertEqual(canonical_id(self.admin.id.lower()), self.admin.id)
+
+    def test_migrate_ids_copies_and_stamps(self):
+        """Test that migrate-ids converts text IDs to bytes and stamps the target."""
+        from sqlalchemy import create_engine, text
+        from app.persistence.id_migration import migrate_ids
+        from app.persistence.migrations import pending_migrations
+        data_dir = tempfile.mkdtemp()
+        source_url = 'sqlite:///' + os.path.join(data_dir, 'text.db')
+        target_url = 'sqlite:///' + os.path.join(data_dir, 'binary.db')
+        source_app = create_app(type('TextIdConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': source_url, 'ID_STRATEGY': 'uuid4'}))
+        with source_app.app_context():
+            from app.services import facade
+            db.create_all()
+            facade.create_amenity({'name': 'WiFi'})
+            db.session.remove()
+            db.engine.dispose()
+
+        copied = migrate_ids(source_url, target_url)
+        self.assertEqual(copied['amenities'], 1)
+        target = create_engine(target_url)
+        with target.connect() as connection:
+            self.assertEqual(connection.execute(text('SELECT length(id) FROM amenities')).scalar(), 16)
+        self.assertEqual(pending_migrations(target), [])
+        target.dispose()
+
+
+class TestSchemaMigrations(DatabaseAPITestCase):
+    """Test cases for the versioned migrations and the ORM/schema parity check."""
+
+    def make_engine(self):
+        """A SQLite engine on a throw-away file."""
+        from sqlalchemy import create_engine
+        return create_engine('sqlite:///' + os.path.join(tempfile.mkdtemp(), 'schema.db'))
+
+    def test_models_declare_lookup_indexes(self):
+        """Test that create_all builds the foreign-key lookup indexes."""
+        from sqlalchemy import inspect
+        from app.persistence.migrations import check_parity
+        self.assertEqual(check_parity(db.engine), [])
+        inspector = inspect(db.engine)
+        names = {index['name'] for table in ('places', 'reviews', 'place_amenity')
+                 for index in inspector.get_indexes(table)}
+        self.assertTrue({'idx_places_owner', 'idx_reviews_place', 'idx_reviews_user',
+                         'idx_place_amenity_amenity'} <= names)
+
+    def test_models_match_schema_sql(self):
+        """Test that sql/schema.sql has every table, column and index of the models."""
+        from app.persistence.migrations import check_parity
+        engine = self.make_engine()
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'sql', 'schema.sql')
+        with open(path) as script:
+            engine.raw_connection().driver_connection.executescript(script.read())
+        self.assertEqual(check_parity(engine), [])
+        engine.dispose()
+
+    def test_upgrade_brings_an_old_schema_to_parity(self):
+        """Test that the migrations add the missing columns and indexes and backfill them."""
+        from sqlalchemy import text
+        from app.models.geo import geo_cell
+        from app.persistence.migrations import MIGRATIONS, check_parity, pending_migrations, upgrade
+        engine = self.make_engine()
+        db.metadata.create_all(engine)
+        with engine.begin() as connection:
+            # Rebuild the schema of before the derived columns and the indexes
+            for table, index in (('places', 'idx_places_owner'), ('places', 'idx_places_created_at_id'),
+                                 ('places', 'idx_places_geo_cell'), ('reviews', 'idx_reviews_place'),
+                                 ('reviews', 'idx_reviews_user'),
+                                 ('place_amenity', 'idx_place_amenity_amenity')):
+                connection.execute(text(f'DROP INDEX {index}'))
+            for column in ('geo_cell', 'review_count', 'rating_sum'):
+                connection.execute(text(f'ALTER TABLE places DROP COLUMN {column}'))
+            connection.execute(text(
+                "INSERT INTO users (id, first_name, last_name, email, password, is_admin) "
+                "VALUES ('u1', 'A', 'B', 'a@hbnb.io', 'x', 0)"))
+            connection.execute(text(
+                "INSERT INTO places (id, title, description, price, latitude, longitude, owner_id) "
+                "VALUES ('p1', 'Old', '', 10.0, 48.85, 2.35, 'u1')"))
+            connection.execute(text(
+                "INSERT INTO reviews (id, text, rating, place_id, user_id) "
+                "VALUES ('r1', 'Nice', 4, 'p1', 'u1')"))
+        self.assertGreater(len(check_parity(engine)), 0)
+
+        applied = upgrade(engine, log=lambda message: None)
+        self.assertEqual([step.version for step in applied], [step.version for step in MIGRATIONS])
+        self.assertEqual(check_parity(engine), [])
+        self.assertEqual(pending_migrations(engine), [])
+        with engine.connect() as connection:
+            row = connection.execute(text('SELECT geo_cell, review_count, rating_sum FROM places')).one()
+        self.assertEqual(tuple(row), (geo_cell(48.85, 2.35), 1, 4))
+        self.assertEqual(upgrade(engine, log=lambda message: None), [])
+        engine.dispose()
+
+    def test_upgrade_recomputes_ratings_when_one_column_is_missing(self):
+        """Test that adding only rating_sum still rebuilds the aggregates from reviews."""
+        from sqlalchemy import text
+        from app.persistence.migrations import upgrade
+        engine = self.make_engine()
+        db.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text('ALTER TABLE places DROP COLUMN rating_sum'))
+            connection.execute(text(
+                "INSERT INTO users (id, first_name, last_name, email, password, is_admin) "
+                "VALUES ('u1', 'A', 'B', 'a@hbnb.io', 'x', 0), ('u2', 'C', 'D', 'c@hbnb.io', 'x', 0)"))
+            connection.execute(text(
+                "INSERT INTO places (id, title, description, price, latitude, longitude, owner_id, "
+                "review_count) VALUES ('p1', 'Old', '', 10.0, 48.85, 2.35, 'u1', 0)"))
+            connection.execute(text(
+                "INSERT INTO reviews (id, text, rating, place_id, user_id) "
+                "VALUES ('r1', 'Nice', 5, 'p1', 'u1'), ('r2', 'Fine', 3, 'p1', 'u2')"))
+        upgrade(engine, log=lambda message: None)
+        with engine.connect() as connection:
+            row = connection.execute(text('SELECT review_count, rating_sum FROM places')).one()
+        self.assertEqual(tuple(row), (2, 8))
+        engine.dispose()
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -11,6 +11,8 @@ from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
+from app.models.geo import cell_ranges, geo_cell, haversine_km, radius_bounds
+from app.models.ids import decode_ulid, encode_ulid, id_to_int, ulid, uuid7
 
 
 def test_user_creation():
@@ -295,6 +297,56 @@ def test_amenity_validation():
     return True
 
 
+def test_geo_cells():
+    """Test grid cell helpers used by geospatial search."""
+    print("Testing geo cells...")
+
+    # Paris -> London is about 344 km
+    assert abs(haversine_km(48.8566, 2.3522, 51.5074, -0.1278) - 343.5) < 1.0
+
+    # A point's cell is covered by the ranges of a box around it
+    cell = geo_cell(48.8566, 2.3522)
+    ranges = cell_ranges(*radius_bounds(48.8566, 2.3522, 10))
+    assert any(low <= cell <= high for low, high in ranges)
+
+    # Boxes crossing the antimeridian cover both sides
+    ranges = cell_ranges(*radius_bounds(0.0, 179.99, 5))
+    assert any(low <= geo_cell(0.0, -179.99) <= high for low, high in ranges)
+    assert any(low <= geo_cell(0.0, 179.99) <= high for low, high in ranges)
+
+    print("Geo cells test passed!")
+    return True
+
+
+def test_entity_ids():
+    """Test time-ordered ID generation and the accepted text forms."""
+    print("Testing entity IDs...")
+    import time
+    import uuid
+
+    first = uuid7()
+    time.sleep(0.002)
+    second = uuid7()
+    assert uuid.UUID(first).version == 7
+    assert first < second  # later IDs sort after earlier ones
+
+    value = id_to_int(first)
+    assert decode_ulid(encode_ulid(value)) == value
+    assert id_to_int(first.replace('-', '')) == value
+    assert id_to_int(value.to_bytes(16, 'big')) == value
+    assert len(ulid()) == 26
+
+    for invalid in ('nonsense', 'U' * 26, b'short'):
+        try:
+            id_to_int(invalid)
+            assert False, f"{invalid!r} should be rejected"
+        except ValueError:
+            pass
+
+    print("Entity IDs test passed!")
+    return True
+
+
 def run_all_tests():
     """Run all tests."""
     print("=" * 50)
@@ -312,6 +364,8 @@ def run_all_tests():
         test_review_validation,
         test_amenity_creation,
         test_amenity_validation,
+        test_geo_cells,
+        test_entity_ids,
     ]
     
     passed = 0
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""WSGI entry point for production servers (``wsgi:app``).
+
+The app is created once here, in the master process, with the production
+configuration unless FLASK_ENV says otherwise. Workers must call
+``app.warmup.warm_up(app)`` after forking (serve.py and gunicorn.conf.py do).
+"""
+
+import os
+
+os.environ.setdefault('FLASK_ENV', 'production')
+
+from app import create_app  # noqa: E402
+from app.warmup import preload  # noqa: E402
+
+app = create_app()
+preload(app)